@@ -0,0 +1,384 @@
+"""
+Μαζική (headless) ανάλυση PDF ατομικού λογαριασμού e-EFKA χωρίς Streamlit.
+
+Για κάθε PDF: ανάλυση (parse_efka_pdf), πλαφόν Κύριας/Επικουρικής
+(compute_insurable), συντάξιμες αποδοχές με ΔΤΚ (compute_pension) και εξαγωγή
+σε CSV/Parquet (ανάλυση ανά γραμμή και ετήσια σύνολα, με αριθμητικές στήλες)
+και JSON για το Syntaksi Pro (ή όλοι οι πελάτες σε ένα
+syntaksi.ndjson, μία γραμμή ανά αρχείο/ταμείο). Τα αρχεία αναλύονται παράλληλα σε
+διεργασίες (μία ανά αρχείο) και γράφεται manifest.json με χρόνους και σφάλματα.
+
+    python batch_cli.py statements/ -o out/ --dtk-year 2026 --ceiling new --jobs 4
+"""
+import argparse
+import contextlib
+import glob
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from efka_core import (
+    DEFAULT_DTK_YEAR, FUNDS, SOURCE_KEY_ATTR, build_syntaksi_json, ceiling_table, compute_insurable,
+    compute_pension, enable_copy_on_write, get_dtk_table, package_descriptions, view,
+    write_syntaksi_json, write_syntaksi_ndjson, yearly_totals,
+)
+from efka_core.frames import as_str, per_value
+from parse_cache import cache_key, content_hash, parquet_available
+from pdf_parser import (
+    PARSE_ENGINES, PARSER_VERSION, PERIOD_INDEX_COLUMN, parse_efka_pdf, period_index, resolve_parse_engine,
+)
+
+# Ονόματα τύπου πλαφόν στη γραμμή εντολών
+CEILING_ALIASES = {'old': 'Παλιός', 'new': 'Νέος', 'Παλιός': 'Παλιός', 'Νέος': 'Νέος'}
+OUTPUT_FORMATS = ('csv', 'parquet', 'json', 'ndjson')
+MANIFEST_NAME = "manifest.json"
+# Κοινό αρχείο της μορφής ndjson στον φάκελο εξόδου
+NDJSON_NAME = "syntaksi.ndjson"
+
+
+def collect_inputs(paths):
+    """Λίστα PDF από φακέλους, αρχεία ή glob patterns (χωρίς διπλότυπα, με σταθερή σειρά)."""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            matches = glob.glob(os.path.join(path, "**", "*.pdf"), recursive=True)
+            matches += glob.glob(os.path.join(path, "**", "*.PDF"), recursive=True)
+        elif os.path.isfile(path):
+            matches = [path]
+        else:
+            matches = glob.glob(path, recursive=True)
+        found.extend(sorted(matches))
+
+    seen = set()
+    files = []
+    for path in found:
+        real = os.path.realpath(path)
+        if real not in seen and os.path.isfile(real):
+            seen.add(real)
+            files.append(path)
+    return files
+
+
+def _output_dir_name(path, used):
+    """Φάκελος εξόδου ανά PDF: το όνομα του αρχείου, με αρίθμηση αν συμπίπτει."""
+    stem = os.path.splitext(os.path.basename(path))[0] or "statement"
+    name = stem
+    n = 2
+    while name in used:
+        name = f"{stem}_{n}"
+        n += 1
+    used.add(name)
+    return name
+
+
+def _write_frame(df, out_dir, name, formats):
+    written = []
+    if 'csv' in formats:
+        path = os.path.join(out_dir, f"{name}.csv")
+        # utf-8-sig ώστε το Excel να διαβάζει σωστά τα ελληνικά
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+        written.append(path)
+    if 'parquet' in formats:
+        path = os.path.join(out_dir, f"{name}.parquet")
+        df.to_parquet(path, index=False)
+        written.append(path)
+    return written
+
+
+def analysis_export(df_analysis, package_desc_map):
+    """
+    Η ανάλυση πλαφόν ανά γραμμή για εξαγωγή (όχι ο πίνακας προβολής της εφαρμογής):
+    οι αριθμητικές στήλες όπως υπολογίστηκαν, ΕΤΟΣ ως ακέραιος, ΑΡ. ΠΕΡΙΟΔΟΥ
+    (έτος * 12 + μήνας) και ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ από τα ετήσια δεδομένα.
+    """
+    df = view(df_analysis)
+    df['ΕΤΟΣ'] = pd.to_numeric(df['ΕΤΟΣ'], errors='coerce').astype('Int64')
+    if PERIOD_INDEX_COLUMN not in df.columns:
+        df[PERIOD_INDEX_COLUMN] = per_value(
+            df['ΠΕΡΙΟΔΟΣ'], lambda values: values.map(period_index).astype('Int32')
+        )
+    pkg_map = {str(k): v for k, v in package_desc_map.items()}
+    df['ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ'] = as_str(df['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ']).map(pkg_map)
+    return df
+
+
+def totals_export(totals):
+    """Τα ετήσια σύνολα για εξαγωγή, με ΕΤΟΣ ως ακέραιο."""
+    df = view(totals)
+    df['ΕΤΟΣ'] = pd.to_numeric(df['ΕΤΟΣ'], errors='coerce').astype('Int64')
+    return df
+
+
+def process_statement(path, out_dir, options):
+    """
+    Ανάλυση ενός PDF και εγγραφή των αποτελεσμάτων στο out_dir.
+
+    Εκτελείται σε διεργασία worker· επιστρέφει την εγγραφή του manifest και
+    δεν σηκώνει εξαιρέσεις (το σφάλμα καταγράφεται στην εγγραφή).
+    """
+    record = {
+        'file': path,
+        'output_dir': out_dir,
+        'status': 'ok',
+        'error': None,
+        'timings': {},
+        'rows': {},
+        'funds': {},
+        'outputs': [],
+    }
+    started = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            file_bytes = f.read()
+        record['sha256'] = content_hash(file_bytes)
+
+        t0 = time.perf_counter()
+        df_monthly, df_annual = parse_efka_pdf(
+            file_bytes, workers=1, engine=options['engine'], compact=options['compact']
+        )
+        key = cache_key(file_bytes, options['engine'], options['compact'])
+        df_monthly.attrs[SOURCE_KEY_ATTR] = key
+        df_annual.attrs[SOURCE_KEY_ATTR] = key
+        record['timings']['parse'] = time.perf_counter() - t0
+        record['rows'] = {'monthly': len(df_monthly), 'annual': len(df_annual)}
+        if df_monthly.empty:
+            raise ValueError("Δεν βρέθηκαν μηνιαία δεδομένα στο PDF")
+
+        t0 = time.perf_counter()
+        ceilings = ceiling_table(options['ceiling'])
+        package_desc_map = package_descriptions(df_annual)
+        dtk_factors = options['dtk_table'][options['dtk_year']]
+        results = {}
+        for fund in options['funds']:
+            df_analysis = compute_insurable(df_monthly, ceilings, FUNDS[fund]['year_range'])
+            totals = yearly_totals(df_analysis)
+            if totals.empty:
+                results[fund] = (df_analysis, totals, None, None)
+                record['funds'][fund] = {'years': 0}
+                continue
+            pension_df, summary = compute_pension(totals, dtk_factors, fund)
+            json_data = build_syntaksi_json(pension_df, options['dtk_year'], buyout_dtk=summary['buyout_dtk'])
+            results[fund] = (df_analysis, totals, pension_df, json_data)
+            record['funds'][fund] = {
+                'years': len(totals),
+                'total_days': int(summary['total_days']),
+                'total_pensionable_earnings': round(float(summary['total_pensionable_earnings']), 2),
+                'average_pensionable_salary': round(float(summary['average_pensionable_salary']), 2),
+            }
+        record['timings']['analysis'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        os.makedirs(out_dir, exist_ok=True)
+        formats = options['formats']
+        record['outputs'] += _write_frame(df_monthly, out_dir, "monthly", formats)
+        record['outputs'] += _write_frame(df_annual, out_dir, "annual", formats)
+        for fund, (df_analysis, totals, pension_df, json_data) in results.items():
+            if df_analysis.empty:
+                continue
+            record['outputs'] += _write_frame(
+                analysis_export(df_analysis, package_desc_map), out_dir, f"analysis_{fund}", formats
+            )
+            record['outputs'] += _write_frame(totals_export(totals), out_dir, f"yearly_totals_{fund}", formats)
+            if pension_df is None:
+                continue
+            record['outputs'] += _write_frame(pension_df, out_dir, f"pension_{fund}", formats)
+            if 'json' in formats:
+                json_path = os.path.join(out_dir, f"syntaksi_{fund}.json")
+                with open(json_path, "w", encoding="utf-8") as f:
+                    write_syntaksi_json(json_data, f)
+                record['outputs'].append(json_path)
+            if 'ndjson' in formats:
+                # Γράφεται από την κύρια διεργασία στο NDJSON_NAME (βλ. syntaksi_lines)
+                record.setdefault('syntaksi', {})[fund] = json_data
+        record['timings']['write'] = time.perf_counter() - t0
+    except Exception as e:
+        record['status'] = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        record['traceback'] = traceback.format_exc()
+    record['timings']['total'] = time.perf_counter() - started
+    return record
+
+
+def syntaksi_lines(record):
+    """
+    Γραμμές NDJSON ενός αρχείου (μία ανά ταμείο)· τα δεδομένα αφαιρούνται από
+    την εγγραφή ώστε να μη γράφονται και στο manifest.
+    """
+    json_by_fund = record.pop('syntaksi', {})
+    if record['status'] != 'ok':
+        return
+    for fund, json_data in json_by_fund.items():
+        yield {'file': record['file'], 'sha256': record.get('sha256'), 'fund': fund, 'syntaksi': json_data}
+
+
+def _process_pool(jobs):
+    # Όπως στο pdf_parser: forkserver/spawn αντί για fork
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=ctx, initializer=enable_copy_on_write)
+
+
+def run_batch(files, output_dir, options, jobs=1, progress=None):
+    """Επεξεργασία όλων των αρχείων· επιστρέφει τις εγγραφές με τη σειρά εισόδου."""
+    used = set()
+    tasks = [(path, os.path.join(output_dir, _output_dir_name(path, used))) for path in files]
+    records = [None] * len(tasks)
+
+    if jobs <= 1 or len(tasks) <= 1:
+        for idx, (path, out_dir) in enumerate(tasks):
+            records[idx] = process_statement(path, out_dir, options)
+            if progress:
+                progress(records[idx])
+        return records
+
+    with _process_pool(min(jobs, len(tasks))) as executor:
+        futures = {
+            executor.submit(process_statement, path, out_dir, options): idx
+            for idx, (path, out_dir) in enumerate(tasks)
+        }
+        for future in as_completed(futures):
+            idx = futures[future]
+            try:
+                records[idx] = future.result()
+            except Exception as e:
+                # Π.χ. τερματισμός της διεργασίας worker
+                path, out_dir = tasks[idx]
+                records[idx] = {
+                    'file': path, 'output_dir': out_dir, 'status': 'error',
+                    'error': f"{type(e).__name__}: {e}", 'timings': {}, 'rows': {}, 'funds': {}, 'outputs': [],
+                }
+            if progress:
+                progress(records[idx])
+    return records
+
+
+def build_manifest(records, options, jobs, wall_time):
+    failed = [r for r in records if r['status'] != 'ok']
+    return {
+        'parser_version': PARSER_VERSION,
+        'engine': options['engine'],
+        'compact': options['compact'],
+        'dtk_year': options['dtk_year'],
+        'ceiling': options['ceiling'],
+        'funds': list(options['funds']),
+        'formats': list(options['formats']),
+        'jobs': jobs,
+        'totals': {
+            'files': len(records),
+            'ok': len(records) - len(failed),
+            'failed': len(failed),
+            'wall_time': wall_time,
+            'parse_time': sum(r['timings'].get('parse', 0.0) for r in records),
+            'analysis_time': sum(r['timings'].get('analysis', 0.0) for r in records),
+            'write_time': sum(r['timings'].get('write', 0.0) for r in records),
+        },
+        'files': records,
+    }
+
+
+def _csv_list(value, choices, name):
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in choices]
+    if unknown or not items:
+        raise argparse.ArgumentTypeError(
+            f"Άγνωστη τιμή για {name}: {', '.join(unknown) or value!r} (επιλογές: {', '.join(choices)})"
+        )
+    return tuple(dict.fromkeys(items))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="Φάκελοι, αρχεία PDF ή glob patterns")
+    parser.add_argument("-o", "--output-dir", default="efka_output", help="Φάκελος εξόδου")
+    parser.add_argument("--dtk-year", type=int, default=DEFAULT_DTK_YEAR, help="Έτος αναφοράς ΔΤΚ")
+    parser.add_argument("--ceiling", default="old", choices=sorted(CEILING_ALIASES),
+                        help="Πίνακας πλαφόν (old/Παλιός ή new/Νέος)")
+    parser.add_argument("--funds", default=",".join(FUNDS),
+                        type=lambda v: _csv_list(v, tuple(FUNDS), "--funds"),
+                        help="Ταμεία, χωρισμένα με κόμμα (kyria,epikouriki)")
+    parser.add_argument("--formats", default="csv,json",
+                        type=lambda v: _csv_list(v, OUTPUT_FORMATS, "--formats"),
+                        help="Μορφές εξόδου, χωρισμένες με κόμμα (csv,parquet,json,ndjson)")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="Παράλληλες διεργασίες (0 = όλοι οι πυρήνες)")
+    parser.add_argument("--engine", choices=PARSE_ENGINES, default=None,
+                        help="Μηχανή εξαγωγής (προεπιλογή: EFKA_PARSE_ENGINE ή tables)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Συμπαγές σχήμα μηνιαίων δεδομένων (category/int16) για λιγότερη μνήμη")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Χωρίς πρόοδο ανά αρχείο")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    enable_copy_on_write()
+
+    if 'parquet' in args.formats and not parquet_available():
+        print("Η μορφή parquet απαιτεί pyarrow ή fastparquet", file=sys.stderr)
+        return 2
+
+    dtk_table = get_dtk_table()
+    if args.dtk_year not in dtk_table:
+        years = ", ".join(str(y) for y in sorted(dtk_table))
+        print(f"Δεν υπάρχει πίνακας ΔΤΚ για το έτος {args.dtk_year} (διαθέσιμα: {years})", file=sys.stderr)
+        return 2
+
+    files = collect_inputs(args.inputs)
+    if not files:
+        print("Δεν βρέθηκαν αρχεία PDF", file=sys.stderr)
+        return 2
+
+    options = {
+        'engine': resolve_parse_engine(args.engine),
+        'compact': args.compact,
+        'dtk_year': args.dtk_year,
+        'dtk_table': {args.dtk_year: dtk_table[args.dtk_year]},
+        'ceiling': CEILING_ALIASES[args.ceiling],
+        'funds': args.funds,
+        'formats': args.formats,
+    }
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    done = [0]
+    ndjson_path = os.path.join(args.output_dir, NDJSON_NAME) if 'ndjson' in args.formats else None
+    ndjson_lines = [0]
+
+    def progress(record):
+        done[0] += 1
+        if ndjson is not None:
+            # Κάθε αρχείο γράφεται μόλις ολοκληρωθεί (με τη σειρά ολοκλήρωσης)
+            ndjson_lines[0] += write_syntaksi_ndjson(syntaksi_lines(record), ndjson)
+        if args.quiet:
+            return
+        status = "OK " if record['status'] == 'ok' else "ΣΦΑΛΜΑ"
+        line = f"[{done[0]}/{len(files)}] {status} {record['file']} ({record['timings'].get('total', 0.0):.2f}s)"
+        if record['error']:
+            line += f": {record['error']}"
+        print(line, file=sys.stderr)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    started = time.perf_counter()
+    with (open(ndjson_path, "w", encoding="utf-8") if ndjson_path else contextlib.nullcontext()) as ndjson:
+        records = run_batch(files, args.output_dir, options, jobs, progress)
+    manifest = build_manifest(records, options, jobs, time.perf_counter() - started)
+    if ndjson_path:
+        manifest['ndjson'] = {'path': ndjson_path, 'lines': ndjson_lines[0]}
+
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+
+    totals = manifest['totals']
+    print(f"{totals['ok']}/{totals['files']} αρχεία σε {totals['wall_time']:.2f}s "
+          f"({totals['failed']} αποτυχίες) -> {manifest_path}", file=sys.stderr)
+    return 1 if totals['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+"""
+Benchmark της ανάλυσης (Tab 1-4) χωρίς Streamlit: πλαφόν, περικοπή, ετήσια σύνολα,
+ΔΤΚ και μορφοποίηση προβολής, ανά ταμείο (Κύρια / Επικουρική).
+
+Τρέχει σε συνθετικά df_monthly (--rows, 1k έως 1M γραμμές) ή σε καταγεγραμμένα
+(--input: PDF e-EFKA ή monthly.parquet / monthly.csv του batch_cli.py) και
+αναφέρει τον χρόνο και τη μέγιστη δέσμευση μνήμης (tracemalloc) ανά στάδιο.
+Τα caches (memo ανάλυσης, μορφοποίησης) αδειάζουν πριν από κάθε επανάληψη.
+
+Με --budget ελέγχει τα αποτελέσματα απέναντι σε όρια (benchmarks/analysis_budgets.json)
+και τερματίζει με κωδικό 1 αν κάποιο ξεπεραστεί:
+
+    python benchmarks/bench_analysis.py --rows 1000 10000 100000
+    python benchmarks/bench_analysis.py --rows 1000 100000 1000000 --budget
+    python benchmarks/bench_analysis.py --input statement.pdf --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+import pdf_parser  # noqa: E402
+from benchmarks.synthetic_statement import FIRST_YEAR, LAST_YEAR, SPECIAL_PAYMENTS  # noqa: E402
+from efka_core import (  # noqa: E402
+    DEFAULT_CEILING, DEFAULT_DTK_YEAR, FUNDS, SOURCE_KEY_ATTR, build_display_with_totals, ceiling_table,
+    clear_format_cache, clear_memo, compute_insurable, compute_pension, finalize_analysis_display,
+    format_df_for_display, get_dtk_table, prepare_monthly, slice_index,
+)
+
+DEFAULT_BUDGETS = os.path.join(ROOT, "benchmarks", "analysis_budgets.json")
+STAGES = [
+    "prepare_monthly", "slice_index", "compute_insurable", "compute_insurable_filtered",
+    "build_display_with_totals", "finalize_analysis_display", "compute_pension", "format_df_for_display",
+]
+# Φίλτρο τύπων που "σπάει" τις περιόδους με 04/05 (μερικός επαναϋπολογισμός)
+FILTERS = {'types': ['01', '03']}
+PENSION_FORMAT = {
+    'currency_cols': ['ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ', 'ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'],
+    'int_cols': ['ΗΜΕΡ. ΑΠΑΣΧ.'],
+    'float_cols_decimals': {'ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ': 5},
+}
+
+
+def synthetic_monthly(rows, employers=2, seed=0, special_ratio=0.8):
+    """
+    Συνθετικό df_monthly με το σχήμα του parse_efka_pdf, με την κατανομή του
+    synthetic_statement: ομάδες `employers` εργοδοτών για όλα τα έτη 2002-2024,
+    τακτικές αποδοχές (01) και ειδικές (04/05/03) τον Απρίλιο/Ιούνιο/Δεκέμβριο.
+    """
+    rng = np.random.default_rng(seed)
+    years = LAST_YEAR - FIRST_YEAR + 1
+    per_group = years * 12 * employers
+    regular = np.arange(-(-rows // per_group) * per_group)
+    emp = regular // per_group * employers + regular % employers
+    month = regular // employers % 12 + 1
+    year = FIRST_YEAR + regular // (employers * 12) % years
+    earnings = rng.uniform(400, 3500, len(regular))
+    days = rng.integers(10, 27, len(regular))
+
+    special = np.isin(month, list(SPECIAL_PAYMENTS)) & (rng.random(len(regular)) < special_ratio)
+    # Κάθε ειδική αμέσως μετά την τακτική γραμμή του ίδιου εργοδότη και μήνα
+    source = np.sort(np.concatenate([regular, regular[special]]), kind='stable')[:rows]
+    is_special = np.zeros(len(source), dtype=bool)
+    is_special[1:] = source[1:] == source[:-1]
+
+    type_codes = np.array(['01'] + [SPECIAL_PAYMENTS[m] for m in sorted(SPECIAL_PAYMENTS)])
+    special_slot = np.searchsorted(sorted(SPECIAL_PAYMENTS), month[source]) + 1
+    amounts = np.round(np.where(is_special, earnings[source] / 2, earnings[source]), 2)
+    periods = np.array([f"{m:02d}/{y}" for y in range(FIRST_YEAR, LAST_YEAR + 1) for m in range(1, 13)])
+    employer = emp[source]
+
+    df = pd.DataFrame({
+        'ΠΕΡΙΟΔΟΣ': periods[(year[source] - FIRST_YEAR) * 12 + month[source] - 1],
+        'ΚΩΔ. ΚΑΔ': (5610 + employer * 7).astype(str),
+        'ΚΩΔ. ΕΙΔΙΚ.': (913090 + employer).astype(str),
+        'ΚΩΔΙΚΟΣ ΕΙΔΙΚΗΣ ΠΕΡΙΠΤΩΣΗΣ': np.full(len(source), ''),
+        'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ': np.where(employer % 2 == 0, '1001', '1012'),
+        'ΗΜΕΡ. ΑΠΑΣΧ.': np.where(is_special, 0, days[source]),
+        'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ': type_codes[np.where(is_special, special_slot, 0)],
+        'ΑΠΟΔΟΧΕΣ': amounts,
+        'ΕΙΣΦΟΡΕΣ': np.round(amounts * 0.3387, 2),
+    })
+    df['ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ'] = df['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].map(pdf_parser.APODOXES_DESCRIPTIONS).fillna('Άγνωστος Κωδικός')
+    return df
+
+
+def load_recorded(path):
+    """df_monthly από PDF (parse_efka_pdf) ή από τα monthly.parquet / monthly.csv του batch_cli.py."""
+    if path.lower().endswith(".pdf"):
+        with open(path, "rb") as f:
+            return pdf_parser.parse_efka_pdf(f.read())[0]
+    if path.lower().endswith(".parquet"):
+        return pd.read_parquet(path)
+    text_columns = {col: str for col in pdf_parser.MONTHLY_COLUMNS + ['ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ']
+                    if col not in ('ΗΜΕΡ. ΑΠΑΣΧ.', 'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ')}
+    return pd.read_csv(path, dtype=text_columns, keep_default_na=False)
+
+
+def _run_pipeline(df_monthly, dtk_factors, stage_hook):
+    """Η ροή της εφαρμογής ανά ταμείο· stage_hook(ταμείο, στάδιο, συνάρτηση) εκτελεί κάθε στάδιο."""
+    ceilings = ceiling_table(DEFAULT_CEILING)
+    rows = {}
+    for fund, spec in FUNDS.items():
+        year_range = spec['year_range']
+
+        def stage(name, func, fund=fund):
+            return stage_hook(fund, name, func)
+
+        stage("prepare_monthly", lambda: prepare_monthly(df_monthly, year_range))
+        stage("slice_index", lambda: slice_index(df_monthly, ceilings, year_range))
+        df_analysis = stage("compute_insurable", lambda: compute_insurable(df_monthly, ceilings, year_range))
+        stage("compute_insurable_filtered", lambda: compute_insurable(df_monthly, ceilings, year_range, FILTERS))
+        display_df, yearly_totals = stage("build_display_with_totals", lambda: build_display_with_totals(df_analysis))
+        stage("finalize_analysis_display", lambda: finalize_analysis_display(display_df))
+        rows[fund] = len(df_analysis)
+        if yearly_totals.empty:
+            continue
+        pension_df, _ = stage("compute_pension", lambda: compute_pension(yearly_totals, dtk_factors, fund))
+        stage("format_df_for_display", lambda: format_df_for_display(pension_df, **PENSION_FORMAT))
+    return rows
+
+
+def _reset_caches():
+    clear_memo()
+    clear_format_cache()
+
+
+def run_case(name, df_monthly, repeat, allocations=True):
+    """Καλύτερος χρόνος ανά (ταμείο, στάδιο) σε `repeat` επαναλήψεις και δέσμευση μνήμης."""
+    df_monthly = df_monthly.copy(deep=False)
+    df_monthly.attrs[SOURCE_KEY_ATTR] = f"bench-analysis:{name}"
+    dtk_factors = get_dtk_table()[DEFAULT_DTK_YEAR]
+    timings = {fund: {} for fund in FUNDS}
+
+    def timed(fund, stage, func):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        timings[fund][stage] = min(elapsed, timings[fund].get(stage, elapsed))
+        return result
+
+    for _ in range(repeat):
+        _reset_caches()
+        analysis_rows = _run_pipeline(df_monthly, dtk_factors, timed)
+
+    alloc = {fund: {} for fund in FUNDS}
+    if allocations:
+        # Χωριστό πέρασμα: το tracemalloc επιβαρύνει τους χρόνους
+        def traced(fund, stage, func):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            result = func()
+            alloc[fund][stage] = tracemalloc.get_traced_memory()[1] - before
+            return result
+
+        _reset_caches()
+        tracemalloc.start()
+        try:
+            _run_pipeline(df_monthly, dtk_factors, traced)
+        finally:
+            tracemalloc.stop()
+    _reset_caches()
+
+    total = sum(seconds for stages in timings.values() for seconds in stages.values())
+    peak = max((value for stages in alloc.values() for value in stages.values()), default=None)
+    return {
+        "name": name,
+        "rows": len(df_monthly),
+        "analysis_rows": analysis_rows,
+        "stages_ms": {fund: {stage: round(seconds * 1000, 3) for stage, seconds in stages.items()}
+                      for fund, stages in timings.items()},
+        "alloc_peak_mib": {fund: {stage: round(value / 2 ** 20, 2) for stage, value in stages.items()}
+                           for fund, stages in alloc.items()},
+        "total_ms": round(total * 1000, 3),
+        "peak_alloc_mib": round(peak / 2 ** 20, 2) if peak is not None else None,
+        "rows_per_sec": round(len(df_monthly) / total, 1) if total else None,
+    }
+
+
+def stage_total_ms(case, stage):
+    return sum(stages.get(stage, 0.0) for stages in case["stages_ms"].values())
+
+
+def print_case(case):
+    funds = list(case["stages_ms"])
+    rows = ", ".join(f"{FUNDS[fund]['label']} {case['analysis_rows'].get(fund, 0)}" for fund in funds)
+    print(f"\n{case['name']}: {case['rows']} γραμμές (ανάλυση: {rows})")
+    print(f"  {'στάδιο':<28}" + "".join(f"{FUNDS[fund]['label']:>22}" for fund in funds))
+    for stage in STAGES:
+        cells = []
+        for fund in funds:
+            ms = case["stages_ms"][fund].get(stage)
+            mib = case["alloc_peak_mib"][fund].get(stage)
+            if ms is None:
+                cells.append(f"{'-':>22}")
+            else:
+                cells.append(f"{ms:10.1f} ms" + (f" {mib:7.1f} MiB" if mib is not None else " " * 11))
+        print(f"  {stage:<28}" + "".join(cells))
+    peak = f", μέγιστη δέσμευση {case['peak_alloc_mib']} MiB" if case["peak_alloc_mib"] is not None else ""
+    print(f"  σύνολο {case['total_ms']:.1f} ms ({case['rows_per_sec']} γραμμές/s){peak}")
+
+
+def check_budget(case, budget):
+    """
+    Λίστα υπερβάσεων για ένα case. budget: {"total_ms", "peak_alloc_mib" και
+    προαιρετικά όρια ανά στάδιο σε ms, αθροισμένα για όλα τα ταμεία}.
+    """
+    failures = []
+    for key, limit in budget.items():
+        if key == "total_ms":
+            value = case["total_ms"]
+        elif key == "peak_alloc_mib":
+            value = case["peak_alloc_mib"]
+            if value is None:
+                continue
+        elif key in STAGES:
+            value = stage_total_ms(case, key)
+        else:
+            raise ValueError(f"Άγνωστο όριο {key!r} για το {case['name']}")
+        if value > limit:
+            failures.append(f"{key}: {value:.1f} > {limit}")
+    return failures
+
+
+def load_budgets(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["cases"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="*", default=None,
+                        help="μεγέθη συνθετικών df_monthly (προεπιλογή 1000 10000 100000 χωρίς --input)")
+    parser.add_argument("--input", nargs="*", default=[], help="καταγεγραμμένα PDF / parquet / csv")
+    parser.add_argument("--employers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-alloc", action="store_true", help="χωρίς μέτρηση δεσμεύσεων (tracemalloc)")
+    parser.add_argument("--budget", nargs="?", const=DEFAULT_BUDGETS, metavar="PATH",
+                        help="έλεγχος ορίων (προεπιλογή benchmarks/analysis_budgets.json)")
+    parser.add_argument("--json", metavar="PATH", help="αποτελέσματα σε αρχείο JSON")
+    args = parser.parse_args(argv)
+    sizes = args.rows if args.rows is not None else ([] if args.input else [1000, 10000, 100000])
+
+    budgets = load_budgets(args.budget) if args.budget else {}
+    cases = []
+    failed = False
+    for name, load in (
+        [(f"synthetic-{rows}", lambda rows=rows: synthetic_monthly(rows, args.employers, args.seed)) for rows in sizes]
+        + [(os.path.basename(path), lambda path=path: load_recorded(path)) for path in args.input]
+    ):
+        case = run_case(name, load(), args.repeat, allocations=not args.no_alloc)
+        cases.append(case)
+        print_case(case)
+        if name in budgets:
+            failures = check_budget(case, budgets[name])
+            print("  όρια: " + ("ΑΠΟΤΥΧΙΑ, " + "; ".join(failures) if failures else "OK"))
+            failed |= bool(failures)
+        elif args.budget:
+            print("  όρια: δεν ορίζονται για αυτό το case")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"cases": cases}, f, ensure_ascii=False, indent=2)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Benchmark του parse_efka_pdf σε συνθετικά PDF (benchmarks/synthetic_statement.py).
+
+Για κάθε μέγεθος (σελίδες) μετρά χωριστά τα στάδια της ανάλυσης: extract_tables
+ανά σελίδα, ταξινόμηση γραμμών (ROW_CLASSIFIER.classify, που περιλαμβάνει και
+την κανονικοποίηση), normalize_detailed_row στις μηνιαίες και
+smart_summary_row_mapping στις ετήσιες γραμμές, δημιουργία DataFrame, και το
+parse_efka_pdf από άκρη σε άκρη. Αναφέρει σελίδες/s, γραμμές/s και μέγιστη
+RSS (κάθε μέγεθος τρέχει σε νέα διεργασία) και προσθέτει τα αποτελέσματα ως
+μία γραμμή JSON στο ιστορικό, με σύγκριση προς την προηγούμενη εκτέλεση.
+
+Με --workers N μετρά επιπλέον το parse_efka_pdf(workers=N) (με τον περιορισμό
+σε πυρήνες και σελίδες ανά διεργασία) και τον χρόνο εκκίνησης μίας διεργασίας
+του pool· ο λόγος του προς τον χρόνο ανά σελίδα είναι οι σελίδες ανά διεργασία
+από τις οποίες η παράλληλη ανάλυση αρχίζει να κερδίζει (PARALLEL_PAGES_PER_WORKER).
+
+    python benchmarks/bench_parser.py --pages 1 10 100 500
+    python benchmarks/bench_parser.py --pages 50 --baseline 82b6579 --no-save
+    python benchmarks/bench_parser.py --pages 12 50 --workers 4 --no-save
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+import pdfplumber  # noqa: E402
+
+import pdf_parser  # noqa: E402
+from benchmarks.synthetic_statement import MAX_PAGES, generate_statement  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+DEFAULT_HISTORY = os.path.join(ROOT, "benchmarks", "history", "bench_parser.jsonl")
+STAGES = [
+    "extract_tables", "classify", "normalize_detailed_row",
+    "smart_summary_row_mapping", "dataframes", "parse_efka_pdf",
+]
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _time_stages(pdf_bytes, engine):
+    """Ένα πέρασμα όλων των σταδίων· επιστρέφει (χρόνοι σε s, πλήθη γραμμών)."""
+    timings = dict.fromkeys(STAGES, 0.0)
+    table_rows = []
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            start = time.perf_counter()
+            tables = page.extract_tables(pdf_parser.TABLE_SETTINGS)
+            timings["extract_tables"] += time.perf_counter() - start
+            page.close()
+            table_rows.extend((row, row_idx > 0) for table in tables for row_idx, row in enumerate(table))
+
+    classify = pdf_parser.ROW_CLASSIFIER.classify
+    start = time.perf_counter()
+    classified = [(classify(row, allow_annual), row) for row, allow_annual in table_rows]
+    timings["classify"] = time.perf_counter() - start
+
+    rows = {"monthly": [], "annual": []}
+    raw_rows = {"monthly": [], "annual": []}
+    for (kind, processed_row), row in classified:
+        if kind:
+            rows[kind].append(processed_row)
+            raw_rows[kind].append(row)
+
+    start = time.perf_counter()
+    for row in raw_rows["monthly"]:
+        pdf_parser.normalize_detailed_row(row)
+    timings["normalize_detailed_row"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for row in raw_rows["annual"]:
+        pdf_parser.smart_summary_row_mapping(row)
+    timings["smart_summary_row_mapping"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    df_monthly = pdf_parser.build_monthly_dataframe(rows["monthly"])
+    df_annual = pdf_parser.build_annual_dataframe(rows["annual"])
+    timings["dataframes"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed_monthly, parsed_annual = pdf_parser.parse_efka_pdf(pdf_bytes, workers=1, engine=engine)
+    timings["parse_efka_pdf"] = time.perf_counter() - start
+
+    counts = {
+        "table_rows": len(table_rows),
+        "monthly_rows": len(parsed_monthly),
+        "annual_rows": len(parsed_annual),
+        # Τα στάδια πρέπει να δίνουν ό,τι και το parse_efka_pdf (μηχανή tables)
+        "stages_match_parser": engine != "tables" or (
+            df_monthly.equals(parsed_monthly) and df_annual.equals(parsed_annual)
+        ),
+    }
+    return timings, counts
+
+
+def _worker_startup(workers, pdf_bytes, engine):
+    """
+    Σταθερό κόστος (s) ανά διεργασία της παράλληλης ανάλυσης: εκκίνηση του pool
+    και άνοιγμα του PDF στα δύο εύρη της κάθε διεργασίας, χωρίς σελίδες.
+    """
+    start = time.perf_counter()
+    with pdf_parser._process_pool(workers, pdf_bytes, engine) as executor:
+        list(executor.map(pdf_parser._extract_page_range, [(0, 0)] * (workers * 2)))
+    return (time.perf_counter() - start) / workers
+
+
+def _time_parallel(pdf_bytes, engine, workers, repeat, serial_time, pages):
+    parallel_time = min(
+        _timed(pdf_parser.parse_efka_pdf, pdf_bytes, workers=workers, engine=engine) for _ in range(repeat)
+    )
+    startup = min(_worker_startup(workers, pdf_bytes, engine) for _ in range(repeat))
+    return {
+        "workers": workers,
+        "cpus": pdf_parser.available_cpus(),
+        "effective_workers": pdf_parser.parallel_workers(pdf_parser.resolve_parse_workers(workers), pages),
+        "parse_efka_pdf": round(parallel_time, 6),
+        "speedup": round(serial_time / parallel_time, 2) if parallel_time else None,
+        "worker_startup": round(startup, 6),
+        "break_even_pages_per_worker": round(startup / (serial_time / pages), 1) if serial_time else None,
+    }
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def run_case(pages, employers, seed, repeat, engine, workers=1):
+    """Ένα μέγεθος PDF: καλύτερος χρόνος ανά στάδιο σε `repeat` επαναλήψεις."""
+    statement = generate_statement(pages=pages, employers=employers, seed=seed)
+    best = None
+    for _ in range(repeat):
+        timings, counts = _time_stages(statement.pdf_bytes, engine)
+        best = timings if best is None else {stage: min(best[stage], timings[stage]) for stage in STAGES}
+
+    total = best["parse_efka_pdf"]
+    rows = counts["monthly_rows"] + counts["annual_rows"]
+    parallel = _time_parallel(statement.pdf_bytes, engine, workers, repeat, total, pages) if workers > 1 else None
+    return {
+        "pages": pages,
+        "pdf_bytes": len(statement.pdf_bytes),
+        "expected_monthly_rows": statement.monthly_rows,
+        "expected_annual_rows": statement.annual_rows,
+        **counts,
+        "stages": {stage: round(seconds, 6) for stage, seconds in best.items()},
+        "pages_per_sec": round(pages / total, 2) if total else None,
+        "rows_per_sec": round(rows / total, 1) if total else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "parallel": parallel,
+    }
+
+
+def run_isolated(pages, employers, seed, repeat, engine, workers=1):
+    """Το run_case σε νέα διεργασία, ώστε η μέγιστη RSS να αφορά μόνο αυτό το μέγεθος."""
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as executor:
+        return executor.submit(run_case, pages, employers, seed, repeat, engine, workers).result()
+
+
+def _git(*args):
+    try:
+        result = subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def environment_info():
+    status = _git("status", "--porcelain", "--untracked-files=no")
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(status) if status is not None else None,
+        "parser_version": pdf_parser.PARSER_VERSION,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "pdfplumber": pdfplumber.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path, record):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def find_baseline(history, record, commit=None):
+    """Η πιο πρόσφατη συγκρίσιμη εκτέλεση (ίδια μηχανή/seed/εργοδότες), προαιρετικά από commit."""
+    for previous in reversed(history):
+        if any(previous["params"].get(key) != record["params"][key] for key in ("engine", "seed", "employers")):
+            continue
+        if commit and not (previous["env"].get("commit") or "").startswith(commit):
+            continue
+        return previous
+    return None
+
+
+def print_case(case):
+    stages = case["stages"]
+    print(f"\n{case['pages']} σελίδες ({case['pdf_bytes'] / 1024:.0f} KiB), "
+          f"{case['monthly_rows']} μηνιαίες / {case['annual_rows']} ετήσιες γραμμές, "
+          f"{case['table_rows']} γραμμές πινάκων")
+    for stage in STAGES:
+        print(f"  {stage:<27} {stages[stage] * 1000:10.1f} ms")
+    rss = f"{case['peak_rss_mb']} MiB" if case["peak_rss_mb"] is not None else "-"
+    print(f"  {case['pages_per_sec']} σελίδες/s, {case['rows_per_sec']} γραμμές/s, μέγιστη RSS {rss}")
+    expected = (case["expected_monthly_rows"], case["expected_annual_rows"])
+    if (case["monthly_rows"], case["annual_rows"]) != expected:
+        print(f"  ΠΡΟΣΟΧΗ: αναμένονταν {expected[0]} μηνιαίες / {expected[1]} ετήσιες γραμμές")
+    if not case["stages_match_parser"]:
+        print("  ΠΡΟΣΟΧΗ: τα στάδια δεν δίνουν το ίδιο αποτέλεσμα με το parse_efka_pdf")
+    parallel = case.get("parallel")
+    if parallel:
+        print(f"  workers={parallel['workers']} ({parallel['effective_workers']} σε χρήση, "
+              f"{parallel['cpus']} πυρήνες): {parallel['parse_efka_pdf'] * 1000:.1f} ms, "
+              f"{parallel['speedup']}x έναντι σειριακής")
+        print(f"  εκκίνηση διεργασίας {parallel['worker_startup'] * 1000:.0f} ms "
+              f"≈ {parallel['break_even_pages_per_worker']} σελίδες")
+
+
+def print_comparison(record, baseline):
+    env = baseline["env"]
+    print(f"\nΣύγκριση με {env.get('commit') or '?'} ({env.get('timestamp')}): χρόνος νέος/παλιός")
+    previous_cases = {case["pages"]: case for case in baseline["cases"]}
+    for case in record["cases"]:
+        previous = previous_cases.get(case["pages"])
+        if previous is None:
+            continue
+        ratios = []
+        for stage in STAGES:
+            old, new = previous["stages"].get(stage), case["stages"][stage]
+            if old:
+                ratios.append(f"{stage} {new / old:.2f}x")
+        print(f"  {case['pages']} σελίδες: " + ", ".join(ratios))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 10, 50],
+                        help=f"μεγέθη PDF σε σελίδες (1-{MAX_PAGES})")
+    parser.add_argument("--employers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--engine", choices=pdf_parser.PARSE_ENGINES, default="tables",
+                        help="μηχανή εξαγωγής για το parse_efka_pdf")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="μέτρηση και της παράλληλης ανάλυσης με τόσες διεργασίες (> 1)")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="αρχείο ιστορικού (JSON Lines)")
+    parser.add_argument("--baseline", metavar="COMMIT",
+                        help="σύγκριση με την τελευταία εκτέλεση αυτού του commit (προεπιλογή: η τελευταία)")
+    parser.add_argument("--no-save", action="store_true", help="χωρίς εγγραφή στο ιστορικό")
+    args = parser.parse_args(argv)
+    if any(not 1 <= pages <= MAX_PAGES for pages in args.pages):
+        parser.error(f"οι σελίδες πρέπει να είναι από 1 έως {MAX_PAGES}")
+
+    record = {
+        "env": environment_info(),
+        "params": {
+            "engine": args.engine, "seed": args.seed, "employers": args.employers, "repeat": args.repeat,
+            "workers": args.workers,
+        },
+        "cases": [],
+    }
+    for pages in sorted(set(args.pages)):
+        case = run_isolated(pages, args.employers, args.seed, args.repeat, args.engine, args.workers)
+        record["cases"].append(case)
+        print_case(case)
+
+    baseline = find_baseline(load_history(args.history), record, args.baseline)
+    if baseline is not None:
+        print_comparison(record, baseline)
+    if not args.no_save:
+        append_history(args.history, record)
+        print(f"\nΑποθηκεύτηκε στο {args.history}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+Γεννήτρια συνθετικών PDF τύπου e-EFKA (ΑΤΟΜΙΚΟΣ ΛΟΓΑΡΙΑΣΜΟΣ) για benchmarks.
+
+Γράφει απευθείας PDF χωρίς εξωτερικές βιβλιοθήκες: γραμματοσειρά σταθερού
+πλάτους με προσαρμοσμένο encoding (ονόματα glyph uniXXXX), ώστε το pdfplumber
+να εξάγει σωστά τους ελληνικούς χαρακτήρες. Η συνοπτική κατάσταση (ετήσιες
+γραμμές, μερικές σπασμένες σε δύο γραμμές στο ΠΑΚ. ΚΑΛ.) ακολουθείται από την
+αναλυτική (μηνιαίες γραμμές πολλών εργοδοτών, ειδικές αποδοχές 03/04/05 και
+γραμμές με μετατοπισμένα ποσά) μέχρι να γεμίσουν οι ζητούμενες σελίδες.
+
+    python benchmarks/synthetic_statement.py 50 > statement.pdf
+"""
+import argparse
+import itertools
+import random
+import sys
+from collections import namedtuple
+
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+FONT_SIZE = 7
+CHAR_WIDTH = 600  # σταθερό πλάτος 600/1000 em
+LINE_HEIGHT = 11
+TOP_MARGIN = 40
+BOTTOM_MARGIN = 40
+MAX_PAGES = 500
+
+# Στήλες: (γραμμές επικεφαλίδας, x αρχής)
+MONTHLY_LAYOUT = [
+    (("ΠΕΡΙΟΔΟΣ",), 30),
+    (("ΚΩΔ.", "ΚΑΔ"), 95),
+    (("ΚΩΔ.", "ΕΙΔΙΚ."), 150),
+    (("ΚΩΔΙΚΟΣ", "ΕΙΔΙΚΗΣ", "ΠΕΡΙΠΤΩΣΗΣ"), 205),
+    (("ΚΩΔ.", "ΠΑΚΕΤΟ", "ΚΑΛΥΨΗΣ"), 285),
+    (("ΗΜΕΡ.", "ΑΠΑΣΧ."), 355),
+    (("ΑΠΟ",), 410),
+    (("ΕΩΣ",), 470),
+    (("ΤΥΠΟΣ", "ΑΠΟΔΟΧΩΝ"), 530),
+    (("ΑΠΟΔΟΧΕΣ",), 610),
+    (("ΕΙΣΦΟΡΕΣ",), 700),
+]
+ANNUAL_LAYOUT = [
+    (("ΕΤΟΣ",), 30),
+    (("ΠΑΚ.", "ΚΑΛ."), 80),
+    (("ΠΕΡΙΓΡΑΦΗ",), 130),
+    (("ΑΠΟΔΟΧΕΣ",), 430),
+    (("ΗΜΕΡ.", "ΑΠΑΣΧ."), 520),
+    (("ΗΜΕΡ.", "ΠΡΟΣ."), 580),
+    (("ΚΑΤΑΣΤΑΣΗ",), 640),
+]
+SECTIONS = {
+    'annual': ("ΣΥΝΟΠΤΙΚΗ ΚΑΤΑΣΤΑΣΗ", ANNUAL_LAYOUT),
+    'monthly': ("ΑΝΑΛΥΤΙΚΗ ΚΑΤΑΣΤΑΣΗ ΑΣΦΑΛΙΣΗΣ", MONTHLY_LAYOUT),
+}
+
+PACKAGES = {
+    '1001': 'ΙΚΑ ΕΤΑΜ ΚΥΡΙΑ ΣΥΝΤΑΞΗ',
+    '1012': 'ΕΤΕΑΕΠ ΕΠΙΚΟΥΡΙΚΗ ΣΥΝΤΑΞΗ',
+    '1043': 'ΑΣΘΕΝΕΙΑ ΣΕ ΕΙΔΟΣ',
+}
+# Ειδικές αποδοχές ανά μήνα: Δώρο Πάσχα, Επίδομα αδείας, Δώρο Χριστουγέννων
+SPECIAL_PAYMENTS = {4: '04', 6: '05', 12: '03'}
+FIRST_YEAR = 2002
+LAST_YEAR = 2024
+# Μετατόπιση (pt) των ποσών στις μετατοπισμένες γραμμές
+SHIFT = 40
+# Σπασμένη ετήσια γραμμή: τα κελιά κλιμακώνονται ανά 0,6pt (έως 3pt, μία γραμμή
+# και για τη μηχανή λέξεων) ώστε το extract_tables να τα κρατά σε μία γραμμή
+# πίνακα, και το δεύτερο τμήμα του ΠΑΚ. ΚΑΛ. 4pt χαμηλότερα γίνεται δεύτερη
+# γραμμή κειμένου στο ίδιο κελί ('1001\n1012')
+SPLIT_STEP = 0.6
+SPLIT_OFFSET = 4.0
+SPLIT_HEIGHT = 6
+
+SyntheticStatement = namedtuple("SyntheticStatement", ["pdf_bytes", "monthly_rows", "annual_rows"])
+
+
+def format_amount(value):
+    """Μορφοποίηση ποσού σε ελληνικό format (1.234,56)."""
+    return f"{value:,.2f}".translate(str.maketrans(",.", ".,"))
+
+
+class _PdfWriter:
+    """Ελάχιστος συγγραφέας PDF με μία γραμματοσειρά σταθερού πλάτους."""
+
+    def __init__(self):
+        self.pages = []
+        self.codes = {}
+        self.next_code = 128
+
+    def _encode(self, text):
+        out = bytearray()
+        for ch in text:
+            cp = ord(ch)
+            if 32 <= cp < 127:
+                if ch in "()\\":
+                    out += b"\\"
+                out.append(cp)
+                continue
+            if ch not in self.codes:
+                if self.next_code > 255:
+                    raise ValueError("Πάρα πολλοί μη-ASCII χαρακτήρες για ένα encoding")
+                self.codes[ch] = self.next_code
+                self.next_code += 1
+            out += b"\\%03o" % self.codes[ch]
+        return bytes(out)
+
+    def add_page(self, items):
+        """items: λίστα (x, y, text) με y από πάνω προς τα κάτω."""
+        ops = [b"BT", b"/F1 %d Tf" % FONT_SIZE]
+        for x, y, text in items:
+            ops.append(b"1 0 0 1 %.2f %.2f Tm (%s) Tj" % (x, PAGE_HEIGHT - y, self._encode(text)))
+        ops.append(b"ET")
+        self.pages.append(b"\n".join(ops))
+
+    def tobytes(self):
+        differences = " ".join(
+            f"{code} /uni{ord(ch):04X}" for ch, code in sorted(self.codes.items(), key=lambda kv: kv[1])
+        )
+        widths = " ".join([str(CHAR_WIDTH)] * 224)
+        kids = " ".join(f"{4 + 2 * i} 0 R" for i in range(len(self.pages)))
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self.pages)} >>".encode(),
+            (
+                "<< /Type /Font /Subtype /Type1 /BaseFont /EfkaMono "
+                f"/Encoding << /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences [{differences}] >> "
+                f"/FirstChar 32 /LastChar 255 /Widths [{widths}] /FontDescriptor {4 + 2 * len(self.pages)} 0 R >>"
+            ).encode(),
+        ]
+        for i, content in enumerate(self.pages):
+            objects.append(
+                (
+                    f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                    f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>"
+                ).encode()
+            )
+            objects.append(b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream")
+        objects.append(
+            b"<< /Type /FontDescriptor /FontName /EfkaMono /Flags 33 /FontBBox [-23 -250 715 805] "
+            b"/ItalicAngle 0 /Ascent 629 /Descent -157 /CapHeight 562 /StemV 51 >>"
+        )
+
+        out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for idx, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % idx + body + b"\nendobj\n"
+        xref_pos = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        for offset in offsets:
+            out += b"%010d 00000 n \n" % offset
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_pos)
+        return bytes(out)
+
+
+def _annual_lines(rng, years, split_ratio):
+    """Ετήσιες γραμμές: ('annual', τιμές, δεύτερο τμήμα ΠΑΚ. ΚΑΛ. ή None)."""
+    for year in years:
+        for package, description in PACKAGES.items():
+            values = [str(year), package, description, format_amount(rng.uniform(5000, 40000)),
+                      str(rng.randint(150, 300)), str(rng.randint(150, 300)), "ΟΡ"]
+            split = package[::-1] if rng.random() < split_ratio else None
+            yield 'annual', values, split
+
+
+def _monthly_lines(rng, years, employers, special_ratio, shifted_ratio):
+    """
+    Μηνιαίες γραμμές χωρίς τέλος: ομάδες `employers` εργοδοτών για όλα τα έτη,
+    με νέους εργοδότες σε κάθε ομάδα. ('monthly', τιμές, μετατοπισμένη).
+    """
+    for group in itertools.count():
+        for year in years:
+            for month in range(1, 13):
+                period = f"{month:02d}/{year}"
+                for emp in range(group * employers, (group + 1) * employers):
+                    kad = str(5610 + emp * 7)
+                    eidik = str(913090 + emp)
+                    package = '1001' if emp % 2 == 0 else '1012'
+                    earnings = rng.uniform(400, 3500)
+                    payments = [(str(rng.randint(10, 26)), '01', earnings)]
+                    if month in SPECIAL_PAYMENTS and rng.random() < special_ratio:
+                        payments.append(("", SPECIAL_PAYMENTS[month], earnings / 2))
+                    for days, type_code, amount in payments:
+                        values = [period, kad, eidik, "", package, days, "", "", type_code,
+                                  format_amount(amount), format_amount(amount * 0.3387)]
+                        yield 'monthly', values, rng.random() < shifted_ratio
+
+
+def _header_items(kind, y):
+    title, layout = SECTIONS[kind]
+    items = [(30, y, title)]
+    y += LINE_HEIGHT + 4
+    for labels, x in layout:
+        for line_no, label in enumerate(labels):
+            items.append((x, y + line_no * LINE_HEIGHT, label))
+    depth = max(len(labels) for labels, _ in layout)
+    return items, y + depth * LINE_HEIGHT + 4
+
+
+def _row_items(kind, values, extra, y):
+    """Στοιχεία κειμένου μίας γραμμής και το ύψος της."""
+    layout = SECTIONS[kind][1]
+    if kind == 'annual':
+        if extra is None:
+            return [(x, y, value) for (_, x), value in zip(layout, values)], LINE_HEIGHT
+        items = [(x, y + min(col, 5) * SPLIT_STEP, value) for col, ((_, x), value) in enumerate(zip(layout, values))]
+        items.append((layout[1][1], y + SPLIT_OFFSET, extra))
+        return items, LINE_HEIGHT + SPLIT_HEIGHT
+    shift = SHIFT if extra else 0
+    items = [(x + (shift if col >= 9 else 0), y, value)
+             for col, ((_, x), value) in enumerate(zip(layout, values)) if value]
+    return items, LINE_HEIGHT
+
+
+def generate_statement(pages=10, employers=2, seed=0, special_ratio=0.8, shifted_ratio=0.05,
+                       split_ratio=0.1, years=None):
+    """
+    Συνθετικό PDF με ακριβώς `pages` σελίδες (1 έως MAX_PAGES).
+
+    years: πλήθος ετών από το 2002 (προεπιλογή ένα ανά σελίδα, έως το 2024).
+    Όταν τα έτη δεν αρκούν για να γεμίσουν οι σελίδες, προστίθενται νέες
+    ομάδες `employers` εργοδοτών. Επιστρέφει SyntheticStatement με τα bytes
+    και το πλήθος των γραμμών που πρέπει να εξαγάγει ο parser.
+    """
+    if not 1 <= pages <= MAX_PAGES:
+        raise ValueError(f"Οι σελίδες πρέπει να είναι από 1 έως {MAX_PAGES}")
+    rng = random.Random(seed)
+    if years is None:
+        years = min(pages, LAST_YEAR - FIRST_YEAR + 1)
+    year_range = range(FIRST_YEAR, FIRST_YEAR + years)
+    # Η συνοπτική κατάσταση μόνο όταν μένει σελίδα για την αναλυτική
+    lines = itertools.chain(
+        _annual_lines(rng, year_range if pages > 1 else (), split_ratio),
+        _monthly_lines(rng, year_range, employers, special_ratio, shifted_ratio),
+    )
+
+    writer = _PdfWriter()
+    counts = {'monthly': 0, 'annual': 0}
+    bottom = PAGE_HEIGHT - BOTTOM_MARGIN
+    items, y, section = [], 0, None
+    for kind, values, extra in lines:
+        row, height = _row_items(kind, values, extra, 0)
+        if kind != section or y + height > bottom:
+            # Κάθε ενότητα ξεκινά σε νέα σελίδα (στην ίδια σελίδα το extract_tables
+            # ενώνει τις στήλες των δύο πινάκων), με την επικεφαλίδα της σε κάθε σελίδα
+            if items:
+                writer.add_page(items)
+                if len(writer.pages) == pages:
+                    break
+            items, y = _header_items(kind, TOP_MARGIN)
+            section = kind
+        items += [(x, y + dy, text) for x, dy, text in row]
+        y += height
+        counts[kind] += 1
+
+    return SyntheticStatement(writer.tobytes(), counts['monthly'], counts['annual'])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages", type=int, nargs="?", default=5)
+    parser.add_argument("--employers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    statement = generate_statement(pages=args.pages, employers=args.employers, seed=args.seed)
+    sys.stdout.buffer.write(statement.pdf_bytes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Υπολογιστικός πυρήνας της ανάλυσης e-EFKA, χωρίς εξάρτηση από το Streamlit.
+
+Πίνακες πλαφόν και ΔΤΚ, μηχανή εισφορίσιμων αποδοχών, συντάξιμες αποδοχές /
+εξαγορά, φίλτρα, μορφοποίηση/αναφορές, εξαγωγή για το Syntaksi Pro και
+διαγνωστικά χρόνου/μνήμης (efka_core.diagnostics, efka_core.profiling).
+Χρησιμοποιείται από το streamlit_app.py και το batch_cli.py.
+
+Τα DataFrames του πυρήνα μοιράζονται χωρίς αντίγραφα (βλ. efka_core.frames)·
+στο pandas 2.x οι εφαρμογές καλούν μία φορά το enable_copy_on_write().
+"""
+from efka_core.ceilings import (
+    CEILING_TABLES, DEFAULT_CEILING, ceiling_table, insurable_ceiling_new, insurable_ceiling_old,
+)
+from efka_core.diagnostics import (
+    DIAGNOSTICS_LOG_ENV, Recorder, active_recorder, bind_context, configure_log, phase, recording, set_recorder, span,
+)
+from efka_core.dtk import DTK_TABLE_PATH, DtkFactors, DtkTable, get_dtk_table, load_dtk_table
+from efka_core.export import build_syntaksi_json, syntaksi_json, write_syntaksi_json, write_syntaksi_ndjson
+from efka_core.filters import build_filters, filter_options, package_descriptions
+from efka_core.formatting import (
+    apply_left_align, clear_format_cache, finalize_analysis_display, format_currency_gr, format_df_for_display,
+    format_number_column_gr, format_number_gr, format_percent_gr, round_float_columns, round_numeric_columns,
+)
+from efka_core.frames import enable_copy_on_write, nbytes, table_hash, view
+from efka_core.insurable import (
+    SOURCE_KEY_ATTR, SliceIndex, apply_filters, build_display_with_totals, clear_memo, compute_insurable,
+    memo_stats, prepare_monthly, slice_index, source_key, yearly_totals,
+)
+from efka_core.pension import (
+    DAYS_PER_MONTH, DEFAULT_DTK_YEAR, FUNDS, compute_pension,
+)
+from efka_core.profiling import PROFILE_DIR_ENV, PROFILE_ENV, ProfileRun, artifact_path, profile_enabled, profile_run
+from efka_core.report import (
+    dataframe_to_printable_html, html_open_in_new_tab_component, iter_table_html, write_printable_html,
+)
+from efka_core.scenarios import (
+    NO_BUYOUT, SCENARIO_COLUMNS, Buyout, evaluate_scenarios, scenario_comparison, scenario_yearly_totals,
+)
+
+__all__ = [
+    'CEILING_TABLES', 'DAYS_PER_MONTH', 'DEFAULT_CEILING', 'DEFAULT_DTK_YEAR', 'DIAGNOSTICS_LOG_ENV',
+    'DTK_TABLE_PATH', 'DtkFactors', 'DtkTable', 'FUNDS', 'NO_BUYOUT', 'PROFILE_DIR_ENV', 'PROFILE_ENV',
+    'ProfileRun', 'Recorder', 'SCENARIO_COLUMNS', 'SOURCE_KEY_ATTR', 'Buyout', 'SliceIndex', 'active_recorder',
+    'apply_filters', 'apply_left_align', 'artifact_path', 'bind_context', 'build_display_with_totals',
+    'build_filters', 'build_syntaksi_json', 'ceiling_table', 'clear_format_cache', 'clear_memo',
+    'compute_insurable', 'compute_pension', 'configure_log', 'dataframe_to_printable_html', 'enable_copy_on_write',
+    'evaluate_scenarios', 'filter_options', 'finalize_analysis_display', 'format_currency_gr',
+    'format_df_for_display', 'format_number_column_gr', 'format_number_gr', 'format_percent_gr', 'get_dtk_table',
+    'html_open_in_new_tab_component', 'insurable_ceiling_new', 'insurable_ceiling_old', 'iter_table_html',
+    'load_dtk_table', 'memo_stats', 'nbytes', 'package_descriptions', 'phase', 'prepare_monthly', 'profile_enabled',
+    'profile_run', 'recording', 'round_float_columns', 'round_numeric_columns', 'scenario_comparison',
+    'scenario_yearly_totals', 'set_recorder', 'slice_index', 'source_key', 'span', 'syntaksi_json', 'table_hash',
+    'view', 'write_printable_html', 'write_syntaksi_json', 'write_syntaksi_ndjson', 'yearly_totals',
+]
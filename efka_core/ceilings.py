@@ -0,0 +1,31 @@
+"""
+Πίνακες βασικού πλαφόν εισφορίσιμων αποδοχών ανά έτος.
+"""
+
+insurable_ceiling_old = {
+    '2002': 1884.75, '2003': 1960.25, '2004': 2058.25, '2005': 2140.50, '2006': 2226.00,
+    '2007': 2315.00, '2008': 2384.50, '2009': 2432.25, '2010': 2432.25, '2011': 2432.25,
+    '2012': 2432.25, '2013': 5546.80, '2014': 5546.80, '2015': 5546.80, '2016': 5861.00,
+    '2017': 5861.00, '2018': 5861.00, '2019': 6500.00, '2020': 6500.00, '2021': 6500.00,
+    '2022': 6500.00, '2023': 7126.94, '2024': 7126.94, '2025': 7572.62, '2026': 7572.62
+}
+
+insurable_ceiling_new = {
+    '2002': 4693.52, '2003': 4693.52, '2004': 4693.52, '2005': 4881.26, '2006': 5076.51,
+    '2007': 5279.57, '2008': 5437.96, '2009': 5543.55, '2010': 5543.55, '2011': 5543.55,
+    '2012': 5546.80, '2013': 5546.80, '2014': 5546.80, '2015': 5546.80, '2016': 5861.00,
+    '2017': 5861.00, '2018': 5861.00, '2019': 6500.00, '2020': 6500.00, '2021': 6500.00,
+    '2022': 6500.00, '2023': 7126.94, '2024': 7126.94, '2025': 7572.62, '2026': 7572.62
+}
+
+CEILING_TABLES = {'Παλιός': insurable_ceiling_old, 'Νέος': insurable_ceiling_new}
+
+DEFAULT_CEILING = 'Παλιός'
+
+
+def ceiling_table(name):
+    """Πίνακας πλαφόν {έτος (str): βασικό πλαφόν} με βάση το όνομα (Παλιός/Νέος)."""
+    try:
+        return CEILING_TABLES[name]
+    except KeyError:
+        raise ValueError(f"Άγνωστος πίνακας πλαφόν: {name!r} (επιλογές: {', '.join(CEILING_TABLES)})") from None
@@ -0,0 +1,225 @@
+"""
+Διαγνωστικά χρόνου και μνήμης: spans (context managers) γύρω από τα στάδια
+της ανάλυσης, των υπολογισμών ανά καρτέλα, των αναφορών και των εξαγωγών.
+
+    with span("parse.pages", engine="tables") as s:
+        ...
+        s.set(rows=len(rows))
+
+Κάθε span καταγράφει διάρκεια, πλήθος γραμμών, μεταβολή της RSS και όσα πεδία
+προστεθούν· τα εμφωλευμένα spans κρατούν το όνομα του γονικού. Με phase() ένα
+εσωτερικό στάδιο που επαναλαμβάνεται (π.χ. extract_tables ανά σελίδα)
+αθροίζεται ως πεδίο <όνομα>_ms του τρέχοντος span αντί για χωριστές εγγραφές.
+
+Οι εγγραφές πηγαίνουν στον ενεργό Recorder (set_recorder / recording, ένας ανά
+συνεδρία της εφαρμογής) και στον logger "efka.diagnostics" ως μία γραμμή JSON
+ανά span. Με EFKA_DIAGNOSTICS_LOG οι γραμμές προστίθενται σε αρχείο (JSON Lines)
+για συγκέντρωση από πολλές συνεδρίες/διεργασίες. Χωρίς Recorder και χωρίς
+logger σε επίπεδο INFO το span δεν μετρά τίποτα.
+
+Η RSS αφορά όλη τη διεργασία (στον server του Streamlit και τις ταυτόχρονες
+συνεδρίες) και διαβάζεται μόνο σε Linux (/proc/self/statm). Στην παράλληλη
+ανάλυση οι σελίδες τρέχουν σε άλλες διεργασίες: μετρά μόνο ο συνολικός χρόνος.
+"""
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import logging
+import os
+import time
+from collections import deque
+
+DIAGNOSTICS_LOG_ENV = "EFKA_DIAGNOSTICS_LOG"
+LOGGER_NAME = "efka.diagnostics"
+# Μέγιστο πλήθος spans που κρατά ένας Recorder (τα παλαιότερα απορρίπτονται)
+MAX_SPANS = 2000
+
+_logger = logging.getLogger(LOGGER_NAME)
+_line_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+_recorder = contextvars.ContextVar("efka_diagnostics_recorder", default=None)
+_current = contextvars.ContextVar("efka_diagnostics_span", default=None)
+
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE = 4096
+
+
+def rss_bytes():
+    """Τρέχουσα RSS της διεργασίας σε bytes (None εκτός Linux)."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Recorder:
+    """Τα τελευταία spans μιας συνεδρίας· κάθε εκτέλεση (rerun) παίρνει αύξοντα αριθμό run."""
+
+    def __init__(self, session=None, max_spans=MAX_SPANS):
+        self.session = session
+        self.run = 0
+        self.spans = deque(maxlen=max_spans)
+
+    def new_run(self):
+        self.run += 1
+        return self.run
+
+    def records(self, run=None):
+        """Οι εγγραφές (λεξικά) με σειρά ολοκλήρωσης, προαιρετικά μόνο μίας εκτέλεσης."""
+        return [record for record in list(self.spans) if run is None or record["run"] == run]
+
+    def to_ndjson(self, run=None):
+        """Οι εγγραφές ως JSON Lines (ίδια μορφή με το αρχείο του EFKA_DIAGNOSTICS_LOG)."""
+        return "".join(_line_encoder.encode(record) + "\n" for record in self.records(run))
+
+
+class Span:
+    """Ένα ενεργό span: set() για γραμμές/πεδία, add_time() για αθροιστικά εσωτερικά στάδια."""
+    __slots__ = ("name", "parent", "rows", "fields", "times")
+
+    def __init__(self, name, parent, rows, fields):
+        self.name = name
+        self.parent = parent
+        self.rows = rows
+        self.fields = fields
+        self.times = {}
+
+    def set(self, rows=None, **fields):
+        if rows is not None:
+            self.rows = rows
+        self.fields.update(fields)
+
+    def add_time(self, key, seconds):
+        self.times[key] = self.times.get(key, 0.0) + seconds
+
+
+class _NullSpan:
+    """Το span όταν δεν γίνεται καταγραφή: όλες οι κλήσεις αγνοούνται."""
+    __slots__ = ()
+
+    def set(self, rows=None, **fields):
+        pass
+
+    def add_time(self, key, seconds):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+def set_recorder(recorder):
+    """Ενεργός Recorder για το τρέχον context (νήμα)· None απενεργοποιεί την καταγραφή."""
+    _recorder.set(recorder)
+
+
+def active_recorder():
+    return _recorder.get()
+
+
+@contextlib.contextmanager
+def recording(recorder):
+    """Ο recorder ενεργός μόνο μέσα στο with."""
+    token = _recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder.reset(token)
+
+
+def bind_context(func):
+    """
+    Το func ώστε να τρέχει στο τρέχον context (Recorder, γονικό span) ακόμη κι
+    αν κληθεί αργότερα από άλλο νήμα, π.χ. δεδομένα κατ' απαίτηση ενός download_button.
+    """
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+def _emit(record, recorder):
+    if recorder is not None:
+        recorder.spans.append(record)
+    if _logger.isEnabledFor(logging.INFO):
+        _logger.info(_line_encoder.encode({"pid": os.getpid(), **record}))
+
+
+@contextlib.contextmanager
+def span(name, rows=None, **fields):
+    """Μετρά το μπλοκ with ως span· επιστρέφει Span (ή NULL_SPAN χωρίς καταγραφή)."""
+    recorder = _recorder.get()
+    if recorder is None and not _logger.isEnabledFor(logging.INFO):
+        yield NULL_SPAN
+        return
+
+    parent = _current.get()
+    current = Span(name, parent.name if parent is not None else None, rows, fields)
+    token = _current.set(current)
+    started_at = datetime.datetime.now(datetime.timezone.utc)
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    error = None
+    try:
+        yield current
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _current.reset(token)
+        rss_after = rss_bytes()
+        record = {
+            "ts": started_at.isoformat(timespec="milliseconds"),
+            "session": recorder.session if recorder is not None else None,
+            "run": recorder.run if recorder is not None else None,
+            "name": name,
+            "parent": current.parent,
+            "duration_ms": round(duration * 1000, 3),
+            "rows": current.rows,
+            "rss_mb": round(rss_after / 2 ** 20, 1) if rss_after is not None else None,
+            "rss_delta_mb": round((rss_after - rss_before) / 2 ** 20, 2) if rss_after is not None else None,
+        }
+        record.update((f"{key}_ms", round(seconds * 1000, 3)) for key, seconds in current.times.items())
+        record.update(current.fields)
+        if error is not None:
+            record["error"] = error
+        _emit(record, recorder)
+
+
+@contextlib.contextmanager
+def phase(key):
+    """Προσθέτει τη διάρκεια του μπλοκ στο πεδίο <key>_ms του τρέχοντος span (αν υπάρχει)."""
+    current = _current.get()
+    if current is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        current.add_time(key, time.perf_counter() - started)
+
+
+def configure_log(path=None):
+    """
+    Γραμμές JSON του logger σε αρχείο (append): path ή EFKA_DIAGNOSTICS_LOG.
+    Επιστρέφει τον handler (None αν δεν ορίστηκε αρχείο)· δεύτερη κλήση για το
+    ίδιο αρχείο δεν προσθέτει νέο handler.
+    """
+    path = path or os.environ.get(DIAGNOSTICS_LOG_ENV)
+    if not path:
+        return None
+    path = os.path.abspath(path)
+    for handler in _logger.handlers:
+        if isinstance(handler, logging.FileHandler) and handler.baseFilename == path:
+            return handler
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _logger.addHandler(handler)
+    _logger.setLevel(logging.INFO)
+    return handler
+
+
+configure_log()
@@ -0,0 +1,144 @@
+"""
+Συντελεστές ΔΤΚ (αναπροσαρμογής) ανά έτος αναφοράς και έτος εισφοράς.
+
+Ο πίνακας κρατείται ως πυκνός 2-D πίνακας NumPy (έτος αναφοράς × έτος
+εισφοράς, NaN όπου δεν υπάρχει συντελεστής), ώστε η αναζήτηση για πολλά έτη
+να είναι μία κλήση fancy indexing αντί για lookups σε dict από dicts.
+"""
+import json
+import os
+import threading
+from collections.abc import Mapping
+
+import numpy as np
+
+# Το dtk_table.json βρίσκεται στη ρίζα του repository
+DTK_TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dtk_table.json")
+
+# Συντελεστής για έτη χωρίς τιμή στον πίνακα
+DEFAULT_FACTOR = 1.0
+
+
+def _lookup(rows, first_year, years, default):
+    # rows: 1-D (ένα έτος αναφοράς) ή 2-D (έτη αναφοράς × έτη εισφοράς)
+    years = np.asarray(years, dtype=np.float64)
+    positions = years - first_year
+    valid = (positions >= 0) & (positions < rows.shape[-1]) & (np.floor(positions) == positions)
+    out = np.full(rows.shape[:-1] + years.shape, default, dtype=np.float64)
+    values = rows[..., positions[valid].astype(np.intp)]
+    out[..., valid] = np.where(np.isnan(values), default, values)
+    return out
+
+
+class DtkFactors(Mapping):
+    """
+    Συντελεστές ενός έτους αναφοράς ως {έτος εισφοράς: συντελεστής} (μόνο
+    ανάγνωση), πάνω σε μία γραμμή του πυκνού πίνακα.
+    """
+
+    def __init__(self, row, first_year):
+        self._row = row
+        self._first_year = first_year
+
+    @classmethod
+    def from_mapping(cls, factors):
+        """Από απλό dict {έτος: συντελεστής}."""
+        if not factors:
+            return cls(np.empty(0, dtype=np.float64), 0)
+        first, last = min(factors), max(factors)
+        row = np.full(last - first + 1, np.nan)
+        for year, value in factors.items():
+            row[year - first] = value
+        return cls(row, first)
+
+    def lookup(self, years, default=DEFAULT_FACTOR):
+        """Συντελεστές (ndarray float64) για πίνακα ετών· default όπου δεν υπάρχει τιμή."""
+        return _lookup(self._row, self._first_year, years, default)
+
+    def __getitem__(self, year):
+        if isinstance(year, (int, np.integer)):
+            pos = year - self._first_year
+            if 0 <= pos < len(self._row) and not np.isnan(self._row[pos]):
+                return float(self._row[pos])
+        raise KeyError(year)
+
+    def __iter__(self):
+        for pos in np.flatnonzero(~np.isnan(self._row)):
+            yield int(pos) + self._first_year
+
+    def __len__(self):
+        return int(np.count_nonzero(~np.isnan(self._row)))
+
+    def __repr__(self):
+        return f"DtkFactors({dict(self)!r})"
+
+
+class DtkTable(Mapping):
+    """
+    Πίνακας ΔΤΚ: {έτος αναφοράς: DtkFactors}, με τα δεδομένα στο πυκνό
+    `factors` (έτη αναφοράς `reference_years` × έτη εισφοράς από `first_year`).
+    """
+
+    def __init__(self, data):
+        self.reference_years = sorted(data)
+        contribution_years = [year for factors in data.values() for year in factors]
+        self.first_year = min(contribution_years) if contribution_years else 0
+        width = max(contribution_years) - self.first_year + 1 if contribution_years else 0
+        self.factors = np.full((len(self.reference_years), width), np.nan)
+        for idx, ref_year in enumerate(self.reference_years):
+            for year, value in data[ref_year].items():
+                self.factors[idx, year - self.first_year] = value
+        self.factors.setflags(write=False)
+        self._index = {ref_year: idx for idx, ref_year in enumerate(self.reference_years)}
+
+    def lookup(self, ref_year, years, default=DEFAULT_FACTOR):
+        """Συντελεστές του έτους αναφοράς ref_year για πίνακα ετών εισφοράς."""
+        return _lookup(self.factors[self._index[ref_year]], self.first_year, years, default)
+
+    def lookup_matrix(self, ref_years, years, default=DEFAULT_FACTOR):
+        """Πίνακας συντελεστών (έτη αναφοράς × έτη εισφοράς) με ένα fancy indexing."""
+        rows = self.factors[[self._index[ref_year] for ref_year in ref_years]]
+        return _lookup(rows, self.first_year, years, default)
+
+    def __getitem__(self, ref_year):
+        return DtkFactors(self.factors[self._index[ref_year]], self.first_year)
+
+    def __contains__(self, ref_year):
+        return ref_year in self._index
+
+    def __iter__(self):
+        return iter(self.reference_years)
+
+    def __len__(self):
+        return len(self.reference_years)
+
+
+def load_dtk_table(path=DTK_TABLE_PATH):
+    """Φόρτωση πίνακα ΔΤΚ από εξωτερικό JSON αρχείο (dtk_table.json)."""
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    # Μετατροπή κλειδιών σε int (έτος αναφοράς & έτος εισφοράς)
+    return DtkTable(
+        {int(ref_year): {int(k): v for k, v in factors.items()} for ref_year, factors in raw["data"].items()}
+    )
+
+
+_loaded = {}
+_loaded_lock = threading.Lock()
+
+
+def get_dtk_table(path=DTK_TABLE_PATH):
+    """
+    Ο πίνακας ΔΤΚ, φορτωμένος μία φορά ανά διεργασία· ξαναφορτώνεται μόνο αν
+    αλλάξει το αρχείο (mtime/μέγεθος).
+    """
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _loaded_lock:
+        cached = _loaded.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    table = load_dtk_table(path)
+    with _loaded_lock:
+        _loaded[path] = (signature, table)
+    return table
@@ -0,0 +1,86 @@
+"""
+Εξαγωγή για το Syntaksi Pro.
+
+Τα δεδομένα (ika_{έτος}, apodoxes_{έτος}, εξαγορά, ΔΤΚ) χτίζονται από τις
+στήλες του πίνακα συντάξιμων αποδοχών σε ένα πέρασμα και γράφονται κομμάτι-κομμάτι
+σε αρχείο ή buffer: ως ένα έγγραφο JSON (η λήψη της εφαρμογής) ή ως NDJSON,
+μία γραμμή ανά πελάτη/ταμείο για μαζικές εξαγωγές (batch_cli.py).
+"""
+import io
+import json
+
+import pandas as pd
+
+from efka_core.diagnostics import span
+
+# Η γραμμή της εξαγοράς στον πίνακα του compute_pension (δεν είναι έτος)
+BUYOUT_ROW = "ΕΞΑΓΟΡΑ"
+JSON_INDENT = 2
+
+_document_encoder = json.JSONEncoder(indent=JSON_INDENT, ensure_ascii=False)
+_line_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _number(value):
+    return {"value": value, "type": "number"}
+
+
+def build_syntaksi_json(pension_df, dtk_year, buyout_days=0, buyout_amount=0.0, buyout_dtk=1.0):
+    """Δεδομένα JSON για το Syntaksi Pro (χωρίς τη γραμμή ΕΞΑΓΟΡΑ στα έτη)."""
+    earnings = pension_df['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ']
+    if all(pd.api.types.is_numeric_dtype(dtype) for dtype in pension_df.dtypes):
+        # Αριθμητικός πίνακας (χωρίς γραμμή ΕΞΑΓΟΡΑ): στρογγυλοποίηση NumPy, όπως
+        # έδινε το round σε τιμές np.float64 ανά γραμμή
+        earnings = earnings.to_numpy(dtype=float).round(2).tolist()
+    else:
+        earnings = [round(value, 2) for value in earnings.tolist()]
+
+    json_data = {}
+    for year, days, rounded in zip(pension_df['ΕΤΟΣ'].tolist(), pension_df['ΗΜΕΡ. ΑΠΑΣΧ.'].tolist(), earnings):
+        if year == BUYOUT_ROW:
+            continue
+        year_str = str(int(year)) if isinstance(year, (int, float)) else str(year)
+        # ika_YYYY = ΗΜΕΡ. ΑΠΑΣΧ., apodoxes_YYYY = ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ
+        json_data[f"ika_{year_str}"] = _number(int(days))
+        json_data[f"apodoxes_{year_str}"] = _number(rounded)
+
+    # Εξαγορά, ΔΤΚ αναφοράς και έτος εθνικής
+    json_data["eksagorasmenes_imeres"] = _number(int(buyout_days))
+    json_data["synoliko_poso_eksagoras"] = _number(round(buyout_amount, 2))
+    json_data["dtk_eksagoras"] = _number(round(buyout_dtk, 5))
+    json_data["dtk"] = _number(int(dtk_year))
+    json_data["etos_ethnikis"] = _number(int(dtk_year))
+    return json_data
+
+
+def write_syntaksi_json(json_data, out):
+    """Γράφει το έγγραφο JSON (indent=2, όπως το json.dump) στο out κομμάτι-κομμάτι."""
+    for chunk in _document_encoder.iterencode(json_data):
+        out.write(chunk)
+
+
+def syntaksi_json(pension_df, dtk_year, buyout_days=0, buyout_amount=0.0, buyout_dtk=1.0):
+    """Το αρχείο JSON του Syntaksi Pro ως κείμενο (για λήψη κατ' απαίτηση)."""
+    with span("export.syntaksi_json", rows=len(pension_df)) as export_span:
+        buffer = io.StringIO()
+        write_syntaksi_json(build_syntaksi_json(pension_df, dtk_year, buyout_days, buyout_amount, buyout_dtk), buffer)
+        doc = buffer.getvalue()
+        export_span.set(chars=len(doc))
+    return doc
+
+
+def write_syntaksi_ndjson(records, out):
+    """
+    Μαζική εξαγωγή: μία γραμμή JSON ανά εγγραφή (π.χ. {"file", "fund", "syntaksi"})
+    από οποιοδήποτε iterable, χωρίς να κρατείται όλο το αρχείο στη μνήμη.
+    Επιστρέφει το πλήθος των γραμμών.
+    """
+    with span("export.syntaksi_ndjson") as export_span:
+        count = 0
+        for record in records:
+            for chunk in _line_encoder.iterencode(record):
+                out.write(chunk)
+            out.write("\n")
+            count += 1
+        export_span.set(rows=count)
+    return count
@@ -0,0 +1,62 @@
+"""
+Επιλογές και προδιαγραφές φίλτρων (έτη, τύποι αποδοχών, πακέτα κάλυψης) για
+τους πίνακες ανάλυσης· οι προδιαγραφές εφαρμόζονται από το insurable.apply_filters.
+"""
+
+
+def package_descriptions(df_annual):
+    """Περιγραφή ανά κωδικό πακέτου κάλυψης από τα συνοπτικά (ετήσια) δεδομένα."""
+    if df_annual is None or df_annual.empty:
+        return {}
+    return (
+        df_annual.dropna(subset=['ΠΑΚ. ΚΑΛ.'])
+        .groupby('ΠΑΚ. ΚΑΛ.')['ΠΕΡΙΓΡΑΦΗ']
+        .first()
+        .to_dict()
+    )
+
+
+def filter_options(df_analysis, type_descriptions, package_desc_map):
+    """
+    Διαθέσιμες τιμές φίλτρων από τα δεδομένα ανάλυσης (prepare_monthly):
+    years (ταξινομημένα), types και packages ως {κωδικός: ετικέτα}.
+    """
+    years = sorted([y for y in df_analysis['ΕΤΟΣ'].dropna().unique()])
+
+    type_codes = sorted([str(t) for t in df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].dropna().unique()])
+    types = {
+        code: f"{code} - {type_descriptions.get(code, 'Άγνωστη Περιγραφή')}"
+        for code in type_codes
+    }
+
+    package_codes = sorted([str(p) for p in df_analysis['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].dropna().unique()])
+    packages = {
+        code: f"{code} - {package_desc_map.get(code, '').strip()}" if package_desc_map.get(code) else code
+        for code in package_codes
+    }
+    return {'years': years, 'types': types, 'packages': packages}
+
+
+def build_filters(available_years, year_from=None, year_to=None, types=None, packages=None):
+    """
+    Προδιαγραφή φίλτρων για το apply_filters. year_from/year_to None σημαίνει
+    χωρίς όριο (πρώτο/τελευταίο διαθέσιμο έτος)· αντεστραμμένο εύρος διορθώνεται.
+    """
+    filters = {}
+    if year_from is not None or year_to is not None:
+        min_year = available_years[0] if available_years else None
+        max_year = available_years[-1] if available_years else None
+        from_year = year_from if year_from is not None else min_year
+        to_year = year_to if year_to is not None else max_year
+        if from_year and to_year and from_year > to_year:
+            from_year, to_year = to_year, from_year
+        if from_year and to_year:
+            filters['years'] = (from_year, to_year)
+
+    if types:
+        filters['types'] = list(types)
+
+    if packages:
+        filters['packages'] = list(packages)
+
+    return filters
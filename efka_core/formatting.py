@@ -0,0 +1,222 @@
+"""
+Μορφοποίηση αριθμών και πινάκων για προβολή (ελληνικό format, στρογγυλοποίηση).
+
+Οι πίνακες μορφοποιούνται ανά στήλη (format_number_column_gr): κάθε διακριτή
+τιμή μορφοποιείται μία φορά και το αποτέλεσμα του format_df_for_display
+κρατείται σε cache ανά (hash πίνακα, στήλες μορφοποίησης).
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from efka_core.frames import per_value, table_hash, view
+
+# Στήλες ποσών του πίνακα ανάλυσης που στρογγυλοποιούνται στα 2 δεκαδικά
+ANALYSIS_AMOUNT_COLUMNS = [
+    'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ',
+    'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'
+]
+# Στήλες του πίνακα ανάλυσης όπου τα μηδενικά εμφανίζονται κενά
+ANALYSIS_HIDE_ZERO_COLUMNS = ['ΗΜΕΡ. ΑΠΑΣΧ.', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ']
+
+# Ελληνικό format: '.' για χιλιάδες, ',' για δεκαδικά
+_GR_SEPARATORS = str.maketrans(",.", ".,")
+
+FORMAT_CACHE_MAX_ENTRIES = 16
+
+_format_cache = OrderedDict()
+_format_cache_lock = threading.Lock()
+
+
+def clear_format_cache():
+    with _format_cache_lock:
+        _format_cache.clear()
+
+
+def format_number_gr(value, decimals=2):
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    try:
+        num = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if num == 0:
+        return ""
+    return f"{num:,.{decimals}f}".translate(_GR_SEPARATORS)
+
+
+def format_currency_gr(value):
+    formatted = format_number_gr(value, 2)
+    return f"€{formatted}" if formatted != "" else ""
+
+
+def format_percent_gr(value):
+    formatted = format_number_gr(value, 2)
+    return f"{formatted}%" if formatted != "" else ""
+
+
+def _format_fixed_gr(values, decimals, prefix="", suffix=""):
+    """prefix + f"{v:,.{decimals}f}" (ελληνικό format) + suffix για πίνακα float χωρίς NaN, με πράξεις NumPy."""
+    # Ακέραιες πράξεις μόνο όπου η στρογγυλοποίηση είναι σαφής· οι σχεδόν ισοπαλίες
+    # (x,5 μετά την κλίμακα), οι πολύ μεγάλες τιμές και τα inf μορφοποιούνται με format
+    scaled = np.abs(values) * 10.0 ** decimals
+    bounded = (scaled < 2.0 ** 40) & (decimals <= 12)
+    scaled = np.where(bounded, scaled, 0.0)
+    units = np.rint(scaled)
+    fast = bounded & (0.5 - np.abs(scaled - units) > 1e-3)
+    units = np.where(fast, units, 0).astype(np.int64)
+
+    # Χαρακτήρες ASCII (γραμμή ανά τιμή) γραμμένοι από δεξιά: δεκαδικά, ',', ψηφία με '.' ανά τριάδα
+    int_digits = len(str(int(units.max(initial=0)) // 10 ** min(decimals, 12)))
+    width = 1 + int_digits + (int_digits - 1) // 3 + (decimals + 1 if decimals else 0)
+    chars = np.full((len(values), width), ord(" "), dtype=np.uint8)
+    col = width - 1
+    for _ in range(decimals):
+        chars[:, col] = ord("0") + units % 10
+        units //= 10
+        col -= 1
+    if decimals:
+        chars[:, col] = ord(",")
+        col -= 1
+    for digit in range(int_digits):
+        if digit and digit % 3 == 0:
+            chars[:, col] = np.where(units > 0, ord("."), ord(" "))
+            col -= 1
+        chars[:, col] = np.where((units > 0) | (digit == 0), ord("0") + units % 10, ord(" "))
+        units //= 10
+        col -= 1
+    # Το '-' αμέσως πριν από το πρώτο ψηφίο
+    negative = np.flatnonzero(values < 0)
+    chars[negative, (chars[negative] == ord(" ")).sum(axis=1) - 1] = ord("-")
+
+    texts = np.char.lstrip(chars.view(f"S{width}")[:, 0]).astype(str)
+    if prefix or suffix:
+        texts = np.char.add(np.char.add(prefix, texts), suffix)
+    texts = texts.astype(object)
+    slow = ~fast
+    texts[slow] = [prefix + f"{v:,.{decimals}f}".translate(_GR_SEPARATORS) + suffix for v in values[slow]]
+    return texts
+
+
+def format_number_column_gr(series, decimals=2, prefix="", suffix=""):
+    """
+    Το format_number_gr για όλη τη στήλη (κενά τα μηδενικά/NaN), με πρόθεμα/επίθημα
+    στα μη κενά (π.χ. '€', '%'). Οι αριθμητικές στήλες μορφοποιούνται με πράξεις
+    NumPy, οι υπόλοιπες μία φορά ανά διακριτή τιμή.
+    """
+    if series.empty:
+        # Όπως το Series.apply: κενή στήλη μένει με τον τύπο της
+        return series
+    if not (isinstance(series.dtype, np.dtype) and series.dtype.kind in "biuf"):
+        # Στήλες κειμένου ή μικτές: η λογική ανά τιμή του format_number_gr
+        def format_value(value):
+            text = format_number_gr(value, decimals)
+            return f"{prefix}{text}{suffix}" if text else ""
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Το map σε category εφαρμόζεται ήδη ανά κατηγορία
+            return series.map(format_value)
+        texts = per_value(series, lambda values: values.map(format_value))
+        # Το factorize ενώνει None/NaN/pd.NA: αυτά τα κελιά μορφοποιούνται ένα-ένα
+        missing = series.isna()
+        if missing.any():
+            texts[missing] = series[missing].map(format_value)
+        return texts.astype(str)
+
+    values = series.to_numpy(dtype=float)
+    shown = ~np.isnan(values) & (values != 0)
+    texts = np.full(len(values), "", dtype=object)
+    if shown.any():
+        texts[shown] = _format_fixed_gr(values[shown], decimals, prefix, suffix)
+    return pd.Series(texts, index=series.index, name=series.name).astype(str)
+
+
+def apply_left_align(styler):
+    return styler.set_properties(**{'text-align': 'left'}).set_table_styles(
+        [{'selector': 'th', 'props': [('text-align', 'left')]}]
+    )
+
+
+def format_df_for_display(
+    df,
+    currency_cols=None,
+    int_cols=None,
+    percent_cols=None,
+    float_cols_decimals=None,
+):
+    """Πίνακας κειμένων σε ελληνικό format (ποσά σε €, ποσοστά, ακέραιοι, σταθερά δεκαδικά)."""
+    currency_cols = set(currency_cols or [])
+    int_cols = set(int_cols or [])
+    percent_cols = set(percent_cols or [])
+    float_cols_decimals = float_cols_decimals or {}
+
+    key = (
+        table_hash(df), frozenset(currency_cols), frozenset(int_cols), frozenset(percent_cols),
+        frozenset(float_cols_decimals.items()),
+    )
+    with _format_cache_lock:
+        if key in _format_cache:
+            _format_cache.move_to_end(key)
+            return view(_format_cache[key])
+
+    df_display = view(df)
+    for col in df_display.columns:
+        if col in currency_cols:
+            df_display[col] = format_number_column_gr(df_display[col], 2, prefix="€")
+        elif col in percent_cols:
+            df_display[col] = format_number_column_gr(df_display[col], 2, suffix="%")
+        elif col in int_cols:
+            df_display[col] = format_number_column_gr(df_display[col], 0)
+        elif col in float_cols_decimals:
+            df_display[col] = format_number_column_gr(df_display[col], float_cols_decimals[col])
+        else:
+            df_display[col] = df_display[col].where(pd.notna(df_display[col]), "")
+            df_display[col] = df_display[col].astype(str)
+
+    with _format_cache_lock:
+        _format_cache[key] = df_display
+        while len(_format_cache) > FORMAT_CACHE_MAX_ENTRIES:
+            _format_cache.popitem(last=False)
+    return view(df_display)
+
+
+def round_float_columns(df, decimals=2):
+    df_out = view(df)
+    float_cols = df_out.select_dtypes(include=["float"]).columns
+    if len(float_cols) > 0:
+        df_out[float_cols] = df_out[float_cols].round(decimals)
+    return df_out
+
+
+def round_numeric_columns(df, columns, decimals=2):
+    """Στρογγυλοποίηση των αριθμητικών τιμών των στηλών· οι υπόλοιπες (π.χ. '') μένουν ως έχουν."""
+    df_out = view(df)
+    for col in columns:
+        if col not in df_out.columns:
+            continue
+        values = df_out[col]
+        if pd.api.types.is_numeric_dtype(values.dtype):
+            df_out[col] = values.round(decimals)
+            continue
+        numeric_values = pd.to_numeric(values, errors="coerce")
+        is_number = numeric_values.notna().to_numpy()
+        if is_number.all():
+            df_out[col] = numeric_values.round(decimals)
+        else:
+            # Μικτή στήλη: αντικατάσταση μόνο των αριθμών, χωρίς where ανά στοιχείο σε object
+            rounded = values.to_numpy(dtype=object, copy=True)
+            rounded[is_number] = numeric_values.round(decimals).to_numpy()[is_number]
+            df_out[col] = pd.Series(rounded, index=values.index, name=col, dtype=object)
+    return df_out
+
+
+def finalize_analysis_display(display_df):
+    """Στρογγυλοποίηση ποσών και απόκρυψη μηδενικών στον πίνακα ανάλυσης (build_display_with_totals)."""
+    display_df = round_float_columns(display_df)
+    display_df = round_numeric_columns(display_df, columns=ANALYSIS_AMOUNT_COLUMNS, decimals=2)
+    # Κρύβουμε τα μηδενικά μόνο στις συγκεκριμένες στήλες
+    for col in ANALYSIS_HIDE_ZERO_COLUMNS:
+        if col in display_df.columns:
+            display_df[col] = display_df[col].replace(0, '')
+    return display_df
@@ -0,0 +1,73 @@
+"""
+Κοινόχρηστα DataFrames χωρίς αντίγραφα και μέτρηση μνήμης.
+
+Τα δεδομένα μιας ανάλυσης (parse cache, memo του compute_insurable) μοιράζονται
+μεταξύ reruns και χρηστών. Με Copy-on-Write (πάντα ενεργό από το pandas 3) ένα
+`df.copy(deep=False)` είναι φθηνή όψη: οι αλλαγές στην όψη δεν αγγίζουν ποτέ το
+κοινό DataFrame, οπότε οι αμυντικές `.copy()` δεν χρειάζονται.
+
+Για στήλες category (βλ. pdf_parser.compact_monthly_dataframe) οι πράξεις
+κειμένου γίνονται μία φορά ανά διακριτή τιμή (per_value, as_str). Τα caches
+αποτελεσμάτων (αναφορές, μορφοποίηση) έχουν κλειδί το table_hash του πίνακα.
+"""
+import hashlib
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+def enable_copy_on_write():
+    """Ενεργοποίηση Copy-on-Write στο pandas 2.x (στο pandas 3 είναι ήδη ενεργό)."""
+    if int(pd.__version__.split('.')[0]) < 3:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def view(df):
+    """Φθηνή όψη του df (ίδια δεδομένα, δικές της στήλες/attrs)."""
+    return df.copy(deep=False)
+
+
+def nbytes(value):
+    """Κατά προσέγγιση μνήμη (bytes) ενός αντικειμένου: DataFrame, Series, ndarray, bytes, containers."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(nbytes(k) + nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(nbytes(v) for v in value)
+    # Π.χ. UploadedFile του Streamlit: το μέγεθος του αρχείου
+    size = getattr(value, 'size', None)
+    if isinstance(size, int):
+        return size
+    return sys.getsizeof(value)
+
+
+def per_value(series, func):
+    """
+    func(Series) μία φορά ανά διακριτή τιμή του series, απλωμένο στις γραμμές·
+    ίδιο αποτέλεσμα με το func(series) για πράξεις στοιχείο-προς-στοιχείο.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    return func(pd.Series(uniques)).iloc[codes].set_axis(series.index).rename(series.name)
+
+
+def as_str(series):
+    """series.astype(str)· για category η μετατροπή γίνεται ανά κατηγορία, όχι ανά γραμμή."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return per_value(series, lambda values: values.astype(str))
+    return series.astype(str)
+
+
+def table_hash(df):
+    """Ταυτότητα περιεχομένου ενός πίνακα (στήλες, τύποι, τιμές)."""
+    digest = hashlib.sha256()
+    digest.update(repr([(str(col), str(dtype)) for col, dtype in df.dtypes.items()]).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
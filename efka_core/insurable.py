@@ -0,0 +1,528 @@
+"""
+Υπολογισμός εισφορίσιμων αποδοχών (πλαφόν) από τα αναλυτικά μηνιαία δεδομένα.
+
+Κοινή μηχανή για Κύρια και Επικουρική (και για κάθε επόμενο ταμείο): η ανάλυση
+γίνεται με μία ομαδοποίηση ανά ΠΕΡΙΟΔΟΣ και τα αποτελέσματα κρατιούνται σε
+cache με κλειδί (ταυτότητα δεδομένων, πίνακας πλαφόν, εύρος ετών, φίλτρα).
+Ό,τι δεν εξαρτάται από τα φίλτρα υπολογίζεται μία φορά ανά αρχείο (SliceIndex),
+ώστε μια αλλαγή φίλτρων να ξαναϋπολογίζει μόνο τις περιόδους που επηρεάζει.
+
+Τα δύο επίπεδα κρατιούνται χωριστά: τα δεδομένα ανά αρχείο (για τα
+MEMO_MAX_SOURCES πιο πρόσφατα αρχεία) δεν εκτοπίζονται από τα αποτελέσματα
+ανά φίλτρα, που μοιράζονται ένα όριο μνήμης (MEMO_MAX_BYTES).
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from efka_core.frames import as_str, nbytes, per_value, view
+
+# Στο df.attrs: ταυτότητα των δεδομένων (το κλειδί του parse cache)
+SOURCE_KEY_ATTR = "source_key"
+
+# Τύποι αποδοχών με δικό τους πλαφόν: 03 = ολόκληρο, 04/05 = μισό
+FULL_CEILING_TYPES = ('03',)
+HALF_CEILING_TYPES = ('04', '05')
+SPECIAL_TYPES = FULL_CEILING_TYPES + HALF_CEILING_TYPES
+SPECIAL_DESCRIPTION_PATTERN = r'δώρο|επίδομα\s+αδείας'
+# Ημέρες μήνα για την αναλογία του πλαφόν
+FULL_MONTH_DAYS = 25
+
+# Αρχεία (source key) με cached προετοιμασμένα δεδομένα και SliceIndex
+MEMO_MAX_SOURCES = 8
+# Μνήμη για τα αποτελέσματα ανά φίλτρα, όλων των αρχείων μαζί
+MEMO_MAX_BYTES = 64 * 1024 * 1024
+
+_sources = OrderedDict()  # source key -> {κλειδί: προετοιμασμένα δεδομένα / SliceIndex}
+_results = OrderedDict()  # (source key, ...) -> (nbytes, αποτέλεσμα)
+_results_bytes = 0
+_memo_lock = threading.Lock()
+
+
+def source_key(df):
+    """Ταυτότητα των δεδομένων: από το df.attrs ή, αν λείπει, hash του περιεχομένου."""
+    key = df.attrs.get(SOURCE_KEY_ATTR)
+    if key is None:
+        hashed = pd.util.hash_pandas_object(df, index=True).to_numpy()
+        key = hashlib.sha256(hashed.tobytes()).hexdigest()
+    return key
+
+
+def _filters_key(filters):
+    filters = filters or {}
+    years = filters.get('years')
+    return (
+        tuple(years) if years else None,
+        tuple(sorted(filters.get('types') or ())),
+        tuple(sorted(filters.get('packages') or ())),
+    )
+
+
+def _value_nbytes(value):
+    return value.nbytes if isinstance(value, SliceIndex) else nbytes(value)
+
+
+def _drop_result(key):
+    global _results_bytes
+    size, _ = _results.pop(key)
+    _results_bytes -= size
+
+
+def _source_memoized(source, key, compute):
+    """Cache ανά αρχείο για ό,τι δεν εξαρτάται από τα φίλτρα (LRU ως προς τα αρχεία)."""
+    with _memo_lock:
+        entries = _sources.get(source)
+        if entries is not None and key in entries:
+            _sources.move_to_end(source)
+            return entries[key]
+    result = compute()
+    with _memo_lock:
+        _sources.setdefault(source, {})[key] = result
+        _sources.move_to_end(source)
+        while len(_sources) > MEMO_MAX_SOURCES:
+            evicted, _ = _sources.popitem(last=False)
+            # Μαζί φεύγουν και τα αποτελέσματα του αρχείου
+            for result_key in [k for k in _results if k[0] == evicted]:
+                _drop_result(result_key)
+    return result
+
+
+def _result_memoized(key, compute):
+    """Cache αποτελεσμάτων ανά φίλτρα (κλειδί: (source key, ...)), με όριο MEMO_MAX_BYTES."""
+    global _results_bytes
+    with _memo_lock:
+        if key in _results:
+            _results.move_to_end(key)
+            return _results[key][1]
+    result = compute()
+    size = _value_nbytes(result)
+    with _memo_lock:
+        if key in _results:
+            _drop_result(key)
+        _results[key] = (size, result)
+        _results_bytes += size
+        while _results and _results_bytes > MEMO_MAX_BYTES:
+            _drop_result(next(iter(_results)))
+    return result
+
+
+def clear_memo():
+    global _results_bytes
+    with _memo_lock:
+        _sources.clear()
+        _results.clear()
+        _results_bytes = 0
+
+
+def memo_stats():
+    """Πλήθος εγγραφών και μνήμη (bytes, κατά προσέγγιση) του memo, συνολικά και ανά επίπεδο."""
+    with _memo_lock:
+        source_values = [value for entries in _sources.values() for value in entries.values()]
+        source_count = len(_sources)
+        result_count = len(_results)
+        result_bytes = _results_bytes
+    source_bytes = sum(_value_nbytes(value) for value in source_values)
+    return {
+        'entries': len(source_values) + result_count,
+        'bytes': source_bytes + result_bytes,
+        'sources': source_count,
+        'source_bytes': source_bytes,
+        'results': result_count,
+        'result_bytes': result_bytes,
+    }
+
+
+def _prepare(df_monthly, year_range):
+    df = view(df_monthly)
+    # Κανονικοποίηση και parsing μία φορά ανά διακριτή περίοδο, όχι ανά γραμμή
+    codes, periods = pd.factorize(df['ΠΕΡΙΟΔΟΣ'], use_na_sentinel=False)
+    period_str = pd.Series(periods).astype(str).str.strip()
+    # Κανονικοποίηση μήνα σε 2 ψηφία για σταθερό parsing (π.χ. 1/2003 -> 01/2003)
+    period_str = period_str.str.replace(r'^(\d{1})/', r'0\1/', regex=True)
+    period_dt = pd.to_datetime(period_str, format='%m/%Y', errors='coerce')
+    year_str = period_dt.dt.year.astype('Int64').astype(str)
+    df['ΠΕΡΙΟΔΟΣ'] = period_str.iloc[codes].set_axis(df.index)
+    df['ΕΤΟΣ'] = year_str.iloc[codes].set_axis(df.index)
+    if year_range:
+        first, last = year_range
+        df = df[df['ΕΤΟΣ'].isin([str(y) for y in range(int(first), int(last) + 1)])]
+    return df
+
+
+def prepare_monthly(df_monthly, year_range=None):
+    """
+    Αναλυτικά δεδομένα με κανονικοποιημένη ΠΕΡΙΟΔΟΣ και στήλη ΕΤΟΣ, περιορισμένα
+    στο year_range (πρώτο, τελευταίο έτος) αν δοθεί. Το αποτέλεσμα είναι κοινό
+    μεταξύ κλήσεων και δεν πρέπει να τροποποιείται επιτόπου.
+    """
+    key = ('prepare', tuple(year_range) if year_range else None)
+    return _source_memoized(source_key(df_monthly), key, lambda: _prepare(df_monthly, year_range))
+
+
+def apply_filters(df, filters):
+    """Φίλτρα προβολής: years=(από, έως), types=[κωδικοί], packages=[κωδικοί]."""
+    filters = filters or {}
+    years = filters.get('years')
+    if years:
+        from_year, to_year = years
+        df = df[(df['ΕΤΟΣ'] >= from_year) & (df['ΕΤΟΣ'] <= to_year)]
+    if filters.get('types'):
+        df = df[as_str(df['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ']).isin(list(filters['types']))]
+    if filters.get('packages'):
+        df = df[as_str(df['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ']).isin(list(filters['packages']))]
+    return df
+
+
+def _period_aggregates(df, types, periods):
+    """
+    Μία ομαδοποίηση ανά περίοδο (periods: κλειδί ανά γραμμή, π.χ. κωδικός
+    περιόδου): αποδοχές μήνα (χωρίς ειδικές αποδοχές), ημέρες του κωδικού 01,
+    βασικό πλαφόν και ποιοι τύποι αποδοχών εμφανίζονται.
+    """
+    helper = pd.DataFrame({
+        'ΠΕΡΙΟΔΟΣ': periods,
+        'earnings': df['ΑΠΟΔΟΧΕΣ'].where(~df['IS_SPECIAL']),
+        'days_01': df['ΗΜΕΡ. ΑΠΑΣΧ.'].where(types == '01'),
+        'base': df['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'],
+        'has_full': types.isin(FULL_CEILING_TYPES),
+        'has_half': types.isin(HALF_CEILING_TYPES),
+        'has_regular': ~types.isin(SPECIAL_TYPES),
+    })
+    grouped = helper.groupby('ΠΕΡΙΟΔΟΣ', dropna=False, sort=False)
+    agg = grouped[['days_01', 'base', 'has_full', 'has_half', 'has_regular']].max()
+    # Περίοδος μόνο με ειδικές αποδοχές: χωρίς αποδοχές μήνα (NaN)
+    agg['earnings'] = grouped['earnings'].sum(min_count=1)
+
+    base = agg['base']
+    plafon_month = (base / FULL_MONTH_DAYS * agg['days_01']).clip(upper=base)
+    agg['plafon_month'] = plafon_month.fillna(base)
+
+    # Μέγιστο εισφορίσιμο πλαφόν των γραμμών του μήνα (βλ. ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ ανά γραμμή)
+    candidates = np.column_stack([
+        np.where(agg['has_regular'], agg['plafon_month'], -np.inf),
+        np.where(agg['has_full'], base, -np.inf),
+        np.where(agg['has_half'], base / 2, -np.inf),
+    ])
+    agg['plafon_max'] = candidates.max(axis=1)
+    return agg
+
+
+class SliceIndex:
+    """
+    Ευρετήριο ανάλυσης ενός αρχείου (για πίνακα πλαφόν και εύρος ετών): οι
+    στήλες που δεν εξαρτώνται από τα φίλτρα, οι γραμμές ομαδοποιημένες σε
+    slices (ΠΕΡΙΟΔΟΣ, ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ, ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ) και τα μηνιαία
+    aggregates όλων των γραμμών.
+
+    Με φίλτρα, τα aggregates ξαναϋπολογίζονται μόνο για τις περιόδους που
+    κρατούν μέρος των slices τους· οι υπόλοιπες περίοδοι είτε κρατούνται
+    ολόκληρες (ίδια aggregates) είτε αφαιρούνται.
+    """
+
+    def __init__(self, df_prepared, ceiling_table):
+        analysis = view(df_prepared)
+        analysis['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'] = analysis['ΕΤΟΣ'].map(ceiling_table).fillna(0)
+
+        # Ειδικές αποδοχές (Δώρα/Επίδομα Αδείας): εκτός αποδοχών μήνα, έλεγχος ανά γραμμή
+        types = as_str(analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'])
+        analysis['IS_SPECIAL'] = per_value(
+            analysis['ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ'],
+            lambda values: values.astype(str).str.contains(SPECIAL_DESCRIPTION_PATTERN, case=False, regex=True),
+        ) | types.isin(SPECIAL_TYPES)
+        self.analysis = analysis
+        self.types = types
+
+        packages = as_str(analysis['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'])
+        self.period_codes, self.periods = pd.factorize(analysis['ΠΕΡΙΟΔΟΣ'], use_na_sentinel=False)
+        keys = pd.DataFrame({'period': self.period_codes, 'package': packages.to_numpy(), 'type': types.to_numpy()})
+        # Τα slices αριθμούνται με τη σειρά πρώτης εμφάνισης (sort=False)
+        self.slice_ids = keys.groupby(['period', 'package', 'type'], sort=False).ngroup().to_numpy()
+        first_rows = np.unique(self.slice_ids, return_index=True)[1]
+        self.slice_period = self.period_codes[first_rows]
+        self.slice_year = analysis['ΕΤΟΣ'].to_numpy(dtype=object)[first_rows]
+        self.slice_package = keys['package'].to_numpy(dtype=object)[first_rows]
+        self.slice_type = keys['type'].to_numpy(dtype=object)[first_rows]
+        self.slices_per_period = np.bincount(self.slice_period, minlength=len(self.periods))
+
+        self.aggregates = self._aggregate(np.ones(len(analysis), dtype=bool))
+
+    @property
+    def nbytes(self):
+        arrays = (self.period_codes, self.slice_ids, self.slice_period, self.slices_per_period)
+        return nbytes(self.analysis) + nbytes(self.types) + sum(a.nbytes for a in arrays)
+
+    def _aggregate(self, rows):
+        # Aggregates ανά περίοδο (στη σειρά του self.periods) από τις γραμμές rows
+        # Ομαδοποίηση με τους ακέραιους κωδικούς περιόδου αντί για τα strings
+        agg = _period_aggregates(self.analysis[rows], self.types[rows], self.period_codes[rows])
+        positions = agg.index.to_numpy()
+        out = {}
+        for col in ('earnings', 'plafon_month', 'plafon_max'):
+            values = np.full(len(self.periods), np.nan)
+            values[positions] = agg[col].to_numpy(dtype='float64')
+            out[col] = values
+        return out
+
+    def slice_mask(self, filters):
+        """Ποια slices περνούν τα φίλτρα (ίδια σημασιολογία με το apply_filters)."""
+        filters = filters or {}
+        keep = np.ones(len(self.slice_period), dtype=bool)
+        years = filters.get('years')
+        if years:
+            from_year, to_year = years
+            keep &= (self.slice_year >= from_year) & (self.slice_year <= to_year)
+        if filters.get('types'):
+            keep &= np.isin(self.slice_type, list(filters['types']))
+        if filters.get('packages'):
+            keep &= np.isin(self.slice_package, list(filters['packages']))
+        return keep
+
+    def compute(self, filters):
+        """Η ανάλυση πλαφόν ανά γραμμή για τα φίλτρα (βλ. compute_insurable)."""
+        keep = self.slice_mask(filters)
+        rows = keep[self.slice_ids]
+        df_analysis = self.analysis[rows]
+
+        aggregates = self.aggregates
+        kept_per_period = np.bincount(self.slice_period[keep], minlength=len(self.periods))
+        partial = (kept_per_period > 0) & (kept_per_period < self.slices_per_period)
+        if partial.any():
+            # Μόνο οι περίοδοι που "σπάνε" από τα φίλτρα ξαναϋπολογίζονται
+            partial_rows = rows & partial[self.period_codes]
+            updated = self._aggregate(partial_rows)
+            aggregates = {
+                col: np.where(partial, updated[col], values) for col, values in aggregates.items()
+            }
+
+        period_codes = self.period_codes[rows]
+        return _finish_analysis(
+            df_analysis,
+            self.types[rows],
+            aggregates['earnings'][period_codes],
+            aggregates['plafon_month'][period_codes],
+            aggregates['plafon_max'][period_codes],
+        )
+
+
+def _finish_analysis(df_analysis, types, monthly_earnings, plafon_month, monthly_plafon):
+    df_analysis['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'] = monthly_earnings
+
+    # Εισφορίσιμο πλαφόν ανά γραμμή: αναλογία ημερών, ολόκληρο για 03, μισό για 04/05
+    base = df_analysis['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'].to_numpy(dtype='float64')
+    row_plafon = np.where(
+        types.isin(FULL_CEILING_TYPES).to_numpy(), base,
+        np.where(types.isin(HALF_CEILING_TYPES).to_numpy(), base / 2, plafon_month)
+    )
+    df_analysis['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = row_plafon
+
+    # Εισφορίσιμες αποδοχές ανά μήνα (όχι ανά γραμμή)· για ειδικές αποδοχές
+    # (Δώρα/Επίδομα) ο έλεγχος γίνεται ανά γραμμή. Το np.where(p < e, p, e)
+    # είναι το min(e, p) της Python (NaN αποδοχές μένουν NaN), το fmin
+    # αγνοεί NaN όπως το DataFrame.min(axis=1).
+    special = df_analysis['IS_SPECIAL'].to_numpy(dtype=bool)
+    earnings = df_analysis['ΑΠΟΔΟΧΕΣ'].to_numpy(dtype='float64')
+    df_analysis['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = np.where(
+        special,
+        np.fmin(earnings, row_plafon),
+        np.where(monthly_plafon < monthly_earnings, monthly_plafon, monthly_earnings),
+    )
+    perikopi = np.where(special, earnings - row_plafon, monthly_earnings - monthly_plafon)
+    df_analysis['ΠΕΡΙΚΟΠΗ'] = np.where(perikopi > 0, perikopi, np.nan)
+
+    # Αποφυγή διαίρεσης με το μηδέν: ΠΟΣΟΣΤΟ = 0 όταν οι εισφορίσιμες δεν είναι > 0
+    insurable = df_analysis['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'].to_numpy()
+    contributions = df_analysis['ΕΙΣΦΟΡΕΣ'].to_numpy(dtype='float64')
+    positive = insurable > 0
+    ratio = np.zeros(len(insurable))
+    np.divide(contributions, insurable, out=ratio, where=positive)
+    df_analysis['ΠΟΣΟΣΤΟ'] = np.where(positive, ratio * 100, 0.0)
+    return df_analysis
+
+
+def slice_index(df_monthly, ceiling_table, year_range=None):
+    """Το SliceIndex του αρχείου για πίνακα πλαφόν και εύρος ετών (με cache)."""
+    key = (
+        'slices',
+        tuple(sorted(ceiling_table.items())),
+        tuple(year_range) if year_range else None,
+    )
+    return _source_memoized(
+        source_key(df_monthly), key, lambda: SliceIndex(prepare_monthly(df_monthly, year_range), ceiling_table)
+    )
+
+
+def compute_insurable(df_monthly, ceiling_table, year_range=None, filters=None):
+    """
+    Ανάλυση πλαφόν ανά γραμμή: ΒΑΣΙΚΟ ΠΛΑΦΟΝ, IS_SPECIAL, ΑΠΟΔΟΧΕΣ ΜΗΝΑ,
+    ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ, ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ, ΠΕΡΙΚΟΠΗ και ΠΟΣΟΣΤΟ.
+
+    ceiling_table: {έτος (str): βασικό πλαφόν}
+    year_range: (πρώτο, τελευταίο) έτος του ταμείου ή None για όλα
+    filters: βλ. apply_filters
+
+    Το αποτέλεσμα είναι κοινό μεταξύ κλήσεων (cache) και δεν πρέπει να
+    τροποποιείται επιτόπου.
+    """
+    key = (
+        source_key(df_monthly),
+        'insurable',
+        tuple(sorted(ceiling_table.items())),
+        tuple(year_range) if year_range else None,
+        _filters_key(filters),
+    )
+    return _result_memoized(key, lambda: slice_index(df_monthly, ceiling_table, year_range).compute(filters))
+
+
+# Στήλες του πίνακα ανάλυσης (Κύρια / Επικουρική)
+DISPLAY_COLUMNS = [
+    'ΕΤΟΣ', 'ΠΕΡΙΟΔΟΣ', 'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ', 'ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ', 'ΗΜΕΡ. ΑΠΑΣΧ.', 'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ',
+    'ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ', 'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ',
+    'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'
+]
+
+
+def _detail_rows(df_analysis, package_desc_map):
+    display_df = view(df_analysis)
+    # Περιγραφή πακέτου κάλυψης από τα ετήσια δεδομένα
+    _pkg_map = {str(k): (v or '') for k, v in package_desc_map.items()}
+    display_df['ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ'] = (
+        as_str(display_df['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ']).replace('nan', '').map(_pkg_map).fillna('')
+    )
+    # Κρατάμε σταθερά keys για την ομαδοποίηση πριν "κενώσουμε" τα πεδία
+    display_df['ΕΤΟΣ_KEY'] = display_df['ΕΤΟΣ']
+    display_df['ΠΕΡΙΟΔΟΣ_KEY'] = display_df['ΠΕΡΙΟΔΟΣ']
+
+    # Ταξινόμηση για ομαδοποίηση ανά έτος και περίοδο
+    display_df['ΤΥΠΟΣ_SORT'] = as_str(display_df['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'])
+    display_df = display_df.sort_values([
+        'ΕΤΟΣ_KEY', 'IS_SPECIAL', 'ΠΕΡΙΟΔΟΣ_KEY', 'ΤΥΠΟΣ_SORT'
+    ])
+
+    # Εμφάνιση έτους μόνο στην πρώτη γραμμή κάθε έτους
+    display_df['ΕΤΟΣ'] = display_df['ΕΤΟΣ'].where(~display_df.duplicated(['ΕΤΟΣ_KEY']), '')
+    # Εμφάνιση περιόδου μόνο στην πρώτη γραμμή κάθε περιόδου
+    show_month_total = ~display_df.duplicated(['ΕΤΟΣ_KEY', 'ΠΕΡΙΟΔΟΣ_KEY'])
+    display_df['ΠΕΡΙΟΔΟΣ'] = display_df['ΠΕΡΙΟΔΟΣ'].where(show_month_total, '')
+
+    # Εμφάνιση "ΑΠΟΔΟΧΕΣ ΜΗΝΑ", "ΠΛΑΦΟΝ", "ΠΕΡΙΚΟΠΗ" μόνο στην πρώτη γραμμή κάθε περιόδου
+    display_df['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'] = display_df['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'].where(show_month_total, '')
+    show_limits = show_month_total | display_df['IS_SPECIAL']
+    for col in ['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ']:
+        display_df[col] = display_df[col].where(show_limits, '')
+
+    detail = display_df[DISPLAY_COLUMNS]
+    return detail, display_df['ΕΤΟΣ_KEY']
+
+
+def _segment_sums(values, codes, count):
+    """
+    Άθροισμα ανά ομάδα (codes 0..count-1) με ndarray.sum ανά συνεχές τμήμα: ίδια
+    (pairwise) άθροιση με το Series.sum, ώστε η στρογγυλοποίηση στο λεπτό να μην
+    αλλάζει σε τιμές στο όριο (το groupby().sum() αθροίζει με Kahan).
+    """
+    order = np.argsort(codes, kind='stable')
+    ordered = values[order]
+    bounds = np.searchsorted(codes[order], np.arange(count + 1))
+    return np.array([ordered[lo:hi].sum() for lo, hi in zip(bounds[:-1], bounds[1:])])
+
+
+def _yearly_totals(df_analysis):
+    """Σύνολα ανά έτος (ταξινομημένα) και οι περικοπές μία φορά ανά μήνα."""
+    codes, years = pd.factorize(df_analysis['ΕΤΟΣ'], sort=True)
+    count = len(years)
+    special = df_analysis['IS_SPECIAL'].to_numpy(dtype=bool)
+
+    totals = pd.DataFrame(index=pd.Index(years, name='ΕΤΟΣ'))
+    for col in ['ΗΜΕΡ. ΑΠΑΣΧ.', 'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ']:
+        totals[col] = _segment_sums(df_analysis[col].to_numpy(), codes, count)
+
+    # Σύνολο περικοπής: μία φορά ανά μήνα + ειδικές αποδοχές ανά γραμμή
+    perikopi_month = (
+        df_analysis.loc[~special]
+        .groupby(['ΕΤΟΣ', 'ΠΕΡΙΟΔΟΣ'], dropna=False)['ΠΕΡΙΚΟΠΗ']
+        .max()
+        .fillna(0)
+    )
+    month_codes = years.get_indexer(perikopi_month.index.get_level_values('ΕΤΟΣ'))
+    perikopi = np.nan_to_num(df_analysis['ΠΕΡΙΚΟΠΗ'].to_numpy(dtype='float64'))
+    totals['ΠΕΡΙΚΟΠΗ'] = (
+        _segment_sums(perikopi_month.to_numpy(), month_codes, count)
+        + _segment_sums(perikopi[special], codes[special], count)
+    )
+    return totals
+
+
+def _round_totals(totals):
+    # Στρογγυλοποίηση με round() της Python, όπως στις γραμμές σύνοψης (O(έτη))
+    total_apodoxes = [round(v, 2) for v in totals['ΑΠΟΔΟΧΕΣ'].to_numpy()]
+    total_eisfores = [round(v, 2) for v in totals['ΕΙΣΦΟΡΕΣ'].to_numpy()]
+    total_insurable = [
+        round(apodoxes - perikopi, 2)
+        for apodoxes, perikopi in zip(totals['ΑΠΟΔΟΧΕΣ'].to_numpy(), totals['ΠΕΡΙΚΟΠΗ'].to_numpy())
+    ]
+    return total_apodoxes, total_eisfores, total_insurable
+
+
+def _yearly_totals_frame(totals, total_apodoxes, total_insurable):
+    return pd.DataFrame({
+        'ΕΤΟΣ': totals.index.tolist(),
+        'ΗΜΕΡ. ΑΠΑΣΧ.': totals['ΗΜΕΡ. ΑΠΑΣΧ.'].to_numpy(),
+        'ΑΠΟΔΟΧΕΣ': total_apodoxes,
+        'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ': total_insurable,
+    })
+
+
+def yearly_totals(df_analysis):
+    """
+    Μόνο τα ετήσια σύνολα του build_display_with_totals (ΕΤΟΣ, ΗΜΕΡ. ΑΠΑΣΧ.,
+    ΑΠΟΔΟΧΕΣ, ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ), χωρίς τον πίνακα προβολής.
+    """
+    if df_analysis.empty:
+        return pd.DataFrame([])
+    totals = _yearly_totals(df_analysis)
+    total_apodoxes, _, total_insurable = _round_totals(totals)
+    return _yearly_totals_frame(totals, total_apodoxes, total_insurable)
+
+
+def build_display_with_totals(df_analysis, package_desc_map=None):
+    """
+    Πίνακας ανάλυσης με γραμμή "ΣΥΝΟΛΟ {έτος}" και κενή γραμμή μετά από κάθε έτος,
+    και τα ετήσια σύνολα (ΕΤΟΣ, ΗΜΕΡ. ΑΠΑΣΧ., ΑΠΟΔΟΧΕΣ, ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ)
+    για τις συντάξιμες αποδοχές. Επιστρέφει (display_df, yearly_totals).
+    """
+    if df_analysis.empty:
+        return pd.DataFrame([], columns=DISPLAY_COLUMNS), pd.DataFrame([])
+
+    detail, detail_years = _detail_rows(df_analysis, package_desc_map or {})
+    totals = _yearly_totals(df_analysis)
+    years = totals.index.tolist()
+
+    total_apodoxes, total_eisfores, total_insurable = _round_totals(totals)
+
+    blank = {col: [''] * len(years) for col in DISPLAY_COLUMNS}
+    summary = pd.DataFrame(dict(blank, **{
+        'ΕΤΟΣ': [f"ΣΥΝΟΛΟ {year}" for year in years],
+        'ΑΠΟΔΟΧΕΣ': total_apodoxes,
+        'ΕΙΣΦΟΡΕΣ': total_eisfores,
+        'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ': total_insurable,
+    }), dtype=object)
+    spacer = pd.DataFrame(blank, dtype=object)
+
+    # Ανά έτος: αναλυτικές γραμμές (0), σύνολο (1), κενή γραμμή (2)· η σταθερή
+    # ταξινόμηση κρατά τη σειρά των αναλυτικών γραμμών
+    year_keys = pd.Series(years, dtype=object)
+    combined = pd.concat([detail, summary, spacer], ignore_index=True)
+    sort_year = pd.concat([detail_years.astype(object), year_keys, year_keys], ignore_index=True)
+    block = np.repeat([0, 1, 2], [len(detail), len(years), len(years)])
+    order = pd.DataFrame({'year': sort_year, 'block': block}).sort_values(['year', 'block'], kind='stable').index
+    display_df = combined.take(order).reset_index(drop=True)
+
+    # Ίδια συμπερασμένη dtype με την κατασκευή από λίστα γραμμών (π.χ. str για στήλες κειμένου)
+    for col in display_df.columns:
+        if display_df[col].dtype == object:
+            display_df[col] = pd.Series(display_df[col].to_numpy(), index=display_df.index, name=col)
+
+    return display_df, _yearly_totals_frame(totals, total_apodoxes, total_insurable)
@@ -0,0 +1,90 @@
+"""
+Υπολογισμός συντάξιμων αποδοχών (ΔΤΚ, εξαγορά)· η εξαγωγή για το Syntaksi Pro
+είναι στο efka_core.export.
+"""
+import pandas as pd
+
+from efka_core.dtk import DEFAULT_FACTOR, DtkFactors
+from efka_core.frames import view
+
+
+def _kyria_buyout_insurable(amount):
+    return amount * 5
+
+
+def _epik_buyout_insurable(amount):
+    return amount / 0.06
+
+
+# Ταμεία: εύρος ετών ανάλυσης και εισφορίσιμες αποδοχές από το ποσό εξαγοράς
+FUNDS = {
+    'kyria': {
+        'label': 'Κύρια',
+        'year_range': None,
+        'buyout_insurable': _kyria_buyout_insurable,
+        'json_file_name': 'efka_syntaksi_pro.json',
+    },
+    'epikouriki': {
+        'label': 'Επικουρική',
+        # Η Επικουρική αναλύεται μόνο για τα έτη 2002-2014
+        'year_range': (2002, 2014),
+        'buyout_insurable': _epik_buyout_insurable,
+        'json_file_name': 'efka_epikouriki_syntaksi_pro.json',
+    },
+}
+
+DEFAULT_DTK_YEAR = 2026
+# Ημέρες ασφάλισης ανά μήνα για τον μέσο συντάξιμο μισθό
+DAYS_PER_MONTH = 25
+
+
+def compute_pension(yearly_totals, dtk_factors, fund='kyria', buyout_days=0, buyout_year=DEFAULT_DTK_YEAR,
+                    buyout_amount=0.0):
+    """
+    Συντάξιμες αποδοχές ανά έτος από τα ετήσια σύνολα (βλ. build_display_with_totals)
+    και τους συντελεστές ΔΤΚ του έτους αναφοράς (DtkFactors ή dict), με προαιρετική γραμμή ΕΞΑΓΟΡΑ.
+
+    Επιστρέφει (pension_df, summary) με summary τα σύνολα του πίνακα.
+    """
+    pension_df = view(yearly_totals)
+    pension_df['ΕΤΟΣ'] = pd.to_numeric(pension_df['ΕΤΟΣ'])
+
+    if not isinstance(dtk_factors, DtkFactors):
+        dtk_factors = DtkFactors.from_mapping(dtk_factors)
+    buyout_dtk = dtk_factors.get(buyout_year, DEFAULT_FACTOR)
+    buyout_insurable = FUNDS[fund]['buyout_insurable'](buyout_amount)
+
+    pension_df['ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ'] = dtk_factors.lookup(pension_df['ΕΤΟΣ'].to_numpy())
+    pension_df['ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = (
+        pension_df['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] * pension_df['ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ']
+    )
+
+    # Γραμμή εξαγοράς
+    if buyout_days > 0 or buyout_amount > 0:
+        pension_df = pd.concat([
+            pension_df,
+            pd.DataFrame([{
+                'ΕΤΟΣ': buyout_year,
+                'ΗΜΕΡ. ΑΠΑΣΧ.': buyout_days,
+                'ΑΠΟΔΟΧΕΣ': 0,
+                'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ': buyout_insurable,
+                'ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ': buyout_dtk,
+                'ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ': buyout_insurable * buyout_dtk,
+            }])
+        ], ignore_index=True)
+        # Ρητή μετατροπή σε object: το pandas 3 δεν επιτρέπει κείμενο σε στήλη int64
+        pension_df['ΕΤΟΣ'] = pension_df['ΕΤΟΣ'].astype(object)
+        pension_df.loc[pension_df.index[-1], 'ΕΤΟΣ'] = "ΕΞΑΓΟΡΑ"
+
+    total_days = pension_df['ΗΜΕΡ. ΑΠΑΣΧ.'].sum()
+    total_pensionable_earnings = pension_df['ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'].sum()
+    months = total_days / DAYS_PER_MONTH if total_days > 0 else 0
+    summary = {
+        'total_days': total_days,
+        'months': months,
+        'total_pensionable_earnings': total_pensionable_earnings,
+        'average_pensionable_salary': total_pensionable_earnings / months if months > 0 else 0,
+        'buyout_dtk': buyout_dtk,
+    }
+    return pension_df, summary
+
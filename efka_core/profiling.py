@@ -0,0 +1,162 @@
+"""
+Προφίλ μίας ανάλυσης (debug): cProfile και tracemalloc γύρω από ένα μπλοκ.
+
+    with profile_run(content_hash(file_bytes), label="statement.pdf") as run:
+        parse_efka_pdf(file_bytes)
+    run.path  # efka_profile_<hash>.zip
+
+Το αποτέλεσμα αποθηκεύεται ως zip με κλειδί το hash του αρχείου στον φάκελο
+EFKA_PROFILE_DIR (προεπιλογή: <tmp>/efka-profiles), ώστε να μεταφερθεί και να
+μελετηθεί χωρίς το ίδιο το PDF του χρήστη:
+- profile.pstats: για pstats / snakeviz (python -m pstats profile.pstats)
+- report.txt: κορυφαίες συναρτήσεις (cumulative, tottime) και σημεία δεσμεύσεων μνήμης
+
+Ενεργοποιείται με EFKA_PROFILE=1 (ή από την εφαρμογή με ?profile=1). Το cProfile
+μετρά μόνο το τρέχον νήμα, ενώ το tracemalloc όλη τη διεργασία· ένα προφίλ τη
+φορά ανά διεργασία (τα υπόλοιπα αιτήματα εκτελούνται χωρίς προφίλ).
+"""
+import contextlib
+import cProfile
+import datetime
+import io
+import marshal
+import os
+import pstats
+import tempfile
+import threading
+import time
+import tracemalloc
+import zipfile
+
+PROFILE_ENV = "EFKA_PROFILE"
+PROFILE_DIR_ENV = "EFKA_PROFILE_DIR"
+# Πλήθος γραμμών ανά ενότητα της αναφοράς
+PROFILE_TOP = 40
+
+# Αρχεία που δεν αφορούν την ανάλυση (το ίδιο το tracemalloc, imports)
+_ALLOCATION_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+_profile_lock = threading.Lock()
+
+
+def profile_enabled():
+    """Αν είναι ενεργό το EFKA_PROFILE (1/true/yes)."""
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def profile_dir(directory=None):
+    return directory or os.environ.get(PROFILE_DIR_ENV) or os.path.join(tempfile.gettempdir(), "efka-profiles")
+
+
+def artifact_path(key, directory=None):
+    """Διαδρομή του zip για το κλειδί (hash αρχείου)· ένα προφίλ ανά αρχείο, το νεότερο."""
+    return os.path.join(profile_dir(directory), f"efka_profile_{key[:16]}.zip")
+
+
+class ProfileRun:
+    """Αποτέλεσμα του profile_run· τα πεδία συμπληρώνονται στο τέλος του with."""
+
+    def __init__(self, key, label):
+        self.key = key
+        self.label = label
+        self.path = None
+        self.skipped = False
+        self.duration = None
+        self.peak_bytes = None
+        self.top_functions = []
+        self.top_allocations = []
+        self.report = ""
+
+
+def _function_label(func):
+    filename, line, name = func
+    return f"{name} ({os.path.basename(filename)}:{line})" if line else name
+
+
+def _top_functions(stats, top):
+    # stats.stats: {func: (primitive calls, calls, tottime, cumtime, callers)}
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+    return [(_function_label(func), calls, tottime, cumtime) for func, (_, calls, tottime, cumtime, _) in rows]
+
+
+def _top_allocations(snapshot, top):
+    return [
+        (f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size, stat.count)
+        for stat in snapshot.filter_traces(_ALLOCATION_FILTERS).statistics("lineno")[:top]
+    ]
+
+
+def _build_report(run, stats, top):
+    out = io.StringIO()
+    out.write(f"Προφίλ: {run.label or run.key}\n")
+    out.write(f"Κλειδί: {run.key}\n")
+    out.write(f"Ημερομηνία: {datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')}\n")
+    out.write(f"Διάρκεια: {run.duration:.3f} s\n")
+    if run.peak_bytes is not None:
+        out.write(f"Μέγιστη μνήμη (tracemalloc): {run.peak_bytes / 2 ** 20:.1f} MiB\n")
+
+    for sort_key in ("cumulative", "tottime"):
+        out.write(f"\n=== Συναρτήσεις κατά {sort_key} ===\n")
+        stats.stream = out
+        stats.sort_stats(sort_key).print_stats(top)
+
+    out.write("\n=== Σημεία δεσμεύσεων μνήμης (υπάρχουσες στο τέλος) ===\n")
+    for location, size, count in run.top_allocations:
+        out.write(f"{size / 1024:12.1f} KiB {count:9d} blocks  {location}\n")
+    return out.getvalue()
+
+
+def _write_artifact(path, stats, report):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        # Ίδια μορφή με το Stats.dump_stats
+        zf.writestr("profile.pstats", marshal.dumps(stats.stats))
+        zf.writestr("report.txt", report)
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def profile_run(key, label=None, directory=None, top=PROFILE_TOP):
+    """
+    cProfile + tracemalloc για το μπλοκ with· στο τέλος γράφει το zip
+    (artifact_path) και συμπληρώνει το ProfileRun. Αν εκτελείται ήδη άλλο
+    προφίλ, το μπλοκ τρέχει κανονικά με run.skipped = True.
+    """
+    run = ProfileRun(key, label)
+    if not _profile_lock.acquire(blocking=False):
+        run.skipped = True
+        yield run
+        return
+
+    try:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            yield run
+        finally:
+            profiler.disable()
+            run.duration = time.perf_counter() - started
+            run.peak_bytes = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+
+        stats = pstats.Stats(profiler)
+        run.top_functions = _top_functions(stats, top)
+        run.top_allocations = _top_allocations(snapshot, top)
+        run.report = _build_report(run, stats, top)
+        run.path = artifact_path(key, directory)
+        _write_artifact(run.path, stats, run.report)
+    finally:
+        _profile_lock.release()
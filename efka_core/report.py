@@ -0,0 +1,221 @@
+"""
+Εκτυπώσιμες αναφορές HTML από τους πίνακες της εφαρμογής.
+
+Ο πίνακας γράφεται απευθείας ανά γραμμή (χωρίς DataFrame.to_html και
+επεξεργασία του HTML με regex): κάθε στήλη μορφοποιείται και γίνεται escape
+μία φορά, οι γραμμές ΣΥΝΟΛΟ σημειώνονται από τα δεδομένα και το τελικό HTML
+κρατείται σε cache ανά (hash πίνακα, τίτλος, όνομα).
+"""
+import html
+import io
+import json
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from efka_core.diagnostics import span
+from efka_core.frames import table_hash
+
+# Γραμμές ανά κομμάτι του streaming writer
+CHUNK_ROWS = 2000
+# Ψηφία για δεκαδικούς όπως στο to_html (display.precision)
+FLOAT_PRECISION = 6
+# Γραμμές που περιέχουν αυτό το κείμενο (σε οποιοδήποτε κελί) εμφανίζονται ως σύνολα
+TOTAL_MARKER = "ΣΥΝΟΛΟ"
+_DECIMAL_NUMBER = re.compile(r"^\s*[+-]?[0-9]+\.[0-9]*$")
+
+REPORT_CACHE_MAX_ENTRIES = 8
+
+# Υποσημείωση μετά τον πίνακα
+REPORT_FOOTER = """
+<div class="print-footer"><strong>ΣΗΜΑΝΤΙΚΉ ΣΗΜΕΙΩΣΗ:</strong> Η παρούσα αναφορά βασίζεται αποκλειστικά στα δεδομένα που εμφανίζονται στο αρχείο ΑΤΟΜΙΚΟΣ ΛΟΓΑΡΙΑΣΜΟΣ/e-ΕΦΚΑ και αποτελεί απλή επεξεργασία των καταγεγραμμένων εγγραφών με σκοπό τη διευκόλυνση μελέτης του ασφ. ιστορικού του ασφαλισμένου. Η πλατφόρμα ΑΤΟΜΙΚΟΣ ΛΟΓΑΡΙΑΣΜΟΣ ή η ανάλυση από την εφαρμογή αυτή μπορεί να περιέχει κενά ή σφάλματα, και η αναφορά που εξάγεται δεν υποκαθιστά νομική ή οικονομική συμβουλή σε καμία περίπτωση. Αποκλειστικά υπεύθυνος για την επαλήθευση των στοιχείων είναι ο χρήστης. Για θέματα συνταξιοδότησης και οριστικές απαντήσεις αρμόδιος παραμένει αποκλειστικά ο e-ΕΦΚΑ.</div>
+</body>
+</html>"""
+
+_report_cache = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+def _escape(values):
+    # Όπως το to_html: escape μόνο των &, <, >
+    return values.str.replace("&", "&amp;", regex=False).str.replace("<", "&lt;", regex=False).str.replace(
+        ">", "&gt;", regex=False
+    )
+
+
+def _trimmed_float(value):
+    # Δεκαδικός σε στήλη object: έως FLOAT_PRECISION ψηφία, χωρίς τελικά μηδενικά (τουλάχιστον ένα δεκαδικό)
+    text = f"{value:.{FLOAT_PRECISION}f}".rstrip("0")
+    return text + "0" if text.endswith(".") else text
+
+
+def _float_column_text(values):
+    # Στήλη float όπως το to_html: κοινό πλήθος δεκαδικών· επιστημονική μορφή αν
+    # υπάρχουν πολύ μικρές τιμές ή μεγάλες τιμές που δεν χωρούν σε σταθερό πλάτος
+    texts = _trim_common_zeros([f"{v:.{FLOAT_PRECISION}f}" for v in values])
+    abs_values = np.abs(values)
+    too_long = bool(texts) and max(len(t) for t in texts) > FLOAT_PRECISION + 6
+    has_large = (abs_values > 1e6).any()
+    has_small = ((abs_values < 10 ** -FLOAT_PRECISION) & (abs_values > 0)).any()
+    if has_small or (too_long and has_large):
+        texts = [f"{v: .{FLOAT_PRECISION}e}" for v in values]
+    return [t.strip() for t in texts]
+
+
+def _trim_common_zeros(texts):
+    # Αφαίρεση τελικών μηδενικών όσο τελειώνουν σε 0 όλοι οι αριθμοί (μένει ένα δεκαδικό)
+    numbers = [i for i, t in enumerate(texts) if _DECIMAL_NUMBER.match(t)]
+    while numbers and all(texts[i].endswith("0") for i in numbers):
+        for i in numbers:
+            texts[i] = texts[i][:-1]
+    for i in numbers:
+        if texts[i].endswith("."):
+            texts[i] += "0"
+    return texts
+
+
+def _cell_text(series):
+    """Κείμενο (escaped) των κελιών μιας στήλης, όπως το εμφανίζει το to_html."""
+    if series.dtype.kind == "f":
+        text = pd.Series(_float_column_text(series.to_numpy()), index=series.index, dtype=object)
+    elif series.dtype.kind in "mM":
+        # Το fillna("") δεν αλλάζει τα NaT (το to_html τα γράφει "NaT"), ενώ το astype(str) τα κάνει NaN
+        text = series.astype(str).where(series.notna(), "NaT")
+    elif series.dtype == object:
+        text = series.map(lambda v: _trimmed_float(v) if isinstance(v, float) else str(v))
+    else:
+        text = series.astype(str)
+    return _escape(text.astype(str))
+
+
+def iter_table_html(df, classes="print-table"):
+    """
+    Το <table> του df σε κομμάτια (generator), με την ίδια δομή με το
+    to_html(index=False)· οι γραμμές με ΣΥΝΟΛΟ παίρνουν class="row-total".
+    """
+    df = df.fillna("")
+    header = "".join(f"      <th>{html.escape(str(col), quote=False)}</th>\n" for col in df.columns)
+    yield (
+        f'<table class="dataframe {classes}">\n  <thead>\n    <tr style="text-align: right;">\n'
+        f"{header}    </tr>\n  </thead>\n  <tbody>\n"
+    )
+
+    row_html = None
+    is_total = np.zeros(len(df), dtype=bool)
+    for _, series in df.items():
+        text = _cell_text(series)
+        is_total |= text.str.contains(TOTAL_MARKER, case=False, regex=False).to_numpy(dtype=bool)
+        cells = "      <td>" + text + "</td>\n"
+        row_html = cells if row_html is None else row_html + cells
+    rows = np.where(is_total, '    <tr class="row-total">\n', "    <tr>\n").astype(object) + (
+        row_html.to_numpy(dtype=object) if row_html is not None else ""
+    ) + "    </tr>\n"
+    for start in range(0, len(rows), CHUNK_ROWS):
+        yield "".join(rows[start:start + CHUNK_ROWS])
+    yield "  </tbody>\n</table>"
+
+
+def _document_parts(title, person_name):
+    # Το HTML πριν και μετά τον πίνακα
+    safe_title = html.escape(str(title))
+    safe_name = html.escape(str(person_name)) if person_name else ""
+    name_block = f'<p class="print-name">{safe_name}</p>' if safe_name else ""
+
+    head = f"""<!DOCTYPE html>
+<html lang="el">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{safe_title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 1rem; color: #262730; }}
+.print-name {{ text-align: center; font-size: 1.1rem; font-weight: 700; margin-bottom: 0.5rem; }}
+.print-title {{ font-size: 1.25rem; font-weight: 700; margin-bottom: 1rem; text-align: left; }}
+.print-table {{ width: 100%; border-collapse: collapse; text-align: left; font-size: 0.9rem; }}
+.print-table th, .print-table td {{ padding: 10px 12px; text-align: left; border: none; border-bottom: 1px solid #d1d5db; }}
+.print-table th {{ background: #f9fafb; font-weight: 700; font-size: 0.8rem; }}
+.print-table td:nth-child(1), .print-table td:nth-child(2), .print-table th:nth-child(1), .print-table th:nth-child(2) {{ font-weight: 700; }}
+.print-table tr.row-total {{ background: #e5e7eb; font-weight: 700; }}
+.print-table tbody tr:hover {{ background: #fff4e6; }}
+.header-row {{ display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap; gap: 0.5rem; margin-bottom: 0.5rem; }}
+.header-row .print-title {{ margin: 0; }}
+.btn-print {{ background: #dc3545; color: white; border: none; padding: 8px 16px; border-radius: 6px; font-size: 0.9rem; font-weight: 600; cursor: pointer; }}
+.btn-print:hover {{ background: #c82333; }}
+@media print {{
+  @page {{ size: landscape; }}
+  body {{ margin: 1.5cm; }}
+  .no-print {{ display: none !important; }}
+  .print-title {{ margin-bottom: 12px; }}
+  .print-table {{ page-break-inside: auto; }}
+  .print-table tr {{ page-break-inside: avoid; page-break-after: auto; }}
+  .print-footer {{ margin-top: 1.5rem; }}
+}}
+.print-footer {{ margin-top: 1.5rem; padding-top: 0.75rem; border-top: 1px solid #d1d5db; font-size: 0.75rem; color: #6b7280; line-height: 1.4; }}
+</style>
+</head>
+<body>
+{name_block}
+<div class="header-row">
+  <h1 class="print-title">{safe_title}</h1>
+  <div class="no-print" style="display:flex;gap:8px;">
+    <button type="button" class="btn-print" onclick="window.print();">🖨 Εκτύπωση</button>
+  </div>
+</div>
+"""
+    return head, REPORT_FOOTER
+
+
+def write_printable_html(df, out, title="Πίνακας", person_name=None):
+    """Γράφει την εκτυπώσιμη αναφορά του df στο out (file-like κειμένου) κομμάτι-κομμάτι."""
+    head, tail = _document_parts(title, person_name)
+    out.write(head)
+    for chunk in iter_table_html(df):
+        out.write(chunk)
+    out.write(tail)
+
+
+def dataframe_to_printable_html(df, title="Πίνακας", person_name=None):
+    """Δημιουργεί πλήρες HTML αρχείο για προβολή/εκτύπωση (οριζόντιο προσανατολισμός, hover ανά γραμμή)."""
+    if df is None or df.empty:
+        return None
+    with span("report.printable_html", rows=len(df), columns=len(df.columns)) as report_span:
+        key = (table_hash(df), str(title), person_name or "")
+        with _report_cache_lock:
+            if key in _report_cache:
+                _report_cache.move_to_end(key)
+                report_span.set(cached=True)
+                return _report_cache[key]
+        buffer = io.StringIO()
+        write_printable_html(df, buffer, title, person_name)
+        doc = buffer.getvalue()
+        with _report_cache_lock:
+            _report_cache[key] = doc
+            while len(_report_cache) > REPORT_CACHE_MAX_ENTRIES:
+                _report_cache.popitem(last=False)
+        report_span.set(cached=False, chars=len(doc))
+        return doc
+
+
+def html_open_in_new_tab_component(html_content):
+    """Επιστρέφει HTML snippet για iframe: κουμπί Εκτύπωση που ανοίγει το html_content σε νέα καρτέλα (blob URL)."""
+    if not html_content:
+        return ""
+    # Ενσωμάτωση ως JS string: json.dumps + escape </script> ώστε να μην κλείνει το <script> του wrapper
+    js_content = json.dumps(html_content).replace("</script>", "<\\/script>")
+    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"></head>
+<body style="margin:0;padding:6px 0;font-family:sans-serif;display:flex;justify-content:flex-end;">
+<button type="button" id="openTabBtn" style="background:#dc3545;color:white;border:none;padding:14px 28px;border-radius:8px;cursor:pointer;font-weight:700;font-size:1.15rem;">Εκτύπωση</button>
+<script>
+(function() {{
+  var htmlContent = {js_content};
+  document.getElementById('openTabBtn').onclick = function() {{
+    var blob = new Blob([htmlContent], {{ type: 'text/html;charset=utf-8' }});
+    var url = URL.createObjectURL(blob);
+    window.open(url, '_blank');
+  }};
+}})();
+</script>
+</body></html>"""
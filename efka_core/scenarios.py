@@ -0,0 +1,122 @@
+"""
+Σενάρια "τι θα γινόταν αν": συντάξιμες αποδοχές για πλέγμα (πίνακας πλαφόν ×
+έτος αναφοράς ΔΤΚ × εξαγορά) με μία πράξη πινάκων ανά πίνακα πλαφόν.
+
+Τα αποτελέσματα ταυτίζονται με το compute_pension για κάθε σενάριο: οι
+συντάξιμες αποδοχές αθροίζονται ανά γραμμή με την ίδια σειρά (έτη και στο
+τέλος η γραμμή ΕΞΑΓΟΡΑ).
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from efka_core.ceilings import CEILING_TABLES, ceiling_table
+from efka_core.formatting import format_currency_gr
+from efka_core.insurable import compute_insurable, yearly_totals
+from efka_core.pension import DAYS_PER_MONTH, DEFAULT_DTK_YEAR, FUNDS
+
+Buyout = namedtuple("Buyout", ["days", "year", "amount"])
+NO_BUYOUT = Buyout(0, DEFAULT_DTK_YEAR, 0.0)
+
+SCENARIO_COLUMNS = [
+    'ΠΛΑΦΟΝ', 'ΕΤΟΣ ΑΝΑΦΟΡΑΣ ΔΤΚ', 'ΗΜΕΡΕΣ ΕΞΑΓΟΡΑΣ', 'ΕΤΟΣ ΕΞΑΓΟΡΑΣ', 'ΠΟΣΟ ΕΞΑΓΟΡΑΣ',
+    'ΣΥΝΟΛΟ ΗΜΕΡΩΝ', 'ΜΗΝΕΣ', 'ΣΥΝΟΛΟ ΣΥΝΤΑΞΙΜΩΝ ΑΠΟΔΟΧΩΝ', 'ΜΕΣΟΣ ΣΥΝΤΑΞΙΜΟΣ ΜΙΣΘΟΣ',
+]
+
+
+def scenario_yearly_totals(df_monthly, fund='kyria', ceilings=None, filters=None):
+    """Ετήσια σύνολα ανά πίνακα πλαφόν ({όνομα: yearly_totals}) για το ταμείο."""
+    year_range = FUNDS[fund]['year_range']
+    return {
+        name: yearly_totals(compute_insurable(df_monthly, ceiling_table(name), year_range, filters))
+        for name in (ceilings or CEILING_TABLES)
+    }
+
+
+def _row_sums(values):
+    # Άθροισμα ανά γραμμή σε συνεχή μνήμη: ίδια (pairwise) άθροιση με το Series.sum
+    return np.ascontiguousarray(values).sum(axis=1)
+
+
+def evaluate_scenarios(totals_by_ceiling, dtk_table, fund='kyria', dtk_years=None, buyouts=(NO_BUYOUT,)):
+    """
+    Αξιολόγηση όλων των συνδυασμών (πλαφόν × έτος αναφοράς ΔΤΚ × εξαγορά).
+
+    totals_by_ceiling: {όνομα πλαφόν: yearly_totals} (βλ. scenario_yearly_totals)
+    dtk_table: DtkTable· dtk_years: έτη αναφοράς (προεπιλογή όλα)
+    buyouts: ακολουθία Buyout(days, year, amount)
+
+    Επιστρέφει tidy DataFrame με μία γραμμή ανά σενάριο (SCENARIO_COLUMNS).
+    """
+    dtk_years = list(dtk_years) if dtk_years is not None else list(dtk_table)
+    buyouts = [Buyout(*b) for b in buyouts] or [NO_BUYOUT]
+    buyout_days = np.array([b.days for b in buyouts], dtype=np.int64)
+    buyout_years = np.array([b.year for b in buyouts], dtype=np.int64)
+    buyout_amounts = np.array([b.amount for b in buyouts], dtype=np.float64)
+    has_buyout = (buyout_days > 0) | (buyout_amounts > 0)
+
+    # Ανεξάρτητα από το πλαφόν: εισφορίσιμες αποδοχές εξαγοράς × ΔΤΚ έτους εξαγοράς
+    buyout_dtk = dtk_table.lookup_matrix(dtk_years, buyout_years)
+    buyout_pensionable = FUNDS[fund]['buyout_insurable'](buyout_amounts) * buyout_dtk
+
+    frames = []
+    n_dtk, n_buyout = len(dtk_years), len(buyouts)
+    for name, totals in totals_by_ceiling.items():
+        if totals is None or totals.empty:
+            continue
+        years = pd.to_numeric(totals['ΕΤΟΣ']).to_numpy()
+        insurable = totals['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'].to_numpy(dtype=np.float64)
+        days = totals['ΗΜΕΡ. ΑΠΑΣΧ.'].sum()
+
+        # Συντάξιμες αποδοχές ανά έτος για όλα τα έτη αναφοράς: ΔΤΚ × έτη
+        pensionable = dtk_table.lookup_matrix(dtk_years, years) * insurable
+        without_buyout = _row_sums(pensionable)
+        # Με εξαγορά: η γραμμή ΕΞΑΓΟΡΑ ως τελευταία στήλη, για κάθε (ΔΤΚ, εξαγορά)
+        with_buyout = _row_sums(np.concatenate([
+            np.repeat(pensionable, n_buyout, axis=0),
+            buyout_pensionable.reshape(-1, 1),
+        ], axis=1)).reshape(n_dtk, n_buyout)
+        total_pensionable = np.where(has_buyout, with_buyout, without_buyout[:, None])
+
+        total_days = days + np.where(has_buyout, buyout_days, 0)
+        months = np.where(total_days > 0, total_days / DAYS_PER_MONTH, 0.0)
+        average = np.divide(
+            total_pensionable, months, out=np.zeros_like(total_pensionable), where=months > 0
+        )
+
+        frames.append(pd.DataFrame({
+            'ΠΛΑΦΟΝ': name,
+            'ΕΤΟΣ ΑΝΑΦΟΡΑΣ ΔΤΚ': np.repeat(dtk_years, n_buyout),
+            'ΗΜΕΡΕΣ ΕΞΑΓΟΡΑΣ': np.tile(buyout_days, n_dtk),
+            'ΕΤΟΣ ΕΞΑΓΟΡΑΣ': np.tile(buyout_years, n_dtk),
+            'ΠΟΣΟ ΕΞΑΓΟΡΑΣ': np.tile(buyout_amounts, n_dtk),
+            'ΣΥΝΟΛΟ ΗΜΕΡΩΝ': np.tile(total_days, n_dtk),
+            'ΜΗΝΕΣ': np.tile(months, n_dtk),
+            'ΣΥΝΟΛΟ ΣΥΝΤΑΞΙΜΩΝ ΑΠΟΔΟΧΩΝ': total_pensionable.ravel(),
+            'ΜΕΣΟΣ ΣΥΝΤΑΞΙΜΟΣ ΜΙΣΘΟΣ': average.ravel(),
+        }))
+
+    if not frames:
+        return pd.DataFrame([], columns=SCENARIO_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def scenario_comparison(scenarios, value='ΜΕΣΟΣ ΣΥΝΤΑΞΙΜΟΣ ΜΙΣΘΟΣ'):
+    """
+    Πίνακας σύγκρισης: γραμμές τα έτη αναφοράς ΔΤΚ (φθίνουσα σειρά), στήλες
+    οι συνδυασμοί πλαφόν / εξαγοράς, τιμές η στήλη `value`.
+    """
+    if scenarios.empty:
+        return pd.DataFrame([])
+    labels = [
+        f"{ceiling} · εξαγορά {days} ημ. / {format_currency_gr(amount) or '€0'} ({year})"
+        if days > 0 or amount > 0 else str(ceiling)
+        for ceiling, days, year, amount in zip(
+            scenarios['ΠΛΑΦΟΝ'], scenarios['ΗΜΕΡΕΣ ΕΞΑΓΟΡΑΣ'], scenarios['ΕΤΟΣ ΕΞΑΓΟΡΑΣ'], scenarios['ΠΟΣΟ ΕΞΑΓΟΡΑΣ']
+        )
+    ]
+    table = scenarios.assign(ΣΕΝΑΡΙΟ=labels).pivot_table(
+        index='ΕΤΟΣ ΑΝΑΦΟΡΑΣ ΔΤΚ', columns='ΣΕΝΑΡΙΟ', values=value, aggfunc='first', sort=False
+    )
+    return table.sort_index(ascending=False).rename_axis(columns=None).reset_index()
@@ -0,0 +1,191 @@
+"""
+Cache αναλύσεων PDF με κλειδί το περιεχόμενο του αρχείου.
+
+Το κλειδί είναι το SHA-256 των bytes του PDF μαζί με το PARSER_VERSION και τη
+μηχανή εξαγωγής, ώστε μια αλλαγή στη λογική ανάλυσης να ακυρώνει αυτόματα τις
+παλιές εγγραφές.
+
+Δύο επίπεδα:
+- μνήμη: LRU με όριο πλήθους εγγραφών, όριο μεγέθους και TTL
+- δίσκος (προαιρετικό): το ζεύγος df_monthly/df_annual σε αρχεία Parquet
+"""
+import hashlib
+import importlib.util
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from efka_core.frames import view
+from efka_core.insurable import SOURCE_KEY_ATTR
+from pdf_parser import PARSER_VERSION, compact_monthly_dataframe, parse_efka_pdf, resolve_parse_engine
+
+DEFAULT_MAX_ENTRIES = 32
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+
+# Φάκελος για το cache δίσκου (αν δεν οριστεί, χρησιμοποιείται μόνο η μνήμη)
+CACHE_DIR_ENV = "EFKA_PARSE_CACHE_DIR"
+
+
+def content_hash(file_bytes):
+    """SHA-256 (hex) των bytes του αρχείου."""
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def hash_cache_key(file_hash, engine=None, compact=False):
+    """Κλειδί cache από έτοιμο content_hash (π.χ. για καταστάσεις του statement_store)."""
+    key = f"{file_hash}-v{PARSER_VERSION}-{resolve_parse_engine(engine)}"
+    return f"{key}-compact" if compact else key
+
+
+def cache_key(file_bytes, engine=None, compact=False):
+    """Κλειδί cache: hash περιεχομένου + έκδοση parser + μηχανή εξαγωγής (+ συμπαγές σχήμα)."""
+    return hash_cache_key(content_hash(file_bytes), engine, compact)
+
+
+def _frames_nbytes(frames):
+    return int(sum(df.memory_usage(index=True, deep=True).sum() for df in frames))
+
+
+def parquet_available():
+    """Αν υπάρχει βιβλιοθήκη για Parquet (pyarrow ή fastparquet)."""
+    return any(importlib.util.find_spec(name) is not None for name in ("pyarrow", "fastparquet"))
+
+
+class ParseCache:
+    """
+    Cache δύο επιπέδων για τα αποτελέσματα του parse_efka_pdf.
+
+    Τα DataFrames που επιστρέφονται είναι όψεις (efka_core.frames.view) πάνω
+    στα κοινά δεδομένα της εγγραφής: αλλαγές του καλούντος μένουν στην όψη του.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl_seconds=DEFAULT_TTL_SECONDS, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir if disk_dir and parquet_available() else None
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+        self._entries = OrderedDict()  # key -> (expires_at, nbytes, frames)
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    # --- Μνήμη ---
+    def _evict(self):
+        now = time.monotonic()
+        for key in [k for k, (expires_at, _, _) in self._entries.items() if expires_at <= now]:
+            self._drop(key)
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._entries)))
+
+    def _drop(self, key):
+        _, nbytes, _ = self._entries.pop(key)
+        self._total_bytes -= nbytes
+
+    def _remember(self, key, frames):
+        # Τα αποτελέσματα των υπολογισμών (π.χ. compute_insurable) κρατιούνται με αυτό το κλειδί
+        for df in frames:
+            df.attrs[SOURCE_KEY_ATTR] = key
+        nbytes = _frames_nbytes(frames)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, nbytes, frames)
+            self._total_bytes += nbytes
+            self._evict()
+
+    # --- Δίσκος ---
+    def _disk_paths(self, key):
+        return (
+            os.path.join(self.disk_dir, f"{key}.monthly.parquet"),
+            os.path.join(self.disk_dir, f"{key}.annual.parquet"),
+        )
+
+    def _load_from_disk(self, key):
+        if not self.disk_dir:
+            return None
+        paths = self._disk_paths(key)
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        try:
+            return tuple(pd.read_parquet(path) for path in paths)
+        except (OSError, ValueError):
+            return None
+
+    def _store_on_disk(self, key, frames):
+        if not self.disk_dir:
+            return
+        try:
+            for df, path in zip(frames, self._disk_paths(key)):
+                tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                df.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+        except (OSError, ValueError, ImportError):
+            # Το cache δίσκου είναι βελτιστοποίηση: αποτυχία εγγραφής δεν είναι σφάλμα
+            pass
+
+    # --- Δημόσιο API ---
+    def get(self, key):
+        """Επιστρέφει (df_monthly, df_annual) ή None αν δεν υπάρχει εγγραφή."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return tuple(view(df) for df in entry[2])
+                self._drop(key)
+        frames = self._load_from_disk(key)
+        if frames is not None:
+            self._remember(key, frames)
+            frames = tuple(view(df) for df in frames)
+        return frames
+
+    def put(self, key, frames):
+        frames = tuple(frames)
+        self._remember(key, frames)
+        self._store_on_disk(key, frames)
+
+    def get_or_parse(self, file_bytes, parse=parse_efka_pdf, engine=None, compact=False):
+        """
+        Επιστρέφει τα DataFrames από το cache ή αναλύει το PDF και τα αποθηκεύει
+        (με compact=True το df_monthly σε συμπαγές σχήμα, βλ. compact_monthly_dataframe).
+        """
+        engine = resolve_parse_engine(engine)
+        key = cache_key(file_bytes, engine, compact)
+        frames = self.get(key)
+        if frames is None:
+            frames = tuple(parse(file_bytes, engine=engine))
+            if compact:
+                frames = (compact_monthly_dataframe(frames[0]),) + frames[1:]
+            self.put(key, frames)
+            frames = tuple(view(df) for df in frames)
+        return frames
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._total_bytes}
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Κοινό cache της διεργασίας (επιβιώνει στα reruns του Streamlit)."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = ParseCache(disk_dir=os.environ.get(CACHE_DIR_ENV) or None)
+        return _default_cache
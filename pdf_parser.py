@@ -1,8 +1,19 @@
+import bisect
+import multiprocessing
+import os
 import pandas as pd
 import pdfplumber
 import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 
+from efka_core.diagnostics import phase, span
+
+# Έκδοση λογικής ανάλυσης: αυξάνεται σε κάθε αλλαγή που επηρεάζει το αποτέλεσμα
+# του parse_efka_pdf, ώστε να ακυρώνονται οι αποθηκευμένες αναλύσεις (parse_cache)
+PARSER_VERSION = "3"
+
 # Lookup table για την περιγραφή αποδοχών
 APODOXES_DESCRIPTIONS = {
     '01': 'Τακτικές αποδοχές', '02': 'Αποδοχές υπαλλήλων ΝΠΔΔ κλπ.', '03': 'Δώρο Χριστουγέννων',
@@ -109,81 +120,202 @@ def clean_numeric_value(value):
     except (ValueError, TypeError):
         return 0.0
 
-def smart_summary_row_mapping(row):
+def parse_greek_numbers(values):
     """
-    Έξυπνη επεξεργασία γραμμής συνοπτικών δεδομένων με κανόνες mapping ανά στήλη.
-    Χρησιμοποιεί patterns για να βρει τα δεδομένα στις σωστές στήλες.
+    Διανυσματική εκδοχή του clean_numeric_value για ολόκληρη στήλη.
+
+    Αφαιρεί '€' και τελείες χιλιάδων, μετατρέπει το δεκαδικό κόμμα σε τελεία
+    και επιστρέφει Series float64· κενές ή μη αναγνώσιμες τιμές γίνονται 0.0.
     """
-    if not row or len(row) < 3:
-        return None
-    
-    cleaned_row = [str(cell).strip() if cell else '' for cell in row]
-    
-    processed_row = [''] * 7
-    
-    earnings_pattern = re.compile(r'^\d{1,3}(\.\d{3})*,\d{2}$')
-    days_pattern = re.compile(r'^\d{1,3}$')
-    year_pattern = re.compile(r'^\d{4}$')
-    package_pattern = re.compile(r'^\d+$')
-    
-    if len(cleaned_row) >= 2:
-        if year_pattern.match(cleaned_row[0]):
+    series = values if isinstance(values, pd.Series) else pd.Series(values, dtype=object)
+    text = (
+        series.astype(str)
+        .str.replace('€', '', regex=False)
+        .str.replace('.', '', regex=False)
+        .str.replace(',', '.', regex=False)
+        .str.strip()
+    )
+    try:
+        numbers = text.astype('float64')
+    except (ValueError, TypeError):
+        # Υπάρχει τουλάχιστον μία μη αριθμητική τιμή: μετατροπή ανά στοιχείο με coerce
+        numbers = pd.to_numeric(text, errors='coerce').astype('float64')
+    return numbers.fillna(0.0)
+
+class EfkaRowClassifier:
+    """
+    Αναγνώριση και κανονικοποίηση γραμμών πίνακα του e-EFKA σε ένα πέρασμα.
+
+    Τα patterns μεταγλωττίζονται μία φορά και οι κωδικοί ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ
+    ελέγχονται με frozenset, ώστε το κόστος ανά γραμμή να είναι σταθερό.
+    """
+
+    def __init__(self, type_codes):
+        self.type_codes = frozenset(type_codes)
+        self.period_pattern = re.compile(r"^\d{2}/\d{4}$")
+        self.year_pattern = re.compile(r"^\d{4}$")
+        self.package_pattern = re.compile(r"^\d+$")
+        self.amount_pattern = re.compile(r"^\d{1,3}(\.\d{3})*,\d{2}$")
+        self.detailed_days_pattern = re.compile(r"^\d{1,2}$")
+        self.summary_days_pattern = re.compile(r"^\d{1,3}$")
+
+    def classify(self, row, allow_annual=True):
+        """
+        Επιστρέφει ('monthly', γραμμή 9 στηλών), ('annual', γραμμή 7 στηλών)
+        ή (None, None) για γραμμές που δεν είναι δεδομένα.
+        allow_annual=False για την πρώτη γραμμή πίνακα (επικεφαλίδα).
+        """
+        if not row or not row[0]:
+            return None, None
+        first = str(row[0])
+
+        # Αναλυτικά μηνιαία δεδομένα (π.χ., "01/2002")
+        if self.period_pattern.match(first):
+            processed_row = self.normalize_detailed(row)[:len(MONTHLY_COLUMNS)]
+            if len(processed_row) < len(MONTHLY_COLUMNS):
+                processed_row += [None] * (len(MONTHLY_COLUMNS) - len(processed_row))
+            return 'monthly', processed_row
+
+        # Συνοπτικά ετήσια δεδομένα (π.χ., "2002")
+        if allow_annual and self.year_pattern.match(first):
+            # Γραμμή σπασμένη σε δύο στο PDF: κρατάμε το πρώτο τμήμα του ΠΑΚ. ΚΑΛ.,
+            # το δεύτερο δεν έχει περιγραφή και δεν αποτελεί ετήσια εγγραφή
+            if len(row) > 2 and row[1] is not None and '\n' in str(row[1]):
+                parts = str(row[1]).split('\n')
+                if len(parts) == 2:
+                    row = [row[0], parts[0]] + list(row[2:])
+            mapped_row = self.map_summary(row)
+            if mapped_row:
+                return 'annual', mapped_row
+
+        return None, None
+
+    def map_summary(self, row):
+        """Βλ. smart_summary_row_mapping."""
+        if not row or len(row) < 3:
+            return None
+
+        cleaned_row = [str(cell).strip() if cell else '' for cell in row]
+
+        processed_row = [''] * 7
+
+        if self.year_pattern.match(cleaned_row[0]):
             processed_row[0] = cleaned_row[0]
         else:
             return None
-        
-        if package_pattern.match(cleaned_row[1]):
+
+        if self.package_pattern.match(cleaned_row[1]):
             processed_row[1] = cleaned_row[1]
         else:
             return None
-    
-    description_parts = []
-    earnings_found = False
-    days_worked_found = False
-    days_insured_found = False
-    
-    for i, cell in enumerate(cleaned_row[2:], 2):
-        if not cell:
-            continue
-        
-        if "ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ" in cell:
+
+        amount_match = self.amount_pattern.match
+        days_match = self.summary_days_pattern.match
+        description_parts = []
+        earnings_found = False
+        days_worked_found = False
+        days_insured_found = False
+
+        for cell in cleaned_row[2:]:
+            if not cell:
+                continue
+
+            if "ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ" in cell:
+                processed_row[6] = "ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ"
+                continue
+
+            if cell == "ΟΡ":
+                if not processed_row[6]:
+                    processed_row[6] = "ΟΡ"
+                continue
+
+            if not earnings_found and amount_match(cell):
+                processed_row[3] = cell
+                earnings_found = True
+                continue
+
+            if earnings_found and not days_worked_found and days_match(cell):
+                processed_row[4] = cell
+                days_worked_found = True
+                continue
+
+            if days_worked_found and not days_insured_found and days_match(cell):
+                processed_row[5] = cell
+                days_insured_found = True
+                continue
+
+            if not earnings_found:
+                description_parts.append(cell)
+
+        processed_row[2] = ' '.join(description_parts).strip()
+
+        if not processed_row[6] and "ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ" in processed_row[2]:
             processed_row[6] = "ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ"
-            continue
-        
-        if cell == "ΟΡ":
-            if not processed_row[6]:
-                processed_row[6] = "ΟΡ"
-            continue
-        
-        if not earnings_found and earnings_pattern.match(cell):
-            processed_row[3] = cell
-            earnings_found = True
-            continue
-        
-        if earnings_found and not days_worked_found and days_pattern.match(cell):
-            processed_row[4] = cell
-            days_worked_found = True
-            continue
-        
-        if days_worked_found and not days_insured_found and days_pattern.match(cell):
-            processed_row[5] = cell
-            days_insured_found = True
-            continue
-        
-        if not earnings_found:
-            description_parts.append(cell)
-    
-    processed_row[2] = ' '.join(description_parts).strip()
-    
-    if not processed_row[6] and "ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ" in processed_row[2]:
-        processed_row[6] = "ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ"
-        processed_row[2] = processed_row[2].replace("ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ", "").strip()
-    
-    if processed_row[0] and processed_row[1] and processed_row[2]:
-        return processed_row
-    else:
+            processed_row[2] = processed_row[2].replace("ΟΡΙΣΤΙΚΟΠΟΙΗΜΕΝΕΣ", "").strip()
+
+        if processed_row[0] and processed_row[1] and processed_row[2]:
+            return processed_row
         return None
 
+    def normalize_detailed(self, row):
+        """Βλ. normalize_detailed_row."""
+        if not row:
+            return None
+
+        row_values = [str(cell).strip() if cell is not None else "" for cell in row]
+
+        # Βασική επικύρωση περιόδου
+        if not self.period_pattern.match(row_values[0]):
+            return None
+
+        # Εντοπισμός ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ μετά τις ΗΜΕΡ. ΑΠΑΣΧ.
+        type_codes = self.type_codes
+        type_idx = None
+        for idx in range(6, len(row_values)):
+            if row_values[idx] in type_codes:
+                type_idx = idx
+                break
+
+        if type_idx is None:
+            return row_values
+
+        # Εντοπισμός ΑΠΟΔΟΧΕΣ και ΕΙΣΦΟΡΕΣ μετά τον τύπο
+        amount_match = self.amount_pattern.match
+        apodoxes_idx = None
+        eisfores_idx = None
+        for idx in range(type_idx + 1, len(row_values)):
+            if amount_match(row_values[idx]):
+                if apodoxes_idx is None:
+                    apodoxes_idx = idx
+                    continue
+                eisfores_idx = idx
+                break
+
+        # Αν δεν βρέθηκαν ποσά, επιστρέφουμε όπως είναι
+        if apodoxes_idx is None:
+            return row_values
+
+        # Σύνθεση κανονικοποιημένης γραμμής
+        return [
+            row_values[0],  # ΠΕΡΙΟΔΟΣ
+            row_values[1] if len(row_values) > 1 else "",  # ΚΩΔ. ΚΑΔ
+            row_values[2] if len(row_values) > 2 else "",  # ΚΩΔ. ΕΙΔΙΚ.
+            row_values[3] if len(row_values) > 3 else "",  # ΚΩΔΙΚΟΣ ΕΙΔΙΚΗΣ ΠΕΡΙΠΤΩΣΗΣ
+            row_values[4] if len(row_values) > 4 else "",  # ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ
+            row_values[5] if len(row_values) > 5 and self.detailed_days_pattern.match(row_values[5]) else "",  # ΗΜΕΡ. ΑΠΑΣΧ.
+            row_values[type_idx],  # ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ
+            row_values[apodoxes_idx],  # ΑΠΟΔΟΧΕΣ
+            row_values[eisfores_idx] if eisfores_idx is not None else "",  # ΕΙΣΦΟΡΕΣ
+        ]
+
+
+def smart_summary_row_mapping(row):
+    """
+    Έξυπνη επεξεργασία γραμμής συνοπτικών δεδομένων με κανόνες mapping ανά στήλη.
+    Χρησιμοποιεί patterns για να βρει τα δεδομένα στις σωστές στήλες.
+    """
+    return ROW_CLASSIFIER.map_summary(row)
+
 def normalize_detailed_row(row):
     """
     Κανονικοποιεί γραμμή αναλυτικών δεδομένων με κανόνες:
@@ -192,177 +324,445 @@ def normalize_detailed_row(row):
     - ΑΠΟΔΟΧΕΣ/ΕΙΣΦΟΡΕΣ: ποσά σε ελληνικό format
     Εντοπίζει δυναμικά τη θέση των πεδίων και διορθώνει μετατοπίσεις.
     """
-    if not row:
-        return None
+    return ROW_CLASSIFIER.normalize_detailed(row)
 
-    def is_period(value):
-        return bool(re.match(r"^\d{2}/\d{4}$", str(value).strip()))
+TABLE_SETTINGS = {
+    "vertical_strategy": "text",
+    "horizontal_strategy": "text",
+}
 
-    def is_days(value):
-        return bool(re.match(r"^\d{1,2}$", str(value).strip()))
+# Δημιουργία DataFrame για τα αναλυτικά μηνιαία δεδομένα
+# Χρησιμοποιούμε 9 βασικές στήλες όπως στην παλιότερη εφαρμογή
+MONTHLY_COLUMNS = [
+    'ΠΕΡΙΟΔΟΣ', 'ΚΩΔ. ΚΑΔ', 'ΚΩΔ. ΕΙΔΙΚ.', 'ΚΩΔΙΚΟΣ ΕΙΔΙΚΗΣ ΠΕΡΙΠΤΩΣΗΣ',
+    'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ', 'ΗΜΕΡ. ΑΠΑΣΧ.', 'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ', 'ΑΠΟΔΟΧΕΣ',
+    'ΕΙΣΦΟΡΕΣ'
+]
 
-    def is_type_code(value):
-        return str(value).strip() in APODOXES_DESCRIPTIONS
+# Συμπαγές σχήμα (compact_monthly_dataframe): στήλες με λίγες διακριτές τιμές ως category
+MONTHLY_CATEGORY_COLUMNS = [
+    'ΠΕΡΙΟΔΟΣ', 'ΚΩΔ. ΚΑΔ', 'ΚΩΔ. ΕΙΔΙΚ.', 'ΚΩΔΙΚΟΣ ΕΙΔΙΚΗΣ ΠΕΡΙΠΤΩΣΗΣ',
+    'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ', 'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ', 'ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ'
+]
+# Ακέραιος αριθμός περιόδου (έτος * 12 + μήνας) που προσθέτει το συμπαγές σχήμα
+PERIOD_INDEX_COLUMN = 'ΑΡ. ΠΕΡΙΟΔΟΥ'
 
-    def is_amount(value):
-        return bool(re.match(r"^\d{1,3}(\.\d{3})*,\d{2}$", str(value).strip()))
+# Συνοπτικά ετήσια δεδομένα
+ANNUAL_COLUMNS = [
+    'ΕΤΟΣ', 'ΠΑΚ. ΚΑΛ.', 'ΠΕΡΙΓΡΑΦΗ', 'ΑΠΟΔΟΧΕΣ',
+    'ΗΜΕΡ. ΑΠΑΣΧ.', 'ΗΜΕΡ. ΠΡΟΣ.', 'ΚΑΤΑΣΤΑΣΗ'
+]
 
-    row_values = [str(cell).strip() if cell is not None else "" for cell in row]
+# Κοινός classifier γραμμών (τα patterns μεταγλωττίζονται μία φορά ανά διεργασία)
+ROW_CLASSIFIER = EfkaRowClassifier(APODOXES_DESCRIPTIONS)
 
-    # Βασική επικύρωση περιόδου
-    if not is_period(row_values[0]):
-        return None
+# Μηχανή εξαγωγής: "tables" (extract_tables του pdfplumber) ή "words"
+# (γρήγορη εξαγωγή με λέξεις και επιστροφή στο "tables" ανά σελίδα όπου χρειάζεται)
+PARSE_ENGINE_ENV = "EFKA_PARSE_ENGINE"
+PARSE_ENGINES = ("tables", "words")
 
-    # Εντοπισμός ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ μετά τις ΗΜΕΡ. ΑΠΑΣΧ.
-    type_idx = None
-    for idx in range(6, len(row_values)):
-        if is_type_code(row_values[idx]):
-            type_idx = idx
-            break
-
-    if type_idx is None:
-        return row_values
-
-    # Εντοπισμός ΑΠΟΔΟΧΕΣ και ΕΙΣΦΟΡΕΣ μετά τον τύπο
-    apodoxes_idx = None
-    eisfores_idx = None
-    for idx in range(type_idx + 1, len(row_values)):
-        if apodoxes_idx is None and is_amount(row_values[idx]):
-            apodoxes_idx = idx
-            continue
-        if apodoxes_idx is not None and is_amount(row_values[idx]):
-            eisfores_idx = idx
-            break
-
-    # Αν δεν βρέθηκαν ποσά, επιστρέφουμε όπως είναι
-    if apodoxes_idx is None:
-        return row_values
-
-    # Σύνθεση κανονικοποιημένης γραμμής
-    return [
-        row_values[0],  # ΠΕΡΙΟΔΟΣ
-        row_values[1] if len(row_values) > 1 else "",  # ΚΩΔ. ΚΑΔ
-        row_values[2] if len(row_values) > 2 else "",  # ΚΩΔ. ΕΙΔΙΚ.
-        row_values[3] if len(row_values) > 3 else "",  # ΚΩΔΙΚΟΣ ΕΙΔΙΚΗΣ ΠΕΡΙΠΤΩΣΗΣ
-        row_values[4] if len(row_values) > 4 else "",  # ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ
-        row_values[5] if len(row_values) > 5 and is_days(row_values[5]) else "",  # ΗΜΕΡ. ΑΠΑΣΧ.
-        row_values[type_idx],  # ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ
-        row_values[apodoxes_idx],  # ΑΠΟΔΟΧΕΣ
-        row_values[eisfores_idx] if eisfores_idx is not None else "",  # ΕΙΣΦΟΡΕΣ
-    ]
-
-def parse_efka_pdf(file_bytes):
+# Παράλληλη ανάλυση: πλήθος διεργασιών (1 = σειριακά, 0 = όλοι οι πυρήνες)
+PARSE_WORKERS_ENV = "EFKA_PARSE_WORKERS"
+# Ελάχιστες σελίδες ανά διεργασία: κάθε worker ξεκινά με import του pandas/pdfplumber,
+# που αποσβένεται μόνο με αρκετές σελίδες (βλ. benchmarks/bench_parser.py --workers)
+PARALLEL_PAGES_PER_WORKER = 12
+
+
+def _extract_page_rows(page):
     """
-    Αναλύει το PDF αρχείο του e-EFKA και εξάγει τα δεδομένα σε δύο DataFrames.
+    Εξάγει τις κανονικοποιημένες μηνιαίες και ετήσιες γραμμές μίας σελίδας.
     """
-    monthly_data = []
-    annual_data = []
+    rows = {'monthly': [], 'annual': []}
+    classify = ROW_CLASSIFIER.classify
 
-    table_settings = {
-        "vertical_strategy": "text",
-        "horizontal_strategy": "text",
-    }
+    with phase("extract_tables"):
+        tables = page.extract_tables(TABLE_SETTINGS)
+    with phase("classify"):
+        for table in tables:
+            for row_idx, row in enumerate(table):
+                # Η πρώτη γραμμή κάθε πίνακα είναι επικεφαλίδα: όχι ετήσια δεδομένα
+                kind, processed_row = classify(row, allow_annual=row_idx > 0)
+                if kind:
+                    rows[kind].append(processed_row)
 
-    date_pattern = re.compile(r"^\d{2}/\d{4}$")
-    date_pattern_alt1 = re.compile(r"^\d{2}/\d{4}$")  # Same as main pattern
-    date_pattern_alt2 = re.compile(r"^\d{1,2}/\d{4}$")  # Allow single digit month
-    year_pattern = re.compile(r"^\d{4}$")
+    return rows['monthly'], rows['annual']
 
-    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
-        for page in pdf.pages:
-            tables = page.extract_tables(table_settings)
-            for table in tables:
-                for row_idx, row in enumerate(table):
-                    if not row:
-                        continue
-                    
-                    # Αναγνώριση μηνιαίων δεδομένων (π.χ., "01/2002")
-                    if row[0] and date_pattern.match(str(row[0])):
-                        monthly_data.append(row)
-                    elif row[0] and date_pattern_alt1.match(str(row[0])):
-                        monthly_data.append(row)
-                    elif row[0] and date_pattern_alt2.match(str(row[0])):
-                        monthly_data.append(row)
-                    # Έλεγχος για shifted detailed data σε non-empty columns
-                    elif row and len(row) > 0:
-                        non_empty_cols = [i for i, cell in enumerate(row) if cell and str(cell).strip()]
-                        if non_empty_cols and date_pattern.match(str(row[non_empty_cols[0]])):
-                            monthly_data.append(row)
-                        elif non_empty_cols and date_pattern_alt1.match(str(row[non_empty_cols[0]])):
-                            monthly_data.append(row)
-                        elif non_empty_cols and date_pattern_alt2.match(str(row[non_empty_cols[0]])):
-                            monthly_data.append(row)
-                    
-                    # Αναγνώριση ετήσιων δεδομένων (π.χ., "2002") - skip header row
-                    if row_idx > 0 and row and row[0] and year_pattern.match(str(row[0])):
-                        # Εδώ χειριζόμαστε και την περίπτωση που μια γραμμή ετήσιων δεδομένων
-                        # είναι σπασμένη σε δύο γραμμές στο PDF
-                        if len(row) > 1 and row[1] is not None and '\n' in str(row[1]):
-                            parts = str(row[1]).split('\n')
-                            if len(parts) == 2 and len(row) > 2:
-                                # Δημιουργούμε δύο νέες γραμμές από τη μία
-                                annual_data.append([row[0], parts[0]] + row[2:])
-                                annual_data.append([row[0], parts[1]] + [None] * (len(row) - 2))
-                            else:
-                                annual_data.append(row)
-                        else:
-                            annual_data.append(row)
-
-
-    # Δημιουργία DataFrame για τα αναλυτικά μηνιαία δεδομένα
-    # Χρησιμοποιούμε 9 βασικές στήλες όπως στην παλιότερη εφαρμογή
-    monthly_columns = [
-        'ΠΕΡΙΟΔΟΣ', 'ΚΩΔ. ΚΑΔ', 'ΚΩΔ. ΕΙΔΙΚ.', 'ΚΩΔΙΚΟΣ ΕΙΔΙΚΗΣ ΠΕΡΙΠΤΩΣΗΣ',
-        'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ', 'ΗΜΕΡ. ΑΠΑΣΧ.', 'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ', 'ΑΠΟΔΟΧΕΣ',
-        'ΕΙΣΦΟΡΕΣ'
-    ]
-
-    # Προσαρμόζουμε τα δεδομένα στις 9 στήλες
-    processed_monthly = []
-    for row in monthly_data:
-        processed_row = normalize_detailed_row(row)
-        if processed_row is None:
-            continue
-        # Παίρνουμε τις πρώτες 9 στήλες μετά την κανονικοποίηση
-        processed_row = processed_row[:9]
-        
-        # Προσαρμόζουμε στον αριθμό των στηλών που περιμένουμε
-        if len(processed_row) < len(monthly_columns):
-            processed_monthly.append(processed_row + [None] * (len(monthly_columns) - len(processed_row)))
+
+# --- Γρήγορη εξαγωγή με λέξεις (χωρίς ανίχνευση πίνακα) ---
+# Επικεφαλίδες που αναγνωρίζουν τη διάταξη e-EFKA: μια γραμμή που περιέχει όλες
+# τις λέξεις-κλειδιά ξεκινά ενότητα αναλυτικών (monthly) ή συνοπτικών (annual) δεδομένων
+WORD_SECTION_HEADERS = {
+    'monthly': ('ΠΕΡΙΟΔΟΣ', 'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ'),
+    'annual': ('ΕΤΟΣ', 'ΠΕΡΙΓΡΑΦΗ', 'ΑΠΟΔΟΧΕΣ'),
+}
+WORD_ROW_PATTERNS = {
+    'monthly': re.compile(r"^\d{2}/\d{4}$"),
+    'annual': re.compile(r"^\d{4}$"),
+}
+# Ανοχή (pt) για λέξεις στην ίδια γραμμή, ίδια με το y_tolerance του pdfplumber
+WORD_LINE_TOLERANCE = 3
+# Μέγιστο ύψος επικεφαλίδας σε γραμμές κειμένου (π.χ. "ΚΩΔ." / "ΠΑΚΕΤΟ" / "ΚΑΛΥΨΗΣ")
+WORD_HEADER_MAX_LINES = 4
+
+
+def _group_word_lines(words):
+    """Ομαδοποιεί τις λέξεις σε γραμμές κειμένου (με βάση το top), ταξινομημένες κατά x."""
+    lines = []
+    for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
+        if lines and word['top'] - lines[-1][0] <= WORD_LINE_TOLERANCE:
+            lines[-1][1].append(word)
         else:
-            processed_monthly.append(processed_row[:len(monthly_columns)])
+            lines.append((word['top'], [word]))
+    return [sorted(line_words, key=lambda w: w['x0']) for _, line_words in lines]
 
 
-    df_monthly = pd.DataFrame(processed_monthly, columns=monthly_columns)
+def _column_spans(header_lines):
+    """
+    Οριζόντιο εύρος κάθε στήλης από τις λέξεις της επικεφαλίδας: λέξεις που
+    επικαλύπτονται οριζόντια (σε οποιαδήποτε γραμμή της επικεφαλίδας) ανήκουν
+    στην ίδια στήλη.
+    """
+    columns = []
+    for x0, x1 in sorted((w['x0'], w['x1']) for line in header_lines for w in line):
+        if columns and x0 <= columns[-1][1]:
+            columns[-1][1] = max(columns[-1][1], x1)
+        else:
+            columns.append([x0, x1])
+    return columns
 
 
-    # Δημιουργία DataFrame για τα συνοπτικά ετήσια δεδομένα
-    annual_columns = [
-        'ΕΤΟΣ', 'ΠΑΚ. ΚΑΛ.', 'ΠΕΡΙΓΡΑΦΗ', 'ΑΠΟΔΟΧΕΣ',
-        'ΗΜΕΡ. ΑΠΑΣΧ.', 'ΗΜΕΡ. ΠΡΟΣ.', 'ΚΑΤΑΣΤΑΣΗ'
-    ]
-    # Χρησιμοποιούμε την έξυπνη αντιστοίχιση για να βρούμε τα δεδομένα στις σωστές στήλες
-    processed_annual = []
-    for row in annual_data:
-        mapped_row = smart_summary_row_mapping(row)
-        if mapped_row:
-            processed_annual.append(mapped_row)
+def _column_boundaries(columns):
+    """Το όριο δύο διαδοχικών στηλών είναι το μέσο του κενού ανάμεσά τους."""
+    return [(left[1] + right[0]) / 2 for left, right in zip(columns, columns[1:])]
 
-    if processed_annual:
-        df_annual = pd.DataFrame(processed_annual, columns=annual_columns)
-    else:
-        df_annual = pd.DataFrame(columns=annual_columns)
+
+def _within_columns(line, columns):
+    """Αν κάθε λέξη της γραμμής επικαλύπτει οριζόντια κάποια στήλη της επικεφαλίδας."""
+    return all(
+        any(word['x0'] <= x1 and word['x1'] >= x0 for x0, x1 in columns)
+        for word in line
+    )
+
+
+def _table_edges(words):
+    """
+    Οι x-θέσεις των κάθετων ορίων που βρίσκει το extract_tables (στρατηγική "text")
+    για τις ίδιες λέξεις· οι ακραίες είναι η οριζόντια έκταση του πίνακα.
+    """
+    tolerance = pdfplumber.table.DEFAULT_SNAP_TOLERANCE
+    edges = pdfplumber.table.merge_edges(
+        pdfplumber.table.words_to_edges_v(words),
+        snap_x_tolerance=tolerance,
+        snap_y_tolerance=tolerance,
+        join_x_tolerance=pdfplumber.table.DEFAULT_JOIN_TOLERANCE,
+        join_y_tolerance=pdfplumber.table.DEFAULT_JOIN_TOLERANCE,
+    )
+    return sorted({edge['x0'] for edge in edges})
+
+
+def _split_edge_line(line, edges):
+    """
+    Χωρίζει μια γραμμή στα κελιά που θα έβγαζε το extract_tables με αυτά τα
+    κάθετα όρια: λέξεις έξω από την έκταση του πίνακα αγνοούνται. None αν ένα
+    όριο κόβει μια λέξη (το extract_tables θα τη μοίραζε σε δύο κελιά).
+    """
+    inside = []
+    for word in line:
+        if word['x0'] >= edges[-1] or word['x1'] <= edges[0]:
+            continue
+        if any(word['x0'] < edge < word['x1'] for edge in edges):
+            return None
+        inside.append(word)
+    return _split_word_line(inside, edges[1:-1])
+
+
+def _split_word_line(line, boundaries):
+    cells = [[] for _ in range(len(boundaries) + 1)]
+    for word in line:
+        center = (word['x0'] + word['x1']) / 2
+        cells[bisect.bisect_right(boundaries, center)].append(word['text'])
+    return [' '.join(parts) for parts in cells]
+
+
+def _extract_page_rows_words(page):
+    """
+    Εναλλακτικό του _extract_page_rows: διαβάζει μία φορά τις λέξεις της σελίδας
+    και τις κατανέμει σε στήλες με βάση τα x-όρια της επικεφαλίδας, χωρίς το
+    ακριβό extract_tables. Επιστρέφει None, ώστε να χρησιμοποιηθεί η κανονική
+    εξαγωγή πινάκων, αν η σελίδα δεν έχει αναγνωρίσιμη επικεφαλίδα αναλυτικών
+    δεδομένων ή αν το αποτέλεσμα μπορεί να διαφέρει από το extract_tables:
+    - σελίδες συνοπτικής κατάστασης (γραμμές σπασμένες σε δύο στο ΠΑΚ. ΚΑΛ. και
+      περιγραφές που το extract_tables χωρίζει σε κελιά)
+    - σελίδες όπου κάποιο κάθετο όριο του extract_tables κόβει λέξη
+    Αν κάποια γραμμή έχει λέξεις εκτός των στηλών της επικεφαλίδας (μετατοπισμένα
+    ποσά), όλες οι γραμμές της σελίδας χωρίζονται με τα κάθετα όρια που θα έβρισκε
+    το extract_tables, όπως θα τις χώριζε κι εκείνο.
+    """
+    with phase("extract_words"):
+        words = page.extract_words()
+        lines = _group_word_lines(words)
+    sections = []
+    for idx, line in enumerate(lines):
+        texts = {word['text'] for word in line}
+        for kind, keywords in WORD_SECTION_HEADERS.items():
+            if all(keyword in texts for keyword in keywords):
+                sections.append((idx, kind))
+                break
+    if not sections or any(kind == 'annual' for _, kind in sections):
+        return None
+
+    rows = {'monthly': [], 'annual': []}
+    classify = ROW_CLASSIFIER.classify
+    edges = None
+    section_rows = []
+    for section_no, (start, kind) in enumerate(sections):
+        end = sections[section_no + 1][0] if section_no + 1 < len(sections) else len(lines)
+        row_pattern = WORD_ROW_PATTERNS[kind]
+
+        # Η επικεφαλίδα τελειώνει στην πρώτη γραμμή δεδομένων
+        header_end = start + 1
+        while (header_end < min(end, start + WORD_HEADER_MAX_LINES)
+               and not row_pattern.match(lines[header_end][0]['text'])):
+            header_end += 1
+        columns = _column_spans(lines[start:header_end])
+        boundaries = _column_boundaries(columns)
+
+        for line in lines[header_end:end]:
+            row = _split_word_line(line, boundaries)
+            if row_pattern.match(row[0]):
+                section_rows.append((kind, line, row))
+                if edges is None and not _within_columns(line, columns):
+                    # Μετατοπισμένα ποσά: αλλάζουν τα κάθετα όρια του
+                    # extract_tables για όλη τη σελίδα, όχι μόνο για αυτή τη γραμμή
+                    edges = _table_edges(words)
+
+    for kind, line, row in section_rows:
+        if edges is not None:
+            row = _split_edge_line(line, edges)
+            if row is None or not WORD_ROW_PATTERNS[kind].match(row[0]):
+                return None
+        row_kind, processed_row = classify(row)
+        if row_kind == kind:
+            rows[kind].append(processed_row)
+
+    return rows['monthly'], rows['annual']
+
+
+def _process_page(page, engine="tables"):
+    rows = _extract_page_rows_words(page) if engine == "words" else None
+    if rows is None:
+        rows = _extract_page_rows(page)
+    # Αποδέσμευση των cached χαρακτήρων της σελίδας: η μνήμη μένει στο μέγεθος μίας σελίδας
+    page.close()
+    return rows
+
+
+# Τα bytes του PDF φορτώνονται μία φορά ανά διεργασία-worker (initializer)
+_worker_file_bytes = None
+_worker_engine = "tables"
+
+
+def _init_page_worker(file_bytes, engine):
+    global _worker_file_bytes, _worker_engine
+    _worker_file_bytes = file_bytes
+    _worker_engine = engine
+
+
+def _extract_page_range(page_range):
+    """Worker: ανοίγει το PDF από τα κοινά bytes και επεξεργάζεται ένα εύρος σελίδων."""
+    start, stop = page_range
+    with pdfplumber.open(BytesIO(_worker_file_bytes)) as pdf:
+        return [_process_page(pdf.pages[i], _worker_engine) for i in range(start, stop)]
+
+
+def available_cpus():
+    """Πυρήνες που μπορεί να χρησιμοποιήσει η διεργασία (affinity, όπου υποστηρίζεται)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def resolve_parse_workers(workers=None):
+    """
+    Πλήθος διεργασιών για την ανάλυση: ρητή τιμή ή EFKA_PARSE_WORKERS (προεπιλογή 1).
+    Τιμή <= 0 σημαίνει όλοι οι διαθέσιμοι πυρήνες· περισσότερες διεργασίες από
+    πυρήνες δεν επιταχύνουν την (CPU-bound) ανάλυση, οπότε το πλήθος περιορίζεται σε αυτούς.
+    """
+    if workers is None:
+        try:
+            workers = int(os.environ.get(PARSE_WORKERS_ENV, "1"))
+        except ValueError:
+            workers = 1
+    cpus = available_cpus()
+    if workers <= 0:
+        workers = cpus
+    return max(1, min(workers, cpus))
+
+
+def parallel_workers(workers, page_count):
+    """Διεργασίες για ένα PDF: τουλάχιστον PARALLEL_PAGES_PER_WORKER σελίδες η καθεμία (1 = σειριακά)."""
+    return max(1, min(workers, page_count // PARALLEL_PAGES_PER_WORKER))
+
+
+def resolve_parse_engine(engine=None):
+    """Μηχανή εξαγωγής: ρητή τιμή ή EFKA_PARSE_ENGINE (προεπιλογή "tables")."""
+    engine = engine or os.environ.get(PARSE_ENGINE_ENV) or "tables"
+    if engine not in PARSE_ENGINES:
+        raise ValueError(f"Άγνωστη μηχανή εξαγωγής: {engine!r} (επιλογές: {', '.join(PARSE_ENGINES)})")
+    return engine
+
+
+def _process_pool(workers, file_bytes, engine):
+    # forkserver/spawn αντί για fork: ο server του Streamlit είναι πολυνηματικός
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_page_worker,
+        initargs=(file_bytes, engine),
+    )
+
+
+PageRows = namedtuple("PageRows", ["page_number", "page_count", "monthly_rows", "annual_rows"])
+
+
+def iter_efka_pages(file_bytes, workers=None, engine=None):
+    """
+    Αναλύει το PDF σελίδα προς σελίδα και επιστρέφει (generator) ένα PageRows
+    ανά σελίδα, με τις κανονικοποιημένες μηνιαίες/ετήσιες γραμμές της.
+
+    Οι σελίδες επιστρέφονται με τη σειρά τους· με workers > 1 μοιράζονται σε
+    διεργασίες σε συνεχόμενα εύρη, εφόσον το PDF έχει αρκετές σελίδες (βλ.
+    parallel_workers). Στη σειριακή εκτέλεση κρατείται στη μνήμη μόνο η
+    τρέχουσα σελίδα.
+
+    Με engine="words" οι σελίδες αναλυτικών δεδομένων με αναγνωρίσιμη διάταξη
+    e-EFKA διαβάζονται με τη γρήγορη εξαγωγή λέξεων· οι υπόλοιπες (και η
+    συνοπτική κατάσταση) με το extract_tables, με ίδιο αποτέλεσμα με το "tables".
+    """
+    workers = resolve_parse_workers(workers)
+    engine = resolve_parse_engine(engine)
+    with pdfplumber.open(BytesIO(file_bytes)) as pdf:
+        page_count = len(pdf.pages)
+        workers = parallel_workers(workers, page_count)
+        if workers <= 1:
+            for page_number, page in enumerate(pdf.pages, 1):
+                yield PageRows(page_number, page_count, *_process_page(page, engine))
+            return
+
+    # Δύο εύρη ανά worker για καλύτερη κατανομή φορτίου
+    chunk_count = min(page_count, workers * 2)
+    bounds = [page_count * i // chunk_count for i in range(chunk_count + 1)]
+    ranges = list(zip(bounds[:-1], bounds[1:]))
+    with _process_pool(min(workers, chunk_count), file_bytes, engine) as executor:
+        # Το map διατηρεί τη σειρά των ευρών, άρα και των σελίδων
+        page_number = 0
+        for page_results in executor.map(_extract_page_range, ranges):
+            for monthly_rows, annual_rows in page_results:
+                page_number += 1
+                yield PageRows(page_number, page_count, monthly_rows, annual_rows)
+
+
+def build_monthly_dataframe(rows):
+    """DataFrame αναλυτικών μηνιαίων δεδομένων από κανονικοποιημένες γραμμές."""
+    df_monthly = pd.DataFrame(rows, columns=MONTHLY_COLUMNS)
 
     # Καθαρισμός δεδομένων
     if not df_monthly.empty:
-        df_monthly['ΑΠΟΔΟΧΕΣ'] = df_monthly['ΑΠΟΔΟΧΕΣ'].apply(clean_numeric_value)
-        df_monthly['ΕΙΣΦΟΡΕΣ'] = df_monthly['ΕΙΣΦΟΡΕΣ'].apply(clean_numeric_value)
+        df_monthly['ΑΠΟΔΟΧΕΣ'] = parse_greek_numbers(df_monthly['ΑΠΟΔΟΧΕΣ'])
+        df_monthly['ΕΙΣΦΟΡΕΣ'] = parse_greek_numbers(df_monthly['ΕΙΣΦΟΡΕΣ'])
         df_monthly['ΗΜΕΡ. ΑΠΑΣΧ.'] = pd.to_numeric(df_monthly['ΗΜΕΡ. ΑΠΑΣΧ.'], errors='coerce').fillna(0).astype(int)
         df_monthly['ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ'] = df_monthly['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].map(APODOXES_DESCRIPTIONS).fillna('Άγνωστος Κωδικός')
 
+    return df_monthly
+
+
+def period_index(period):
+    """Αύξων αριθμός μήνα (έτος * 12 + μήνας) για "ΜΜ/ΕΕΕΕ"· None για άλλες τιμές."""
+    month, _, year = str(period).strip().partition('/')
+    if month.isdigit() and year.isdigit():
+        return int(year) * 12 + int(month)
+    return None
+
+
+def _period_sort_key(period):
+    # Χρονολογική σειρά για περιόδους ΜΜ/ΕΕΕΕ· οι υπόλοιπες στο τέλος
+    index = period_index(period)
+    return (0, index, '') if index is not None else (1, 0, str(period))
+
+
+def compact_monthly_dataframe(df_monthly):
+    """
+    Το df_monthly σε συμπαγές σχήμα: κωδικοί, περιγραφές και ΠΕΡΙΟΔΟΣ ως
+    category, ημέρες ως int16. Οι τιμές (και τα ποσά, float64) μένουν ίδιες.
+
+    Προστίθεται η στήλη ΑΡ. ΠΕΡΙΟΔΟΥ (Int32, έτος * 12 + μήνας, <NA> για μη
+    έγκυρη περίοδο): οι διαφορές της είναι διαφορές μηνών. Οι κατηγορίες της
+    ΠΕΡΙΟΔΟΣ είναι σε χρονολογική σειρά· τα `.cat.codes` αριθμούν μόνο τις
+    περιόδους του αρχείου και δεν είναι αριθμοί μηνών.
+    """
+    dtypes = {col: 'category' for col in MONTHLY_CATEGORY_COLUMNS if col in df_monthly.columns}
+    days = df_monthly['ΗΜΕΡ. ΑΠΑΣΧ.']
+    if days.empty or (days.min() >= -32768 and days.max() <= 32767):
+        dtypes['ΗΜΕΡ. ΑΠΑΣΧ.'] = 'int16'
+    df = df_monthly.astype(dtypes)
+    if 'ΠΕΡΙΟΔΟΣ' in dtypes:
+        periods = df['ΠΕΡΙΟΔΟΣ'].cat.categories
+        periods = sorted(periods, key=_period_sort_key)
+        df['ΠΕΡΙΟΔΟΣ'] = df['ΠΕΡΙΟΔΟΣ'].cat.reorder_categories(periods)
+        # Ένας υπολογισμός ανά διακριτή περίοδο, μετά αντιστοίχιση με τα codes (-1 = κενή -> <NA>)
+        indexes = pd.array([period_index(period) for period in periods] + [None], dtype='Int32')
+        df[PERIOD_INDEX_COLUMN] = indexes[df['ΠΕΡΙΟΔΟΣ'].cat.codes.to_numpy()]
+    return df
+
+
+def build_annual_dataframe(rows):
+    """DataFrame συνοπτικών ετήσιων δεδομένων από κανονικοποιημένες γραμμές."""
+    if rows:
+        df_annual = pd.DataFrame(rows, columns=ANNUAL_COLUMNS)
+    else:
+        df_annual = pd.DataFrame(columns=ANNUAL_COLUMNS)
+
     if not df_annual.empty:
-        df_annual['ΑΠΟΔΟΧΕΣ'] = df_annual['ΑΠΟΔΟΧΕΣ'].apply(clean_numeric_value)
+        df_annual['ΑΠΟΔΟΧΕΣ'] = parse_greek_numbers(df_annual['ΑΠΟΔΟΧΕΣ'])
         df_annual['ΗΜΕΡ. ΑΠΑΣΧ.'] = pd.to_numeric(df_annual['ΗΜΕΡ. ΑΠΑΣΧ.'], errors='coerce').fillna(0).astype(int)
 
-    return df_monthly, df_annual
+    return df_annual
+
+
+def parse_efka_pdf(file_bytes, workers=None, engine=None, compact=False):
+    """
+    Αναλύει το PDF αρχείο του e-EFKA και εξάγει τα δεδομένα σε δύο DataFrames.
 
+    Με workers > 1 (ή EFKA_PARSE_WORKERS) οι σελίδες αναλύονται παράλληλα σε
+    διεργασίες· το αποτέλεσμα είναι ίδιο με τη σειριακή ανάλυση. Η engine
+    (ή EFKA_PARSE_ENGINE) επιλέγει τη μηχανή εξαγωγής, βλ. iter_efka_pages.
+    Με compact=True το df_monthly επιστρέφεται σε συμπαγές σχήμα
+    (compact_monthly_dataframe).
+    """
+    workers = resolve_parse_workers(workers)
+    engine = resolve_parse_engine(engine)
+    monthly_rows = []
+    annual_rows = []
+
+    with span("parse_efka_pdf", workers=workers, engine=engine, pdf_bytes=len(file_bytes)) as parse_span:
+        # Χρόνοι extract_tables / classify αθροίζονται στο span των σελίδων (σειριακή ανάλυση)
+        with span("parse.pages") as pages_span:
+            page_count = 0
+            for batch in iter_efka_pages(file_bytes, workers, engine):
+                monthly_rows.extend(batch.monthly_rows)
+                annual_rows.extend(batch.annual_rows)
+                page_count = batch.page_count
+            pages_span.set(rows=len(monthly_rows) + len(annual_rows), pages=page_count)
+
+        with span("parse.monthly_dataframe", rows=len(monthly_rows)):
+            df_monthly = build_monthly_dataframe(monthly_rows)
+        if compact:
+            with span("parse.compact", rows=len(df_monthly)):
+                df_monthly = compact_monthly_dataframe(df_monthly)
+        with span("parse.annual_dataframe", rows=len(annual_rows)):
+            df_annual = build_annual_dataframe(annual_rows)
+        parse_span.set(rows=len(df_monthly) + len(df_annual), pages=page_count)
+    return df_monthly, df_annual
@@ -0,0 +1,382 @@
+"""
+Μόνιμη αποθήκη αναλυμένων καταστάσεων e-EFKA (SQLite).
+
+Κάθε κατάσταση αποθηκεύεται μία φορά με κλειδί το κλειδί του parse cache
+(hash περιεχομένου + PARSER_VERSION + μηχανή, βλ. parse_cache.hash_cache_key)
+και προαιρετικό κωδικό πελάτη. Οι γραμμές του df_monthly/df_annual
+αποθηκεύονται κανονικοποιημένες, με ευρετήρια σε περίοδο, πακέτο κάλυψης και
+τύπο αποδοχών, ώστε:
+- μια παλιά ανάλυση να ανοίγει σε χιλιοστά του δευτερολέπτου χωρίς το PDF,
+- οι μαζικές αναφορές να ρωτούν πολλές καταστάσεις μαζί (query_monthly/query_annual).
+
+Εγγραφές παλαιότερης έκδοσης του parser μένουν στο αρχείο αλλά δεν επιστρέφονται.
+Η αποθήκη ενεργοποιείται με EFKA_STATEMENT_STORE=<αρχείο .sqlite3>.
+
+    python statement_store.py list --client 12345
+    python statement_store.py monthly --client 12345 --from 01/2010 --to 12/2014 --type 01 -o out.csv
+"""
+import argparse
+import contextlib
+import datetime
+import os
+import sqlite3
+import sys
+import threading
+
+import pandas as pd
+
+from efka_core.insurable import SOURCE_KEY_ATTR
+from parse_cache import hash_cache_key
+from pdf_parser import (
+    PARSER_VERSION, build_annual_dataframe, build_monthly_dataframe, compact_monthly_dataframe,
+    period_index, resolve_parse_engine,
+)
+
+STORE_PATH_ENV = "EFKA_STATEMENT_STORE"
+
+# Στήλες DataFrame -> στήλες SQLite
+MONTHLY_FIELDS = {
+    'ΠΕΡΙΟΔΟΣ': 'period',
+    'ΚΩΔ. ΚΑΔ': 'kad',
+    'ΚΩΔ. ΕΙΔΙΚ.': 'specialty',
+    'ΚΩΔΙΚΟΣ ΕΙΔΙΚΗΣ ΠΕΡΙΠΤΩΣΗΣ': 'special_case',
+    'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ': 'package',
+    'ΗΜΕΡ. ΑΠΑΣΧ.': 'days',
+    'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ': 'type',
+    'ΑΠΟΔΟΧΕΣ': 'earnings',
+    'ΕΙΣΦΟΡΕΣ': 'contributions',
+    'ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ': 'type_description',
+}
+ANNUAL_FIELDS = {
+    'ΕΤΟΣ': 'year',
+    'ΠΑΚ. ΚΑΛ.': 'package',
+    'ΠΕΡΙΓΡΑΦΗ': 'description',
+    'ΑΠΟΔΟΧΕΣ': 'earnings',
+    'ΗΜΕΡ. ΑΠΑΣΧ.': 'days',
+    'ΗΜΕΡ. ΠΡΟΣ.': 'insured_days',
+    'ΚΑΤΑΣΤΑΣΗ': 'status',
+}
+# Τύποι όπως τους δίνουν τα build_monthly_dataframe / build_annual_dataframe (οι υπόλοιπες: κείμενο)
+FIELD_DTYPES = {'ΗΜΕΡ. ΑΠΑΣΧ.': 'int64', 'ΑΠΟΔΟΧΕΣ': 'float64', 'ΕΙΣΦΟΡΕΣ': 'float64'}
+SQL_TYPES = {'days': 'INTEGER', 'earnings': 'REAL', 'contributions': 'REAL'}
+# Στήλες ταυτότητας κατάστασης στα αποτελέσματα των query_*
+STATEMENT_COLUMNS = ['ΚΛΕΙΔΙ', 'ΠΕΛΑΤΗΣ', 'ΑΡΧΕΙΟ']
+
+
+def _columns_sql(fields):
+    return ",\n    ".join(f"{column} {SQL_TYPES.get(column, 'TEXT')}" for column in fields.values())
+
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS statements (
+    key TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    parser_version TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    client_id TEXT,
+    file_name TEXT,
+    stored_at TEXT NOT NULL,
+    monthly_rows INTEGER NOT NULL,
+    annual_rows INTEGER NOT NULL,
+    first_period TEXT,
+    last_period TEXT
+);
+CREATE INDEX IF NOT EXISTS statements_client ON statements (client_id);
+CREATE INDEX IF NOT EXISTS statements_hash ON statements (content_hash);
+
+CREATE TABLE IF NOT EXISTS monthly (
+    statement TEXT NOT NULL REFERENCES statements (key) ON DELETE CASCADE,
+    row_no INTEGER NOT NULL,
+    period_index INTEGER,
+    {_columns_sql(MONTHLY_FIELDS)},
+    PRIMARY KEY (statement, row_no)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS monthly_period ON monthly (period_index, statement);
+CREATE INDEX IF NOT EXISTS monthly_package ON monthly (package, statement);
+CREATE INDEX IF NOT EXISTS monthly_type ON monthly (type, statement);
+
+CREATE TABLE IF NOT EXISTS annual (
+    statement TEXT NOT NULL REFERENCES statements (key) ON DELETE CASCADE,
+    row_no INTEGER NOT NULL,
+    {_columns_sql(ANNUAL_FIELDS)},
+    PRIMARY KEY (statement, row_no)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS annual_package ON annual (package, statement);
+"""
+
+
+def _period_bound(value, end):
+    # "ΜΜ/ΕΕΕΕ" ή σκέτο έτος (από τον Ιανουάριο / έως τον Δεκέμβριο)
+    text = str(value).strip()
+    if text.isdigit():
+        text = f"{12 if end else 1:02d}/{text}"
+    index = period_index(text)
+    if index is None:
+        raise ValueError(f"Μη έγκυρη περίοδος: {value!r} (αναμένεται ΜΜ/ΕΕΕΕ ή ΕΕΕΕ)")
+    return index
+
+
+def _rows(df, fields):
+    """Γραμμές (tuples) για το INSERT· δουλεύει και για το συμπαγές σχήμα (category/int16)."""
+    columns = [df[col].astype(str).tolist() if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col].tolist()
+               for col in fields]
+    return list(zip(*columns))
+
+
+def _frame(rows, fields):
+    df = pd.DataFrame.from_records(rows, columns=list(fields))
+    return df.astype({col: FIELD_DTYPES.get(col, 'str') for col in fields})
+
+
+class StatementStore:
+    """
+    Αποθήκη καταστάσεων σε ένα αρχείο SQLite. Κάθε κλήση ανοίγει δική της
+    σύνδεση, οπότε το αντικείμενο μοιράζεται μεταξύ νημάτων και διεργασιών
+    (μεταφέρεται μόνο η διαδρομή).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with contextlib.closing(self._connect()) as conn:
+            # WAL: αναγνώσεις χωρίς αναμονή όσο γράφει άλλη διεργασία
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def key(self, content_hash, engine=None):
+        return hash_cache_key(content_hash, engine)
+
+    def save(self, content_hash, df_monthly, df_annual, client_id=None, file_name=None, engine=None):
+        """
+        Αποθηκεύει την κατάσταση (df_monthly σε απλό ή συμπαγές σχήμα) και
+        επιστρέφει το κλειδί της. Αν υπάρχει ήδη, ενημερώνονται μόνο ο πελάτης
+        και το όνομα αρχείου (όταν δίνονται): ίδιο κλειδί σημαίνει ίδια δεδομένα.
+        """
+        engine = resolve_parse_engine(engine)
+        key = self.key(content_hash, engine)
+        periods = [p for p in df_monthly['ΠΕΡΙΟΔΟΣ'].astype(str).unique().tolist() if period_index(p) is not None]
+        periods.sort(key=period_index)
+        stored_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        with contextlib.closing(self._connect()) as conn, conn:
+            exists = conn.execute("SELECT 1 FROM statements WHERE key = ?", (key,)).fetchone() is not None
+            if exists:
+                conn.execute(
+                    "UPDATE statements SET client_id = COALESCE(?, client_id), file_name = COALESCE(?, file_name),"
+                    " stored_at = ? WHERE key = ?",
+                    (client_id or None, file_name or None, stored_at, key),
+                )
+                return key
+
+            conn.execute(
+                "INSERT INTO statements (key, content_hash, parser_version, engine, client_id, file_name, stored_at,"
+                " monthly_rows, annual_rows, first_period, last_period) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, content_hash, PARSER_VERSION, engine, client_id or None, file_name or None, stored_at,
+                 len(df_monthly), len(df_annual), periods[0] if periods else None, periods[-1] if periods else None),
+            )
+            monthly_columns = ", ".join(MONTHLY_FIELDS.values())
+            conn.executemany(
+                f"INSERT INTO monthly (statement, row_no, period_index, {monthly_columns})"
+                f" VALUES (?, ?, ?, {', '.join('?' * len(MONTHLY_FIELDS))})",
+                ((key, row_no, period_index(row[0]), *row)
+                 for row_no, row in enumerate(_rows(df_monthly, MONTHLY_FIELDS))),
+            )
+            annual_columns = ", ".join(ANNUAL_FIELDS.values())
+            conn.executemany(
+                f"INSERT INTO annual (statement, row_no, {annual_columns})"
+                f" VALUES (?, ?, {', '.join('?' * len(ANNUAL_FIELDS))})",
+                ((key, row_no, *row) for row_no, row in enumerate(_rows(df_annual, ANNUAL_FIELDS))),
+            )
+        return key
+
+    def _identity(self, conn, key):
+        return conn.execute(
+            "SELECT content_hash, engine FROM statements WHERE key = ? AND parser_version = ?", (key, PARSER_VERSION)
+        ).fetchone()
+
+    def cache_key(self, key, compact=False):
+        """Το κλειδί του parse cache για την κατάσταση (None αν δεν είναι αποθηκευμένη)."""
+        with contextlib.closing(self._connect()) as conn:
+            identity = self._identity(conn, key)
+        return hash_cache_key(*identity, compact=compact) if identity else None
+
+    def load(self, key, compact=False):
+        """
+        (df_monthly, df_annual) της κατάστασης, ίδια με το parse_efka_pdf
+        (με compact=True το df_monthly σε συμπαγές σχήμα), ή None.
+        """
+        with contextlib.closing(self._connect()) as conn:
+            identity = self._identity(conn, key)
+            if identity is None:
+                return None
+            monthly = conn.execute(
+                f"SELECT {', '.join(MONTHLY_FIELDS.values())} FROM monthly WHERE statement = ? ORDER BY row_no", (key,)
+            ).fetchall()
+            annual = conn.execute(
+                f"SELECT {', '.join(ANNUAL_FIELDS.values())} FROM annual WHERE statement = ? ORDER BY row_no", (key,)
+            ).fetchall()
+
+        df_monthly = _frame(monthly, MONTHLY_FIELDS) if monthly else build_monthly_dataframe([])
+        df_annual = _frame(annual, ANNUAL_FIELDS) if annual else build_annual_dataframe([])
+        if compact:
+            df_monthly = compact_monthly_dataframe(df_monthly)
+        # Ίδιο κλειδί με το parse cache, ώστε να μοιράζονται τα memo των υπολογισμών
+        source = hash_cache_key(*identity, compact=compact)
+        df_monthly.attrs[SOURCE_KEY_ATTR] = source
+        df_annual.attrs[SOURCE_KEY_ATTR] = source
+        return df_monthly, df_annual
+
+    def find(self, content_hash, engine=None):
+        """Το κλειδί της κατάστασης αν είναι αποθηκευμένη (τρέχουσα έκδοση parser), αλλιώς None."""
+        key = self.key(content_hash, engine)
+        with contextlib.closing(self._connect()) as conn:
+            found = conn.execute(
+                "SELECT 1 FROM statements WHERE key = ? AND parser_version = ?", (key, PARSER_VERSION)
+            ).fetchone()
+        return key if found else None
+
+    def statements(self, client_id=None):
+        """Οι αποθηκευμένες καταστάσεις (νεότερες πρώτα) ως DataFrame μεταδεδομένων."""
+        sql = (
+            "SELECT key, client_id, file_name, stored_at, monthly_rows, annual_rows, first_period, last_period, engine"
+            " FROM statements WHERE parser_version = ?"
+        )
+        params = [PARSER_VERSION]
+        if client_id:
+            sql += " AND client_id = ?"
+            params.append(client_id)
+        with contextlib.closing(self._connect()) as conn:
+            return pd.read_sql_query(sql + " ORDER BY stored_at DESC, key", conn, params=params)
+
+    def clients(self):
+        with contextlib.closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT client_id FROM statements WHERE client_id IS NOT NULL AND parser_version = ?"
+                " ORDER BY client_id", (PARSER_VERSION,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def delete(self, key):
+        with contextlib.closing(self._connect()) as conn, conn:
+            return conn.execute("DELETE FROM statements WHERE key = ?", (key,)).rowcount > 0
+
+    def _query(self, table, fields, conditions, params, client_id, order):
+        where = ["s.parser_version = ?"] + conditions
+        params = [PARSER_VERSION] + params
+        if client_id:
+            where.append("s.client_id = ?")
+            params.append(client_id)
+        sql = (
+            f"SELECT s.key, s.client_id, s.file_name, {', '.join(f't.{c}' for c in fields.values())}"
+            f" FROM {table} t JOIN statements s ON s.key = t.statement"
+            f" WHERE {' AND '.join(where)} ORDER BY s.key, {order}"
+        )
+        with contextlib.closing(self._connect()) as conn:
+            rows = conn.execute(sql, params).fetchall()
+        df = pd.DataFrame.from_records(rows, columns=STATEMENT_COLUMNS + list(fields))
+        return df.astype({col: FIELD_DTYPES.get(col, 'str') for col in fields})
+
+    def query_monthly(self, client_id=None, period_from=None, period_to=None, packages=None, types=None):
+        """
+        Μηνιαίες γραμμές όλων των αποθηκευμένων καταστάσεων (με ΚΛΕΙΔΙ/ΠΕΛΑΤΗΣ/ΑΡΧΕΙΟ),
+        προαιρετικά για έναν πελάτη, εύρος περιόδων ("ΜΜ/ΕΕΕΕ" ή "ΕΕΕΕ"),
+        πακέτα κάλυψης και τύπους αποδοχών.
+        """
+        conditions, params = [], []
+        if period_from is not None:
+            conditions.append("t.period_index >= ?")
+            params.append(_period_bound(period_from, end=False))
+        if period_to is not None:
+            conditions.append("t.period_index <= ?")
+            params.append(_period_bound(period_to, end=True))
+        for column, values in (("package", packages), ("type", types)):
+            if values:
+                conditions.append(f"t.{column} IN ({', '.join('?' * len(values))})")
+                params.extend(str(value) for value in values)
+        return self._query("monthly", MONTHLY_FIELDS, conditions, params, client_id, "t.row_no")
+
+    def query_annual(self, client_id=None, year_from=None, year_to=None, packages=None):
+        """Ετήσιες γραμμές όλων των αποθηκευμένων καταστάσεων, με τα ίδια φίλτρα."""
+        conditions, params = [], []
+        if year_from is not None:
+            conditions.append("CAST(t.year AS INTEGER) >= ?")
+            params.append(int(year_from))
+        if year_to is not None:
+            conditions.append("CAST(t.year AS INTEGER) <= ?")
+            params.append(int(year_to))
+        if packages:
+            conditions.append(f"t.package IN ({', '.join('?' * len(packages))})")
+            params.extend(str(value) for value in packages)
+        return self._query("annual", ANNUAL_FIELDS, conditions, params, client_id, "t.row_no")
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_store():
+    """Η αποθήκη του EFKA_STATEMENT_STORE (None αν δεν έχει οριστεί)."""
+    global _default_store
+    path = os.environ.get(STORE_PATH_ENV)
+    if not path:
+        return None
+    with _default_store_lock:
+        if _default_store is None or _default_store.path != path:
+            _default_store = StatementStore(path)
+        return _default_store
+
+
+def _csv_values(value):
+    return [item.strip() for item in value.split(",") if item.strip()] if value else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--store", default=os.environ.get(STORE_PATH_ENV),
+                        help=f"Αρχείο SQLite (προεπιλογή: {STORE_PATH_ENV})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_parser = commands.add_parser("list", help="Αποθηκευμένες καταστάσεις")
+    monthly_parser = commands.add_parser("monthly", help="Μηνιαίες γραμμές όλων των καταστάσεων")
+    monthly_parser.add_argument("--from", dest="period_from", help="Από περίοδο (ΜΜ/ΕΕΕΕ ή ΕΕΕΕ)")
+    monthly_parser.add_argument("--to", dest="period_to", help="Έως περίοδο (ΜΜ/ΕΕΕΕ ή ΕΕΕΕ)")
+    monthly_parser.add_argument("--type", dest="types", help="Τύποι αποδοχών, χωρισμένοι με κόμμα")
+    annual_parser = commands.add_parser("annual", help="Ετήσιες γραμμές όλων των καταστάσεων")
+    annual_parser.add_argument("--from", dest="year_from", type=int, help="Από έτος")
+    annual_parser.add_argument("--to", dest="year_to", type=int, help="Έως έτος")
+    for sub in (list_parser, monthly_parser, annual_parser):
+        sub.add_argument("--client", help="Κωδικός πελάτη")
+        sub.add_argument("-o", "--output", help="Αρχείο CSV (προεπιλογή: stdout)")
+    for sub in (monthly_parser, annual_parser):
+        sub.add_argument("--package", dest="packages", help="Πακέτα κάλυψης, χωρισμένα με κόμμα")
+    args = parser.parse_args(argv)
+    if not args.store:
+        parser.error(f"ορίστε --store ή {STORE_PATH_ENV}")
+
+    store = StatementStore(args.store)
+    try:
+        if args.command == "list":
+            df = store.statements(args.client)
+        elif args.command == "monthly":
+            df = store.query_monthly(args.client, args.period_from, args.period_to,
+                                     _csv_values(args.packages), _csv_values(args.types))
+        else:
+            df = store.query_annual(args.client, args.year_from, args.year_to, _csv_values(args.packages))
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.output:
+        # utf-8-sig ώστε το Excel να διαβάζει σωστά τα ελληνικά (όπως στο batch_cli.py)
+        df.to_csv(args.output, index=False, encoding="utf-8-sig")
+        print(f"{len(df)} γραμμές -> {args.output}", file=sys.stderr)
+    else:
+        df.to_csv(sys.stdout, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
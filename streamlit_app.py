@@ -1,206 +1,328 @@
+import contextlib
+import os
+import uuid
+
 import streamlit as st
-import streamlit.components.v1 as components
 import pandas as pd
-import json
-import html
-import re
-from pdf_parser import parse_efka_pdf, APODOXES_DESCRIPTIONS
+from pdf_parser import (
+    APODOXES_DESCRIPTIONS, PERIOD_INDEX_COLUMN, build_annual_dataframe, build_monthly_dataframe,
+    compact_monthly_dataframe, iter_efka_pages,
+)
+from efka_core import (
+    CEILING_TABLES, DEFAULT_CEILING, DEFAULT_DTK_YEAR, FUNDS, Buyout, Recorder, bind_context,
+    build_display_with_totals, build_filters, ceiling_table, compute_insurable, compute_pension,
+    dataframe_to_printable_html, enable_copy_on_write, evaluate_scenarios, filter_options, finalize_analysis_display,
+    format_currency_gr, format_df_for_display, format_number_gr, get_dtk_table, memo_stats, nbytes, package_descriptions,
+    phase, prepare_monthly, profile_enabled, profile_run, round_float_columns, scenario_comparison,
+    scenario_yearly_totals, set_recorder, span, syntaksi_json, view,
+)
+from parse_cache import content_hash, get_default_cache, hash_cache_key
+from statement_store import get_default_store
 
 # Set page configuration
 st.set_page_config(page_title="e-EFKA Parser", page_icon="📊", layout="wide")
 
-# --- Formatting Helpers ---
-def format_number_gr(value, decimals=2):
-    if value is None or (isinstance(value, float) and pd.isna(value)):
-        return ""
-    try:
-        num = float(value)
-    except (TypeError, ValueError):
-        return str(value)
-    if num == 0:
-        return ""
-    formatted = f"{num:,.{decimals}f}"
-    return formatted.replace(",", "X").replace(".", ",").replace("X", ".")
-
-def format_currency_gr(value):
-    formatted = format_number_gr(value, 2)
-    return f"€{formatted}" if formatted != "" else ""
-
-def format_percent_gr(value):
-    formatted = format_number_gr(value, 2)
-    return f"{formatted}%" if formatted != "" else ""
-
-def apply_left_align(styler):
-    return styler.set_properties(**{'text-align': 'left'}).set_table_styles(
-        [{'selector': 'th', 'props': [('text-align', 'left')]}]
-    )
-
-def format_df_for_display(
-    df,
-    currency_cols=None,
-    int_cols=None,
-    percent_cols=None,
-    float_cols_decimals=None,
-):
-    df_display = df.copy()
-    currency_cols = set(currency_cols or [])
-    int_cols = set(int_cols or [])
-    percent_cols = set(percent_cols or [])
-    float_cols_decimals = float_cols_decimals or {}
-
-    for col in df_display.columns:
-        if col in currency_cols:
-            df_display[col] = df_display[col].apply(format_currency_gr)
-        elif col in percent_cols:
-            df_display[col] = df_display[col].apply(format_percent_gr)
-        elif col in int_cols:
-            df_display[col] = df_display[col].apply(lambda v: format_number_gr(v, 0))
-        elif col in float_cols_decimals:
-            decimals = float_cols_decimals[col]
-            df_display[col] = df_display[col].apply(lambda v: format_number_gr(v, decimals))
-        else:
-            df_display[col] = df_display[col].where(pd.notna(df_display[col]), "")
-            df_display[col] = df_display[col].astype(str)
-
-    return df_display
-
-def round_float_columns(df, decimals=2):
-    df_out = df.copy()
-    float_cols = df_out.select_dtypes(include=["float"]).columns
-    if len(float_cols) > 0:
-        df_out[float_cols] = df_out[float_cols].round(decimals)
-    return df_out
-
-def round_numeric_columns(df, columns, decimals=2):
-    df_out = df.copy()
-    for col in columns:
-        if col in df_out.columns:
-            numeric_values = pd.to_numeric(df_out[col], errors="coerce")
-            df_out[col] = numeric_values.round(decimals).where(numeric_values.notna(), df_out[col])
-    return df_out
-
-def dataframe_to_printable_html(df, title="Πίνακας", person_name=None):
-    """Δημιουργεί πλήρες HTML αρχείο για προβολή/εκτύπωση (οριζόντιο προσανατολισμός, hover ανά γραμμή)."""
-    if df is None or df.empty:
-        return None
-    df_clean = df.fillna("")
-    table_html = df_clean.to_html(index=False, classes="print-table", border=0)
-    # Γραμμές που περιέχουν ΣΥΝΟΛΟ: ελαφρύ γκρι φόντο
-    table_html = re.sub(
-        r'<tr[^>]*>((?:(?!</tr>).)*?ΣΥΝΟΛΟ(?:(?!</tr>).)*?)</tr>',
-        r'<tr class="row-total">\1</tr>',
-        table_html, flags=re.DOTALL | re.IGNORECASE
-    )
-
-    safe_title = html.escape(str(title))
-    safe_name = html.escape(str(person_name)) if person_name else ""
-    name_block = f'<p class="print-name">{safe_name}</p>' if safe_name else ""
-
-    doc = f"""<!DOCTYPE html>
-<html lang="el">
-<head>
-<meta charset="utf-8">
-<meta name="viewport" content="width=device-width, initial-scale=1">
-<title>{safe_title}</title>
-<style>
-body {{ font-family: sans-serif; margin: 1rem; color: #262730; }}
-.print-name {{ text-align: center; font-size: 1.1rem; font-weight: 700; margin-bottom: 0.5rem; }}
-.print-title {{ font-size: 1.25rem; font-weight: 700; margin-bottom: 1rem; text-align: left; }}
-.print-table {{ width: 100%; border-collapse: collapse; text-align: left; font-size: 0.9rem; }}
-.print-table th, .print-table td {{ padding: 10px 12px; text-align: left; border: none; border-bottom: 1px solid #d1d5db; }}
-.print-table th {{ background: #f9fafb; font-weight: 700; font-size: 0.8rem; }}
-.print-table td:nth-child(1), .print-table td:nth-child(2), .print-table th:nth-child(1), .print-table th:nth-child(2) {{ font-weight: 700; }}
-.print-table tr.row-total {{ background: #e5e7eb; font-weight: 700; }}
-.print-table tbody tr:hover {{ background: #fff4e6; }}
-.header-row {{ display: flex; justify-content: space-between; align-items: center; flex-wrap: wrap; gap: 0.5rem; margin-bottom: 0.5rem; }}
-.header-row .print-title {{ margin: 0; }}
-.btn-print {{ background: #dc3545; color: white; border: none; padding: 8px 16px; border-radius: 6px; font-size: 0.9rem; font-weight: 600; cursor: pointer; }}
-.btn-print:hover {{ background: #c82333; }}
-@media print {{
-  @page {{ size: landscape; }}
-  body {{ margin: 1.5cm; }}
-  .no-print {{ display: none !important; }}
-  .print-title {{ margin-bottom: 12px; }}
-  .print-table {{ page-break-inside: auto; }}
-  .print-table tr {{ page-break-inside: avoid; page-break-after: auto; }}
-  .print-footer {{ margin-top: 1.5rem; }}
-}}
-.print-footer {{ margin-top: 1.5rem; padding-top: 0.75rem; border-top: 1px solid #d1d5db; font-size: 0.75rem; color: #6b7280; line-height: 1.4; }}
-</style>
-</head>
-<body>
-{name_block}
-<div class="header-row">
-  <h1 class="print-title">{safe_title}</h1>
-  <div class="no-print" style="display:flex;gap:8px;">
-    <button type="button" class="btn-print" onclick="window.print();">🖨 Εκτύπωση</button>
-  </div>
-</div>
-{table_html}
-<div class="print-footer"><strong>ΣΗΜΑΝΤΙΚΉ ΣΗΜΕΙΩΣΗ:</strong> Η παρούσα αναφορά βασίζεται αποκλειστικά στα δεδομένα που εμφανίζονται στο αρχείο ΑΤΟΜΙΚΟΣ ΛΟΓΑΡΙΑΣΜΟΣ/e-ΕΦΚΑ και αποτελεί απλή επεξεργασία των καταγεγραμμένων εγγραφών με σκοπό τη διευκόλυνση μελέτης του ασφ. ιστορικού του ασφαλισμένου. Η πλατφόρμα ΑΤΟΜΙΚΟΣ ΛΟΓΑΡΙΑΣΜΟΣ ή η ανάλυση από την εφαρμογή αυτή μπορεί να περιέχει κενά ή σφάλματα, και η αναφορά που εξάγεται δεν υποκαθιστά νομική ή οικονομική συμβουλή σε καμία περίπτωση. Αποκλειστικά υπεύθυνος για την επαλήθευση των στοιχείων είναι ο χρήστης. Για θέματα συνταξιοδότησης και οριστικές απαντήσεις αρμόδιος παραμένει αποκλειστικά ο e-ΕΦΚΑ.</div>
-</body>
-</html>"""
-    return doc
-
-def html_open_in_new_tab_component(html_content):
-    """Επιστρέφει HTML snippet για iframe: κουμπί Εκτύπωση που ανοίγει το html_content σε νέα καρτέλα (blob URL)."""
-    if not html_content:
-        return ""
-    # Ενσωμάτωση ως JS string: json.dumps + escape </script> ώστε να μην κλείνει το <script> του wrapper
-    js_content = json.dumps(html_content).replace("</script>", "<\\/script>")
-    return f"""<!DOCTYPE html><html><head><meta charset="utf-8"></head>
-<body style="margin:0;padding:6px 0;font-family:sans-serif;display:flex;justify-content:flex-end;">
-<button type="button" id="openTabBtn" style="background:#dc3545;color:white;border:none;padding:14px 28px;border-radius:8px;cursor:pointer;font-weight:700;font-size:1.15rem;">Εκτύπωση</button>
-<script>
-(function() {{
-  var htmlContent = {js_content};
-  document.getElementById('openTabBtn').onclick = function() {{
-    var blob = new Blob([htmlContent], {{ type: 'text/html;charset=utf-8' }});
-    var url = URL.createObjectURL(blob);
-    window.open(url, '_blank');
-  }};
-}})();
-</script>
-</body></html>"""
-
 # --- Data Dictionaries ---
-insurable_ceiling_old = {
-    '2002': 1884.75, '2003': 1960.25, '2004': 2058.25, '2005': 2140.50, '2006': 2226.00,
-    '2007': 2315.00, '2008': 2384.50, '2009': 2432.25, '2010': 2432.25, '2011': 2432.25,
-    '2012': 2432.25, '2013': 5546.80, '2014': 5546.80, '2015': 5546.80, '2016': 5861.00,
-    '2017': 5861.00, '2018': 5861.00, '2019': 6500.00, '2020': 6500.00, '2021': 6500.00,
-    '2022': 6500.00, '2023': 7126.94, '2024': 7126.94, '2025': 7572.62, '2026': 7572.62
-}
+EPIK_YEAR_RANGE = FUNDS['epikouriki']['year_range']
 
-insurable_ceiling_new = {
-    '2002': 4693.52, '2003': 4693.52, '2004': 4693.52, '2005': 4881.26, '2006': 5076.51,
-    '2007': 5279.57, '2008': 5437.96, '2009': 5543.55, '2010': 5543.55, '2011': 5543.55,
-    '2012': 5546.80, '2013': 5546.80, '2014': 5546.80, '2015': 5546.80, '2016': 5861.00,
-    '2017': 5861.00, '2018': 5861.00, '2019': 6500.00, '2020': 6500.00, '2021': 6500.00,
-    '2022': 6500.00, '2023': 7126.94, '2024': 7126.94, '2025': 7572.62, '2026': 7572.62
-}
+# Φορτώνεται μία φορά ανά διεργασία, όχι σε κάθε rerun
+DTK_TABLE = get_dtk_table()
+
+# Διαγνωστικά χρόνου (efka_core.diagnostics), μόνο με ?diagnostics=1 στο URL:
+# ένας Recorder ανά συνεδρία, με νέο αριθμό εκτέλεσης σε κάθε rerun
+DIAGNOSTICS_PARAM = "diagnostics"
+if st.query_params.get(DIAGNOSTICS_PARAM) == "1":
+    diagnostics_recorder = st.session_state.setdefault("diagnostics_recorder", Recorder(session=uuid.uuid4().hex[:12]))
+    diagnostics_recorder.new_run()
+else:
+    diagnostics_recorder = None
+set_recorder(diagnostics_recorder)
 
-def load_dtk_table():
-    """Φόρτωση πίνακα ΔΤΚ από εξωτερικό JSON αρχείο (dtk_table.json)."""
-    import os
-    dtk_path = os.path.join(os.path.dirname(__file__), "dtk_table.json")
-    with open(dtk_path, "r", encoding="utf-8") as f:
-        raw = json.load(f)
-    # Μετατροπή κλειδιών σε int (έτος αναφοράς & έτος εισφοράς)
-    return {int(ref_year): {int(k): v for k, v in factors.items()} for ref_year, factors in raw["data"].items()}
+# Κοινά DataFrames χωρίς αντίγραφα (efka_core.frames): Copy-on-Write και στο pandas 2.x
+enable_copy_on_write()
 
-DTK_TABLE = load_dtk_table()
+# Προφίλ (cProfile + tracemalloc) της ανάλυσης κάθε νέου αρχείου: EFKA_PROFILE=1 ή ?profile=1
+PROFILE_PARAM = "profile"
+profiling_requested = profile_enabled() or st.query_params.get(PROFILE_PARAM) == "1"
 
 
 # --- Helper Functions ---
-def load_data(uploaded_file):
+# Πλήθος τελευταίων γραμμών που προβάλλονται όσο συνεχίζεται η ανάλυση
+PREVIEW_ROWS = 200
+
+def parse_with_progress(file_bytes):
+    """Αναλύει το PDF σελίδα-σελίδα, δείχνοντας πρόοδο και τις τελευταίες γραμμές."""
+    progress = st.progress(0.0, text="Ανάλυση σελίδων...")
+    preview = st.empty()
+    monthly_rows = []
+    annual_rows = []
+    # Ίδια spans με το parse_efka_pdf· η προεπισκόπηση μετρά χωριστά ως preview_ms των σελίδων
+    with span("parse.pages") as pages_span:
+        for batch in iter_efka_pages(file_bytes):
+            monthly_rows.extend(batch.monthly_rows)
+            annual_rows.extend(batch.annual_rows)
+            progress.progress(
+                batch.page_number / batch.page_count,
+                text=f"Σελίδα {batch.page_number} από {batch.page_count} · {len(monthly_rows)} γραμμές",
+            )
+            if batch.monthly_rows:
+                with phase("preview"):
+                    preview.dataframe(
+                        build_monthly_dataframe(monthly_rows[-PREVIEW_ROWS:]), use_container_width=True, hide_index=True
+                    )
+            pages_span.set(rows=len(monthly_rows) + len(annual_rows), pages=batch.page_count)
+    progress.empty()
+    preview.empty()
+    # Συμπαγές σχήμα (category/int16): το df_monthly κρατείται στο κοινό cache για όλους τους χρήστες
+    with span("parse.monthly_dataframe", rows=len(monthly_rows)):
+        df_monthly = build_monthly_dataframe(monthly_rows)
+    with span("parse.compact", rows=len(df_monthly)):
+        df_monthly = compact_monthly_dataframe(df_monthly)
+    with span("parse.annual_dataframe", rows=len(annual_rows)):
+        df_annual = build_annual_dataframe(annual_rows)
+    return df_monthly, df_annual
+
+def load_data(uploaded_file, client_id=None):
     """Loads and parses the PDF file, returns two dataframes."""
     if uploaded_file is not None:
         file_bytes = uploaded_file.getvalue()
-        df_monthly, df_annual = parse_efka_pdf(file_bytes)
+        # Cache με κλειδί το περιεχόμενο: τα reruns δεν ξαναναλύουν το ίδιο PDF
+        with span("load_data", pdf_bytes=len(file_bytes)) as load_span:
+            cache = get_default_cache()
+            file_hash = content_hash(file_bytes)
+            key = hash_cache_key(file_hash, compact=True)
+            frames = cache.get(key)
+            load_span.set(cached=frames is not None)
+            # Σε λειτουργία προφίλ το αρχείο αναλύεται ξανά (χωρίς cache) μία φορά ανά συνεδρία
+            last_profile = st.session_state.get("profile_run")
+            profiling = profiling_requested and (last_profile is None or last_profile.key != file_hash)
+            # Μόνιμη αποθήκη (EFKA_STATEMENT_STORE): ίδιο PDF μετά από εβδομάδες χωρίς νέα ανάλυση
+            store = get_default_store()
+            if frames is None and store is not None and not profiling:
+                stored_key = store.find(file_hash)
+                if stored_key is not None:
+                    frames = store.load(stored_key, compact=True)
+                    load_span.set(stored=frames is not None)
+                    if frames is not None:
+                        cache.put(key, frames)
+                        frames = tuple(view(df) for df in frames)
+            if frames is None or profiling:
+                if profiling:
+                    profiler = profile_run(file_hash, label=getattr(uploaded_file, 'name', None))
+                else:
+                    profiler = contextlib.nullcontext()
+                with profiler as run:
+                    frames = parse_with_progress(file_bytes)
+                if profiling:
+                    st.session_state["profile_run"] = run
+                cache.put(key, frames)
+                if store is not None:
+                    store.save(file_hash, *frames, client_id=client_id, file_name=getattr(uploaded_file, 'name', None))
+                frames = tuple(view(df) for df in frames)
+            df_monthly, df_annual = frames
+            load_span.set(rows=len(df_monthly) + len(df_annual))
         return df_monthly, df_annual
     return None, None
 
+def load_stored(statement_key):
+    """Ανοίγει αποθηκευμένη ανάλυση (statement_store) χωρίς το PDF· (None, None) αν δεν υπάρχει."""
+    store = get_default_store()
+    if store is None:
+        return None, None
+    with span("load_stored") as load_span:
+        cache = get_default_cache()
+        key = store.cache_key(statement_key, compact=True)
+        frames = cache.get(key) if key is not None else None
+        load_span.set(cached=frames is not None)
+        if frames is None and key is not None:
+            frames = store.load(statement_key, compact=True)
+            if frames is not None:
+                cache.put(key, frames)
+                frames = tuple(view(df) for df in frames)
+        if frames is None:
+            return None, None
+        df_monthly, df_annual = frames
+        load_span.set(rows=len(df_monthly) + len(df_annual))
+    return df_monthly, df_annual
+
+def stored_statement_label(row):
+    """Περιγραφή αποθηκευμένης ανάλυσης για την επιλογή: πελάτης · αρχείο · περίοδοι · ημερομηνία."""
+    parts = [
+        row.client_id if pd.notna(row.client_id) else "—",
+        row.file_name if pd.notna(row.file_name) else row.key[:12],
+    ]
+    if pd.notna(row.first_period):
+        parts.append(f"{row.first_period}–{row.last_period}")
+    parts.append(row.stored_at[:10])
+    return " · ".join(parts)
+
+def render_stored_statements(store):
+    """Επιλογή προηγούμενης ανάλυσης από τη μόνιμη αποθήκη (χωρίς νέο ανέβασμα του PDF)."""
+    with st.expander("📂 Άνοιγμα προηγούμενης ανάλυσης"):
+        clients = store.clients()
+        client = st.selectbox("Πελάτης", ["(Όλοι)"] + clients, key="stored_client") if clients else "(Όλοι)"
+        statements = store.statements(None if client == "(Όλοι)" else client)
+        if statements.empty:
+            st.info("Δεν υπάρχουν αποθηκευμένες αναλύσεις.")
+            return
+        labels = {row.key: stored_statement_label(row) for row in statements.itertuples(index=False)}
+        selected = st.selectbox("Ανάλυση", list(labels), format_func=labels.get, key="stored_statement_select")
+        if st.button("📂 Άνοιγμα", use_container_width=True, key="open_stored"):
+            st.session_state["stored_statement"] = selected
+            st.session_state["uploaded_file"] = None
+            st.session_state["analysis_requested"] = True
+            st.rerun()
+
+def render_report_button(df, title, file_name, key):
+    """
+    Κουμπί για την εκτυπώσιμη αναφορά HTML: το έγγραφο δημιουργείται μόνο όταν
+    πατηθεί (με cache ανά πίνακα/τίτλο) και δεν ενσωματώνεται στη σελίδα.
+    """
+    if df is None or df.empty:
+        return
+    _col_space, col_button = st.columns([5, 1])
+    with col_button:
+        st.download_button(
+            label="🖨 Εκτύπωση",
+            data=bind_context(lambda: dataframe_to_printable_html(df, title)),
+            file_name=file_name,
+            mime="text/html",
+            on_click="ignore",
+            type="primary",
+            use_container_width=True,
+            key=key,
+        )
+
+def render_syntaksi_download(pension_df, fund, dtk_year, buyout_days, buyout_amount, buyout_dtk, label, key):
+    """Λήψη JSON για το Syntaksi Pro· το αρχείο δημιουργείται μόνο όταν πατηθεί το κουμπί."""
+    _col_left, col_button, _col_right = st.columns([1, 2, 1])
+    with col_button:
+        st.download_button(
+            label=label,
+            data=bind_context(lambda: syntaksi_json(pension_df, dtk_year, buyout_days, buyout_amount, buyout_dtk)),
+            file_name=FUNDS[fund]['json_file_name'],
+            mime="application/json",
+            on_click="ignore",
+            use_container_width=True,
+            key=key,
+        )
+
+def format_bytes(size):
+    """Μέγεθος σε αναγνώσιμη μορφή (B, KB, MB, GB)."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{format_number_gr(size, 0 if unit == 'B' else 1)} {unit}"
+        size /= 1024
+    return f"{format_number_gr(size, 1)} GB"
+
+def render_memory_diagnostics():
+    """Μνήμη της συνεδρίας (session_state) και των κοινών caches της διεργασίας (μόνο με ?diagnostics=1)."""
+    with st.expander("🩺 Διαγνωστικά μνήμης"):
+        session_rows = sorted(
+            ((str(key), type(value).__name__, nbytes(value)) for key, value in st.session_state.items()),
+            key=lambda row: row[2], reverse=True,
+        )
+        session_total = sum(row[2] for row in session_rows)
+        cache = get_default_cache().stats()
+        memo = memo_stats()
+
+        col_m1, col_m2, col_m3 = st.columns(3)
+        col_m1.metric("Συνεδρία (session_state)", format_bytes(session_total))
+        col_m2.metric(f"Cache αναλύσεων PDF ({cache['entries']})", format_bytes(cache['bytes']))
+        col_m3.metric(
+            f"Cache υπολογισμών ({memo['sources']} αρχεία, {memo['results']} αποτελέσματα)",
+            format_bytes(memo['bytes']),
+        )
+        st.caption("Τα caches είναι κοινά για όλους τους χρήστες· ανά συνεδρία κρατούνται μόνο οι επιλογές και τα ετήσια σύνολα.")
+        st.table(pd.DataFrame(
+            [(key, kind, format_bytes(size)) for key, kind, size in session_rows],
+            columns=["Κλειδί", "Τύπος", "Μέγεθος"],
+        ))
+
+# Γραμμές που προβάλλονται από τους πίνακες του προφίλ (το zip έχει περισσότερες)
+PROFILE_PREVIEW_ROWS = 15
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+def render_profile(run):
+    """Σύνοψη και λήψη του προφίλ της ανάλυσης (μόνο σε λειτουργία προφίλ)."""
+    with st.expander("🔬 Προφίλ ανάλυσης (cProfile / tracemalloc)"):
+        if run.skipped:
+            st.info("Εκτελούνταν ήδη άλλο προφίλ στον server· η ανάλυση έγινε χωρίς προφίλ.")
+            return
+        col_p1, col_p2 = st.columns(2)
+        col_p1.metric("Διάρκεια ανάλυσης", f"{format_number_gr(run.duration, 2)} s")
+        col_p2.metric("Μέγιστη μνήμη (tracemalloc)", format_bytes(run.peak_bytes))
+        st.markdown("**Συναρτήσεις με τον περισσότερο χρόνο (cumulative)**")
+        st.dataframe(
+            pd.DataFrame(
+                run.top_functions[:PROFILE_PREVIEW_ROWS],
+                columns=["Συνάρτηση", "Κλήσεις", "Ίδιος χρόνος (s)", "Συνολικός χρόνος (s)"],
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+        st.markdown("**Σημεία δεσμεύσεων μνήμης**")
+        st.dataframe(
+            pd.DataFrame(
+                [(location, format_bytes(size), count) for location, size, count in run.top_allocations[:PROFILE_PREVIEW_ROWS]],
+                columns=["Σημείο", "Μέγεθος", "Blocks"],
+            ),
+            use_container_width=True,
+            hide_index=True,
+        )
+        if run.path and os.path.exists(run.path):
+            st.download_button(
+                label="📥 Λήψη προφίλ (pstats + αναφορά)",
+                data=lambda: read_bytes(run.path),
+                file_name=os.path.basename(run.path),
+                mime="application/zip",
+                on_click="ignore",
+                key="download_profile",
+            )
+
+# Στήλες του πίνακα χρόνων: πεδίο εγγραφής -> τίτλος
+TIMING_COLUMNS = {
+    'name': "Στάδιο", 'parent': "Γονικό", 'duration_ms': "Χρόνος (ms)", 'rows': "Γραμμές", 'rss_delta_mb': "Δ RSS (MB)",
+}
+
+def render_timing_diagnostics(recorder):
+    """Χρόνοι σταδίων της τρέχουσας εκτέλεσης και σύνοψη της συνεδρίας (μόνο με ?diagnostics=1)."""
+    with st.expander("⏱ Διαγνωστικά χρόνου"):
+        records = recorder.records(recorder.run)
+        if records:
+            st.caption(f"Εκτέλεση {recorder.run}: {format_number_gr(sum(r['duration_ms'] for r in records if r['parent'] is None), 1)} ms συνολικά")
+            st.dataframe(
+                pd.DataFrame(records).reindex(columns=list(TIMING_COLUMNS)).rename(columns=TIMING_COLUMNS),
+                use_container_width=True,
+                hide_index=True,
+            )
+        else:
+            st.info("Δεν καταγράφηκαν στάδια σε αυτή την εκτέλεση.")
+
+        all_records = recorder.records()
+        if all_records:
+            st.markdown("**Σύνοψη συνεδρίας** (περιλαμβάνει αναφορές/εξαγωγές που δημιουργήθηκαν κατ' απαίτηση)")
+            summary = (
+                pd.DataFrame(all_records)
+                .groupby('name', sort=False)['duration_ms']
+                .agg(['count', 'sum', 'max'])
+                .sort_values('sum', ascending=False)
+                .reset_index()
+            )
+            summary.columns = ["Στάδιο", "Πλήθος", "Σύνολο (ms)", "Μέγιστο (ms)"]
+            st.dataframe(summary, use_container_width=True, hide_index=True)
+            st.download_button(
+                label="📥 Λήψη καταγραφής (JSON Lines)",
+                data=recorder.to_ndjson,
+                file_name=f"efka_diagnostics_{recorder.session}.jsonl",
+                mime="application/x-ndjson",
+                on_click="ignore",
+                key="download_diagnostics",
+            )
+
 # --- Dialog: Επιβεβαίωση πακέτων πριν τον υπολογισμό ---
 def _render_package_confirmation(all_pkgs, sel_pkgs, target_key):
     """Κοινή λογική για dialog επιβεβαίωσης πακέτων κάλυψης."""
@@ -265,6 +387,76 @@ def confirm_pension_epik():
     _render_package_confirmation(all_pkgs, sel_pkgs, "epik")
 
 
+# --- Σύγκριση σεναρίων ---
+SCENARIO_METRICS = ['ΜΕΣΟΣ ΣΥΝΤΑΞΙΜΟΣ ΜΙΣΘΟΣ', 'ΣΥΝΟΛΟ ΣΥΝΤΑΞΙΜΩΝ ΑΠΟΔΟΧΩΝ']
+
+
+def render_scenario_comparison(df_monthly, fund, filters, key):
+    """Σύγκριση όλων των σεναρίων (πλαφόν × έτος ΔΤΚ × εξαγορά) με έναν υπολογισμό."""
+    with st.expander("Σύγκριση σεναρίων (έτη ΔΤΚ × εξαγορές × πλαφόν)"):
+        dtk_year_options = sorted(DTK_TABLE, reverse=True)
+        with st.form(f"scenarios_form_{key}"):
+            col_s1, col_s2, col_s3 = st.columns([3, 2, 2])
+            with col_s1:
+                dtk_years = st.multiselect(
+                    "Έτη Αναφοράς ΔΤΚ", options=dtk_year_options, default=dtk_year_options, key=f"scenario_dtk_{key}"
+                )
+            with col_s2:
+                ceilings = st.multiselect(
+                    "Πλαφόν", options=list(CEILING_TABLES), default=list(CEILING_TABLES), key=f"scenario_ceiling_{key}"
+                )
+            with col_s3:
+                metric = st.selectbox("Σύγκριση με βάση", SCENARIO_METRICS, key=f"scenario_metric_{key}")
+            st.caption("Σενάρια εξαγοράς (μία γραμμή ανά σενάριο· 0 ημέρες και 0 ποσό = χωρίς εξαγορά)")
+            buyout_rows = st.data_editor(
+                pd.DataFrame({'Ημέρες Εξαγοράς': [0], 'Έτος Εξαγοράς': [DEFAULT_DTK_YEAR], 'Ποσό Εξαγοράς': [0.0]}),
+                num_rows="dynamic",
+                hide_index=True,
+                use_container_width=True,
+                key=f"scenario_buyouts_{key}",
+            )
+            compare = st.form_submit_button("Σύγκριση")
+
+        if compare:
+            buyout_rows = buyout_rows.dropna()
+            st.session_state[f"scenarios_{key}"] = {
+                "dtk_years": list(dtk_years),
+                "ceilings": list(ceilings),
+                "metric": metric,
+                "buyouts": [
+                    Buyout(int(days), int(year), float(amount))
+                    for days, year, amount in buyout_rows.itertuples(index=False)
+                ],
+            }
+
+        params = st.session_state.get(f"scenarios_{key}")
+        if not params or not params["dtk_years"] or not params["ceilings"]:
+            st.info("Επιλέξτε έτη ΔΤΚ, πλαφόν και σενάρια εξαγοράς και πατήστε «Σύγκριση».")
+            return
+
+        with span(f"{fund}.scenarios", rows=len(df_monthly)) as scenarios_span:
+            totals = scenario_yearly_totals(df_monthly, fund, params["ceilings"], filters)
+            scenarios = evaluate_scenarios(totals, DTK_TABLE, fund, params["dtk_years"], params["buyouts"])
+            comparison = scenario_comparison(scenarios, params["metric"])
+            scenarios_span.set(scenarios=len(scenarios))
+        st.dataframe(
+            format_df_for_display(comparison, currency_cols=list(comparison.columns[1:])),
+            use_container_width=True,
+            hide_index=True,
+        )
+        if st.checkbox("Αναλυτικός πίνακας σεναρίων", key=f"scenario_details_{key}"):
+            st.dataframe(
+                format_df_for_display(
+                    scenarios,
+                    currency_cols=['ΠΟΣΟ ΕΞΑΓΟΡΑΣ', 'ΣΥΝΟΛΟ ΣΥΝΤΑΞΙΜΩΝ ΑΠΟΔΟΧΩΝ', 'ΜΕΣΟΣ ΣΥΝΤΑΞΙΜΟΣ ΜΙΣΘΟΣ'],
+                    int_cols=['ΗΜΕΡΕΣ ΕΞΑΓΟΡΑΣ', 'ΣΥΝΟΛΟ ΗΜΕΡΩΝ'],
+                    float_cols_decimals={'ΜΗΝΕΣ': 2},
+                ),
+                use_container_width=True,
+                hide_index=True,
+            )
+
+
 # --- UI Layout ---
 st.markdown(
     """
@@ -396,10 +588,15 @@ if not st.session_state["analysis_requested"]:
         """,
         unsafe_allow_html=True,
     )
+    statement_store = get_default_store()
     col_left, col_center, col_right = st.columns([1, 2, 1])
     with col_center:
         uploaded_file = st.file_uploader("Επιλέξτε PDF αρχείο", type="pdf")
+        if statement_store is not None:
+            st.text_input("Κωδικός πελάτη (προαιρετικό)", key="client_id")
         analyze_clicked = st.button("🔍 Αναλύστε το Αρχείο", use_container_width=True)
+        if statement_store is not None:
+            render_stored_statements(statement_store)
         st.markdown(
             """
             <div style="text-align:center; font-size: 0.9em; color: #6b7280;">
@@ -419,14 +616,19 @@ if analyze_clicked:
     else:
         st.session_state["analysis_requested"] = True
         st.session_state["uploaded_file"] = uploaded_file
+        st.session_state["stored_statement"] = None
         st.rerun()  # Ξαναφόρτωσε τη σελίδα για να κρύψει τη φόρμα
 
 
 # --- Main Logic ---
 effective_file = uploaded_file or st.session_state.get("uploaded_file")
-if effective_file is not None and st.session_state["analysis_requested"]:
+stored_statement = st.session_state.get("stored_statement")
+if (effective_file is not None or stored_statement) and st.session_state["analysis_requested"]:
     with st.spinner('Γίνεται ανάλυση του PDF...'):
-        df_monthly, df_annual = load_data(effective_file)
+        if stored_statement:
+            df_monthly, df_annual = load_stored(stored_statement)
+        else:
+            df_monthly, df_annual = load_data(effective_file, st.session_state.get("client_id", "").strip() or None)
         st.success('Η ανάλυση του PDF ολοκληρώθηκε!')
 
     if df_monthly is not None and not df_monthly.empty:
@@ -450,53 +652,29 @@ if effective_file is not None and st.session_state["analysis_requested"]:
             with _col_warn1:
                 st.warning("⚠️ **Πριν προχωρήσετε, βεβαιωθείτε ότι έχετε επιλέξει τα σωστά Πακέτα Κάλυψης στο φίλτρο παρακάτω.** Η ανάλυση βασίζεται στα επιλεγμένα πακέτα.")
 
-            df_analysis = df_monthly.copy()
-            period_str = df_analysis['ΠΕΡΙΟΔΟΣ'].astype(str).str.strip()
-            # Κανονικοποίηση μήνα σε 2 ψηφία για σταθερό parsing (π.χ. 1/2003 -> 01/2003)
-            period_str = period_str.str.replace(r'^(\d{1})/', r'0\1/', regex=True)
-            df_analysis['ΠΕΡΙΟΔΟΣ'] = period_str
-            period_dt = pd.to_datetime(period_str, format='%m/%Y', errors='coerce')
-            df_analysis['ΕΤΟΣ'] = period_dt.dt.year.astype('Int64').astype(str)
+            df_analysis = prepare_monthly(df_monthly)
 
             # Φίλτρα προβολής (κενό = όλα)
-            available_years = sorted([y for y in df_analysis['ΕΤΟΣ'].dropna().unique()])
+            package_desc_map = package_descriptions(df_annual)
+            options = filter_options(df_analysis, APODOXES_DESCRIPTIONS, package_desc_map)
+            available_years = options['years']
             year_options = ['(Όλα)'] + available_years
-
-            type_codes = sorted([str(t) for t in df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].dropna().unique()])
-            type_label_map = {
-                code: f"{code} - {APODOXES_DESCRIPTIONS.get(code, 'Άγνωστη Περιγραφή')}"
-                for code in type_codes
-            }
-            type_options = [type_label_map[code] for code in type_codes]
-            type_label_to_code = {label: code for code, label in type_label_map.items()}
-
-            package_codes = sorted([str(p) for p in df_analysis['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].dropna().unique()])
-            package_desc_map = {}
-            if df_annual is not None and not df_annual.empty:
-                package_desc_map = (
-                    df_annual.dropna(subset=['ΠΑΚ. ΚΑΛ.'])
-                    .groupby('ΠΑΚ. ΚΑΛ.')['ΠΕΡΙΓΡΑΦΗ']
-                    .first()
-                    .to_dict()
-                )
-            package_label_map = {
-                code: f"{code} - {package_desc_map.get(code, '').strip()}" if package_desc_map.get(code) else code
-                for code in package_codes
-            }
-            package_options = [package_label_map[code] for code in package_codes]
-            package_label_to_code = {label: code for code, label in package_label_map.items()}
+            type_options = list(options['types'].values())
+            type_label_to_code = {label: code for code, label in options['types'].items()}
+            package_options = list(options['packages'].values())
+            package_label_to_code = {label: code for code, label in options['packages'].items()}
 
             # Initialize session state for ceiling_type
             if "ceiling_type" not in st.session_state:
-                st.session_state["ceiling_type"] = 'Παλιός'
+                st.session_state["ceiling_type"] = DEFAULT_CEILING
 
             with st.form("filters_form"):
                 col_f1, col_f2, col_f3, col_f4, col_f5, col_btn = st.columns([1, 1, 1, 2, 2, 1.5])
                 with col_f1:
                     ceiling_type = st.selectbox(
                         "Πλαφόν",
-                        ('Παλιός', 'Νέος'),
-                        index=0 if st.session_state["ceiling_type"] == 'Παλιός' else 1,
+                        tuple(CEILING_TABLES),
+                        index=list(CEILING_TABLES).index(st.session_state["ceiling_type"]),
                         key="ceiling_type_select"
                     )
                     st.session_state["ceiling_type"] = ceiling_type
@@ -513,215 +691,42 @@ if effective_file is not None and st.session_state["analysis_requested"]:
                     st.write("")  # Empty space for alignment
                     apply_filters = st.form_submit_button("Εφαρμογή φίλτρων", use_container_width=True)
 
-            # Εφαρμογή φίλτρων
-            filtered = df_analysis.copy()
+            # Εφαρμογή φίλτρων: στο session_state κρατάμε την επιλογή, όχι τα δεδομένα
             if apply_filters:
-                if year_from != '(Όλα)' or year_to != '(Όλα)':
-                    min_year = available_years[0] if available_years else None
-                    max_year = available_years[-1] if available_years else None
-                    from_year = year_from if year_from != '(Όλα)' else min_year
-                    to_year = year_to if year_to != '(Όλα)' else max_year
-                    if from_year and to_year and from_year > to_year:
-                        from_year, to_year = to_year, from_year
-                    if from_year and to_year:
-                        filtered = filtered[(filtered['ΕΤΟΣ'] >= from_year) & (filtered['ΕΤΟΣ'] <= to_year)]
-
-                if selected_type_labels:
-                    selected_types = [type_label_to_code[label] for label in selected_type_labels]
-                    filtered = filtered[filtered['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(selected_types)]
-
-                if selected_package_labels:
-                    selected_packages = [package_label_to_code[label] for label in selected_package_labels]
-                    filtered = filtered[filtered['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].astype(str).isin(selected_packages)]
-
-                # Αποθήκευση φιλτραρισμένων δεδομένων στο session_state
-                st.session_state["filtered_analysis"] = filtered.copy()
+                filters = build_filters(
+                    available_years,
+                    year_from if year_from != '(Όλα)' else None,
+                    year_to if year_to != '(Όλα)' else None,
+                    [type_label_to_code[label] for label in selected_type_labels],
+                    [package_label_to_code[label] for label in selected_package_labels],
+                )
+                st.session_state["filters_kyrias"] = filters
                 st.session_state["all_packages_kyrias"] = package_options
                 st.session_state["selected_packages_kyrias"] = list(selected_package_labels)
-                df_analysis = filtered.copy()
-            elif "filtered_analysis" in st.session_state:
-                # Χρήση αποθηκευμένων φιλτραρισμένων δεδομένων
-                df_analysis = st.session_state["filtered_analysis"].copy()
-            else:
-                df_analysis = filtered.copy()
 
             # Αρχικοποίηση πακέτων αν δεν έχουν αποθηκευτεί ακόμα
             if "all_packages_kyrias" not in st.session_state:
                 st.session_state["all_packages_kyrias"] = package_options
                 st.session_state["selected_packages_kyrias"] = []
 
-            # Υπολογισμός ΒΑΣΙΚΟ ΠΛΑΦΟΝ με βάση το επιλεγμένο ceiling_type
-            ceiling_type = st.session_state.get("ceiling_type", "Παλιός")
-            ceiling_dict = insurable_ceiling_old if ceiling_type == 'Παλιός' else insurable_ceiling_new
-            df_analysis['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'] = df_analysis['ΕΤΟΣ'].map(ceiling_dict).fillna(0)
-
-            # Αποδοχές μήνα: άθροισμα αποδοχών ίδιου μήνα, εξαιρώντας Δώρα/Επίδομα Αδείας
-            excluded_mask = df_analysis['ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ'].astype(str).str.contains(
-                r'δώρο|επίδομα\s+αδείας', case=False, regex=True
-            ) | df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(['03', '04', '05'])
-            df_analysis['IS_SPECIAL'] = excluded_mask
-            monthly_earnings = (
-                df_analysis.loc[~excluded_mask]
-                .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΑΠΟΔΟΧΕΣ']
-                .sum()
-            )
-            df_analysis['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'] = df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings)
-
-            # Υπολογισμός πλαφόν ανά μήνα με βάση τις ημέρες εργασίας από τον κωδικό 01
-            days_map = (
-                df_analysis.loc[df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str) == '01']
-                .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΗΜΕΡ. ΑΠΑΣΧ.']
-                .max()
-            )
-            base_plafon_map = (
-                df_analysis.groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΒΑΣΙΚΟ ΠΛΑΦΟΝ']
-                .max()
-            )
-            plafon_month_map = (base_plafon_map / 25 * days_map).clip(upper=base_plafon_map)
-            plafon_month_map = plafon_month_map.fillna(base_plafon_map)
-
-            # Εισφορίσιμο πλαφόν ανά γραμμή
-            df_analysis['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = df_analysis['ΠΕΡΙΟΔΟΣ'].map(plafon_month_map)
-            df_analysis.loc[df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str) == '03', 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = df_analysis['ΒΑΣΙΚΟ ΠΛΑΦΟΝ']
-            df_analysis.loc[df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(['04', '05']), 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = df_analysis['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'] / 2
-
-            # Εισφορίσιμες αποδοχές ανά μήνα (όχι ανά γραμμή), εκτός από ειδικές αποδοχές
-            monthly_plafon = (
-                df_analysis.groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ']
-                .max()
-            )
-            monthly_insurable = (df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings)
-                                 .combine(df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_plafon), min))
-            df_analysis['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = monthly_insurable
-
-            perikopi_map = (df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings) -
-                            df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_plafon))
-            df_analysis['ΠΕΡΙΚΟΠΗ'] = perikopi_map.where(perikopi_map > 0, None)
-
-            # Για ειδικές αποδοχές (Δώρα/Επίδομα), ο έλεγχος γίνεται ανά γραμμή
-            df_analysis.loc[df_analysis['IS_SPECIAL'], 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = df_analysis.loc[
-                df_analysis['IS_SPECIAL'], ['ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ']
-            ].min(axis=1)
-            df_analysis.loc[df_analysis['IS_SPECIAL'], 'ΠΕΡΙΚΟΠΗ'] = (
-                df_analysis.loc[df_analysis['IS_SPECIAL'], 'ΑΠΟΔΟΧΕΣ'] -
-                df_analysis.loc[df_analysis['IS_SPECIAL'], 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ']
-            ).where(lambda s: s > 0, None)
-
-            # Αποφυγή διαίρεσης με το μηδέν
-            df_analysis['ΠΟΣΟΣΤΟ'] = df_analysis.apply(
-                lambda row: (row['ΕΙΣΦΟΡΕΣ'] / row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ']) * 100 if row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] > 0 else 0,
-                axis=1
-            )
-
-            display_df = df_analysis.copy()
-            # Περιγραφή πακέτου κάλυψης από τα ετήσια δεδομένα
-            _pkg_map = {str(k): (v or '') for k, v in package_desc_map.items()}
-            display_df['ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ'] = (
-                display_df['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].astype(str).replace('nan', '').map(_pkg_map).fillna('')
-            )
-            # Κρατάμε σταθερά keys για την ομαδοποίηση πριν "κενώσουμε" τα πεδία
-            display_df['ΕΤΟΣ_KEY'] = display_df['ΕΤΟΣ']
-            display_df['ΠΕΡΙΟΔΟΣ_KEY'] = display_df['ΠΕΡΙΟΔΟΣ']
-
-            # Ταξινόμηση για ομαδοποίηση ανά έτος και περίοδο
-            display_df['ΤΥΠΟΣ_SORT'] = display_df['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str)
-            display_df = display_df.sort_values([
-                'ΕΤΟΣ_KEY', 'IS_SPECIAL', 'ΠΕΡΙΟΔΟΣ_KEY', 'ΤΥΠΟΣ_SORT'
-            ])
-
-            # Εμφάνιση έτους μόνο στην πρώτη γραμμή κάθε έτους
-            display_df['ΕΤΟΣ'] = display_df['ΕΤΟΣ'].where(~display_df.duplicated(['ΕΤΟΣ_KEY']), '')
-            # Εμφάνιση περιόδου μόνο στην πρώτη γραμμή κάθε περιόδου
-            display_df['ΠΕΡΙΟΔΟΣ'] = display_df['ΠΕΡΙΟΔΟΣ'].where(~display_df.duplicated(['ΕΤΟΣ_KEY', 'ΠΕΡΙΟΔΟΣ_KEY']), '')
-
-            # Εμφάνιση "ΑΠΟΔΟΧΕΣ ΜΗΝΑ", "ΠΛΑΦΟΝ", "ΠΕΡΙΚΟΠΗ" μόνο στην πρώτη γραμμή κάθε περιόδου
-            show_month_total = ~display_df.duplicated(['ΕΤΟΣ_KEY', 'ΠΕΡΙΟΔΟΣ_KEY'])
-            display_df['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'] = display_df['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'].where(show_month_total, '')
-            display_df['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = display_df['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'].where(
-                show_month_total | display_df['IS_SPECIAL'], ''
-            )
-            display_df['ΠΕΡΙΚΟΠΗ'] = display_df['ΠΕΡΙΚΟΠΗ'].where(
-                show_month_total | display_df['IS_SPECIAL'], ''
-            )
-            display_df['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = display_df['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'].where(
-                show_month_total | display_df['IS_SPECIAL'], ''
-            )
-
-            visible_columns = [
-                'ΕΤΟΣ', 'ΠΕΡΙΟΔΟΣ', 'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ', 'ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ', 'ΗΜΕΡ. ΑΠΑΣΧ.', 'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ',
-                'ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ', 'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ',
-                'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'
-            ]
-            display_df_visible = display_df[visible_columns]
-
-            # Προσθήκη γραμμών σύνοψης ανά έτος και κενής γραμμής μετά
-            rows = []
-            summary_flags = []
-            yearly_totals_rows = []
-            years = [y for y in display_df['ΕΤΟΣ_KEY'].dropna().unique()]
-            years = sorted(years)
-            for year in years:
-                year_mask = display_df['ΕΤΟΣ_KEY'] == year
-                year_rows = display_df_visible[year_mask]
-                for _, row in year_rows.iterrows():
-                    rows.append(row.to_dict())
-                    summary_flags.append(False)
-
-                totals = df_analysis[df_analysis['ΕΤΟΣ'] == str(year)]
-                summary_row = {col: '' for col in visible_columns}
-                summary_row['ΕΤΟΣ'] = f"ΣΥΝΟΛΟ {year}"
-                total_days = totals['ΗΜΕΡ. ΑΠΑΣΧ.'].sum()
-                total_apodoxes = totals['ΑΠΟΔΟΧΕΣ'].sum()
-                summary_row['ΑΠΟΔΟΧΕΣ'] = round(total_apodoxes, 2)
-                summary_row['ΕΙΣΦΟΡΕΣ'] = round(totals['ΕΙΣΦΟΡΕΣ'].sum(), 2)
-
-                # Σύνολο περικοπής: μία φορά ανά μήνα + ειδικές αποδοχές ανά γραμμή
-                perikopi_month_sum = (
-                    totals.loc[~totals['IS_SPECIAL']]
-                    .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΠΕΡΙΚΟΠΗ']
-                    .max()
-                    .fillna(0)
-                    .sum()
+            # Υπολογισμός πλαφόν με βάση το επιλεγμένο ceiling_type (κοινή μηχανή, με cache)
+            ceiling_type = st.session_state.get("ceiling_type", DEFAULT_CEILING)
+            with span("kyria.insurable", rows=len(df_monthly)) as insurable_span:
+                df_analysis = compute_insurable(
+                    df_monthly, ceiling_table(ceiling_type), filters=st.session_state.get("filters_kyrias")
                 )
-                perikopi_special_sum = totals.loc[totals['IS_SPECIAL'], 'ΠΕΡΙΚΟΠΗ'].fillna(0).sum()
-                total_perikopi = perikopi_month_sum + perikopi_special_sum
-                total_insurable = round(total_apodoxes - total_perikopi, 2)
-                summary_row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = total_insurable
-                rows.append(summary_row)
-                summary_flags.append(True)
-
-                yearly_totals_rows.append({
-                    'ΕΤΟΣ': year,
-                    'ΗΜΕΡ. ΑΠΑΣΧ.': total_days,
-                    'ΑΠΟΔΟΧΕΣ': round(total_apodoxes, 2),
-                    'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ': total_insurable
-                })
-
-                blank_row = {col: '' for col in visible_columns}
-                rows.append(blank_row)
-                summary_flags.append(False)
-
-            display_df_with_totals = pd.DataFrame(rows, columns=visible_columns)
-            display_df_with_totals = round_float_columns(display_df_with_totals)
-            display_df_with_totals = round_numeric_columns(
-                display_df_with_totals,
-                columns=[
-                    'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ',
-                    'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'
-                ],
-                decimals=2
-            )
-            # Κρύβουμε τα μηδενικά μόνο στις συγκεκριμένες στήλες
-            for col in ['ΗΜΕΡ. ΑΠΑΣΧ.', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ']:
-                if col in display_df_with_totals.columns:
-                    display_df_with_totals[col] = display_df_with_totals[col].replace(0, '')
+                insurable_span.set(rows=len(df_analysis))
+
+            # Πίνακας με γραμμές σύνοψης ανά έτος και κενή γραμμή μετά
+            with span("kyria.display") as display_span:
+                display_df_with_totals, yearly_totals = build_display_with_totals(df_analysis, package_desc_map)
+                display_df_with_totals = finalize_analysis_display(display_df_with_totals)
+                display_span.set(rows=len(display_df_with_totals))
 
-            st.dataframe(display_df_with_totals, use_container_width=True, hide_index=True)
-            html_analysis = dataframe_to_printable_html(display_df_with_totals, "Ανάλυση Κύριας Αποδοχών / Εισφορών / Πλαφόν")
-            if html_analysis:
-                components.html(html_open_in_new_tab_component(html_analysis), height=56)
+            with span("kyria.render", rows=len(display_df_with_totals)):
+                st.dataframe(display_df_with_totals, use_container_width=True, hide_index=True)
+            render_report_button(display_df_with_totals, "Ανάλυση Κύριας Αποδοχών / Εισφορών / Πλαφόν", "efka_analysi_kyrias.html", "report_analysis_kyrias")
 
-            yearly_totals = pd.DataFrame(yearly_totals_rows)
             # Αποθήκευση στο session_state μόνο αν εφαρμόστηκαν φίλτρα ή αν δεν υπάρχει ακόμα
             if apply_filters or "yearly_totals" not in st.session_state:
                 st.session_state["yearly_totals"] = yearly_totals
@@ -734,9 +739,6 @@ if effective_file is not None and st.session_state["analysis_requested"]:
             yearly_totals = st.session_state.get("yearly_totals")
 
             if yearly_totals is not None and not yearly_totals.empty:
-                pension_df = yearly_totals.copy()
-                pension_df['ΕΤΟΣ'] = pd.to_numeric(pension_df['ΕΤΟΣ'])
-
                 dtk_year_options = sorted(DTK_TABLE.keys(), reverse=True)
                 default_dtk_index = dtk_year_options.index(2026) if 2026 in dtk_year_options else 0
                 buyout_year_options = sorted(DTK_TABLE[dtk_year_options[0]].keys(), reverse=True)
@@ -778,38 +780,16 @@ if effective_file is not None and st.session_state["analysis_requested"]:
                     buyout_days = _p.get("buyout_days", 0)
                     buyout_year = _p.get("buyout_year", 2026)
                     buyout_amount = _p.get("buyout_amount", 0.0)
-                    dtk_factors = DTK_TABLE[selected_dtk_year]
-                    buyout_dtk = dtk_factors.get(buyout_year, 1.0)
-                    buyout_insurable = buyout_amount * 5
-
-                    # Υπολογισμοί
-                    pension_df['ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ'] = pension_df['ΕΤΟΣ'].map(dtk_factors).fillna(1.0)
-                    pension_df['ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = (
-                        pension_df['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] * pension_df['ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ']
-                    )
-
-                    # Γραμμή εξαγοράς
-                    if buyout_days > 0 or buyout_amount > 0:
-                        pension_df = pd.concat([
-                            pension_df,
-                            pd.DataFrame([{
-                                'ΕΤΟΣ': buyout_year,
-                                'ΗΜΕΡ. ΑΠΑΣΧ.': buyout_days,
-                                'ΑΠΟΔΟΧΕΣ': 0,
-                                'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ': buyout_insurable,
-                                'ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ': buyout_dtk,
-                                'ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ': buyout_insurable * buyout_dtk,
-                            }])
-                        ], ignore_index=True)
-                        pension_df.loc[pension_df.index[-1], 'ΕΤΟΣ'] = "ΕΞΑΓΟΡΑ"
-
-                    # Metrics
-                    total_days = pension_df['ΗΜΕΡ. ΑΠΑΣΧ.'].sum()
-                    total_pensionable_earnings = pension_df['ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'].sum()
-                    months_from_2002 = total_days / 25 if total_days > 0 else 0
-                    average_pensionable_salary = (
-                        total_pensionable_earnings / months_from_2002 if months_from_2002 > 0 else 0
-                    )
+                    with span("kyria.pension", rows=len(yearly_totals)):
+                        pension_df, pension_summary = compute_pension(
+                            yearly_totals, DTK_TABLE[selected_dtk_year], 'kyria',
+                            buyout_days, buyout_year, buyout_amount,
+                        )
+                    buyout_dtk = pension_summary['buyout_dtk']
+                    total_days = pension_summary['total_days']
+                    total_pensionable_earnings = pension_summary['total_pensionable_earnings']
+                    months_from_2002 = pension_summary['months']
+                    average_pensionable_salary = pension_summary['average_pensionable_salary']
 
                     col1, col2, col3, col4 = st.columns(4)
                     col1.metric("Σύνολο Ημερών", format_number_gr(total_days, 0))
@@ -817,78 +797,31 @@ if effective_file is not None and st.session_state["analysis_requested"]:
                     col3.metric("Σύνολο Συντάξιμων Αποδοχών", format_currency_gr(total_pensionable_earnings))
                     col4.metric("Μέσος Συντάξιμος Μισθός", format_currency_gr(average_pensionable_salary))
 
-                    pension_display = format_df_for_display(
-                        pension_df,
-                        currency_cols=['ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ', 'ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'],
-                        int_cols=['ΗΜΕΡ. ΑΠΑΣΧ.'],
-                        float_cols_decimals={'ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ': 5},
-                    )
+                    with span("kyria.format", rows=len(pension_df)):
+                        pension_display = format_df_for_display(
+                            pension_df,
+                            currency_cols=['ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ', 'ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'],
+                            int_cols=['ΗΜΕΡ. ΑΠΑΣΧ.'],
+                            float_cols_decimals={'ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ': 5},
+                        )
                     styled_pension = pension_display.style.set_properties(**{'text-align': 'left'}).set_table_styles(
                         [{'selector': 'th', 'props': [('text-align', 'left')]}]
                     )
-                    st.dataframe(styled_pension, use_container_width=True, hide_index=True)
-                    html_pension = dataframe_to_printable_html(pension_display, "Συντάξιμες Αποδοχές Κύριας")
-                    if html_pension:
-                        components.html(html_open_in_new_tab_component(html_pension), height=56)
+                    with span("kyria.pension_render", rows=len(pension_display)):
+                        st.dataframe(styled_pension, use_container_width=True, hide_index=True)
+                    render_report_button(pension_display, "Συντάξιμες Αποδοχές Κύριας", "efka_syntaximes_kyrias.html", "report_pension_kyrias")
 
                     # --- Εξαγωγή JSON για Syntaksi Pro ---
                     st.markdown("---")
                     st.subheader("Εξαγωγή για Syntaksi Pro")
 
-                    # Δημιουργία JSON - εξαιρούμε τη γραμμή ΕΞΑΓΟΡΑ
-                    json_data = {}
-                    for _, row in pension_df.iterrows():
-                        year = row['ΕΤΟΣ']
-                        if year == "ΕΞΑΓΟΡΑ":
-                            continue
-                        year_str = str(int(year)) if isinstance(year, (int, float)) else str(year)
-
-                        # ika_YYYY = ΗΜΕΡ. ΑΠΑΣΧ.
-                        json_data[f"ika_{year_str}"] = {
-                            "value": int(row['ΗΜΕΡ. ΑΠΑΣΧ.']),
-                            "type": "number"
-                        }
-                        # apodoxes_YYYY = ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ
-                        json_data[f"apodoxes_{year_str}"] = {
-                            "value": round(row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'], 2),
-                            "type": "number"
-                        }
-
-                    # Προσθήκη δεδομένων εξαγοράς
-                    json_data["eksagorasmenes_imeres"] = {
-                        "value": int(buyout_days),
-                        "type": "number"
-                    }
-                    json_data["synoliko_poso_eksagoras"] = {
-                        "value": round(buyout_amount, 2),
-                        "type": "number"
-                    }
-                    json_data["dtk_eksagoras"] = {
-                        "value": round(buyout_dtk, 5),
-                        "type": "number"
-                    }
-
-                    # Προσθήκη ΔΤΚ αναφοράς και έτους εθνικής
-                    json_data["dtk"] = {
-                        "value": int(selected_dtk_year),
-                        "type": "number"
-                    }
-                    json_data["etos_ethnikis"] = {
-                        "value": int(selected_dtk_year),
-                        "type": "number"
-                    }
-
-                    json_str = json.dumps(json_data, indent=2, ensure_ascii=False)
+                    # JSON χωρίς τη γραμμή ΕΞΑΓΟΡΑ στα έτη, κατ' απαίτηση
+                    render_syntaksi_download(
+                        pension_df, 'kyria', selected_dtk_year, buyout_days, buyout_amount, buyout_dtk,
+                        "📥 Λήψη JSON για Syntaksi Pro", "download_json_kyrias",
+                    )
 
-                    col_json1, col_json2, col_json3 = st.columns([1, 2, 1])
-                    with col_json2:
-                        st.download_button(
-                            label="📥 Λήψη JSON για Syntaksi Pro",
-                            data=json_str,
-                            file_name="efka_syntaksi_pro.json",
-                            mime="application/json",
-                            use_container_width=True
-                        )
+                render_scenario_comparison(df_monthly, 'kyria', st.session_state.get("filters_kyrias"), "kyrias")
             else:
                 st.warning("Δεν υπάρχουν συνοπτικά δεδομένα για τον υπολογισμό των συντάξιμων αποδοχών.")
 
@@ -902,58 +835,33 @@ if effective_file is not None and st.session_state["analysis_requested"]:
             with _col_warn3:
                 st.warning("⚠️ **Πριν προχωρήσετε, βεβαιωθείτε ότι έχετε επιλέξει τα σωστά Πακέτα Κάλυψης στο φίλτρο παρακάτω.** Η ανάλυση βασίζεται στα επιλεγμένα πακέτα.")
 
-            df_analysis_epik = df_monthly.copy()
-            period_str_epik = df_analysis_epik['ΠΕΡΙΟΔΟΣ'].astype(str).str.strip()
-            period_str_epik = period_str_epik.str.replace(r'^(\d{1})/', r'0\1/', regex=True)
-            df_analysis_epik['ΠΕΡΙΟΔΟΣ'] = period_str_epik
-            period_dt_epik = pd.to_datetime(period_str_epik, format='%m/%Y', errors='coerce')
-            df_analysis_epik['ΕΤΟΣ'] = period_dt_epik.dt.year.astype('Int64').astype(str)
-
             # Φιλτράρισμα μόνο για 2002-2014
-            df_analysis_epik = df_analysis_epik[df_analysis_epik['ΕΤΟΣ'].isin([str(y) for y in range(2002, 2015)])]
+            df_analysis_epik = prepare_monthly(df_monthly, EPIK_YEAR_RANGE)
 
             if df_analysis_epik.empty:
                 st.warning("Δεν υπάρχουν δεδομένα για την περίοδο 2002-2014.")
             else:
                 # Φίλτρα προβολής (κενό = όλα)
-                available_years_epik = sorted([y for y in df_analysis_epik['ΕΤΟΣ'].dropna().unique()])
+                package_desc_map_epik = package_descriptions(df_annual)
+                options_epik = filter_options(df_analysis_epik, APODOXES_DESCRIPTIONS, package_desc_map_epik)
+                available_years_epik = options_epik['years']
                 year_options_epik = ['(Όλα)'] + available_years_epik
-
-                type_codes_epik = sorted([str(t) for t in df_analysis_epik['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].dropna().unique()])
-                type_label_map_epik = {
-                    code: f"{code} - {APODOXES_DESCRIPTIONS.get(code, 'Άγνωστη Περιγραφή')}"
-                    for code in type_codes_epik
-                }
-                type_options_epik = [type_label_map_epik[code] for code in type_codes_epik]
-                type_label_to_code_epik = {label: code for code, label in type_label_map_epik.items()}
-
-                package_codes_epik = sorted([str(p) for p in df_analysis_epik['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].dropna().unique()])
-                package_desc_map_epik = {}
-                if df_annual is not None and not df_annual.empty:
-                    package_desc_map_epik = (
-                        df_annual.dropna(subset=['ΠΑΚ. ΚΑΛ.'])
-                        .groupby('ΠΑΚ. ΚΑΛ.')['ΠΕΡΙΓΡΑΦΗ']
-                        .first()
-                        .to_dict()
-                    )
-                package_label_map_epik = {
-                    code: f"{code} - {package_desc_map_epik.get(code, '').strip()}" if package_desc_map_epik.get(code) else code
-                    for code in package_codes_epik
-                }
-                package_options_epik = [package_label_map_epik[code] for code in package_codes_epik]
-                package_label_to_code_epik = {label: code for code, label in package_label_map_epik.items()}
+                type_options_epik = list(options_epik['types'].values())
+                type_label_to_code_epik = {label: code for code, label in options_epik['types'].items()}
+                package_options_epik = list(options_epik['packages'].values())
+                package_label_to_code_epik = {label: code for code, label in options_epik['packages'].items()}
 
                 # Initialize session state for ceiling_type_epik
                 if "ceiling_type_epik" not in st.session_state:
-                    st.session_state["ceiling_type_epik"] = 'Παλιός'
+                    st.session_state["ceiling_type_epik"] = DEFAULT_CEILING
 
                 with st.form("filters_form_epik"):
                     col_e1, col_e2, col_e3, col_e4, col_e5, col_btn_e = st.columns([1, 1, 1, 2, 2, 1.5])
                     with col_e1:
                         ceiling_type_epik = st.selectbox(
                             "Πλαφόν",
-                            ('Παλιός', 'Νέος'),
-                            index=0 if st.session_state["ceiling_type_epik"] == 'Παλιός' else 1,
+                            tuple(CEILING_TABLES),
+                            index=list(CEILING_TABLES).index(st.session_state["ceiling_type_epik"]),
                             key="ceiling_type_select_epik"
                         )
                         st.session_state["ceiling_type_epik"] = ceiling_type_epik
@@ -970,200 +878,44 @@ if effective_file is not None and st.session_state["analysis_requested"]:
                         st.write("")  # Empty space for alignment
                         apply_filters_epik = st.form_submit_button("Εφαρμογή φίλτρων", use_container_width=True)
 
-                # Εφαρμογή φίλτρων
-                filtered_epik = df_analysis_epik.copy()
+                # Εφαρμογή φίλτρων: στο session_state κρατάμε την επιλογή, όχι τα δεδομένα
                 if apply_filters_epik:
-                    if year_from_epik != '(Όλα)' or year_to_epik != '(Όλα)':
-                        min_year_epik = available_years_epik[0] if available_years_epik else None
-                        max_year_epik = available_years_epik[-1] if available_years_epik else None
-                        from_year_epik = year_from_epik if year_from_epik != '(Όλα)' else min_year_epik
-                        to_year_epik = year_to_epik if year_to_epik != '(Όλα)' else max_year_epik
-                        if from_year_epik and to_year_epik and from_year_epik > to_year_epik:
-                            from_year_epik, to_year_epik = to_year_epik, from_year_epik
-                        if from_year_epik and to_year_epik:
-                            filtered_epik = filtered_epik[(filtered_epik['ΕΤΟΣ'] >= from_year_epik) & (filtered_epik['ΕΤΟΣ'] <= to_year_epik)]
-
-                    if selected_type_labels_epik:
-                        selected_types_epik = [type_label_to_code_epik[label] for label in selected_type_labels_epik]
-                        filtered_epik = filtered_epik[filtered_epik['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(selected_types_epik)]
-
-                    if selected_package_labels_epik:
-                        selected_packages_epik = [package_label_to_code_epik[label] for label in selected_package_labels_epik]
-                        filtered_epik = filtered_epik[filtered_epik['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].astype(str).isin(selected_packages_epik)]
-
-                    # Αποθήκευση φιλτραρισμένων δεδομένων στο session_state
-                    st.session_state["filtered_analysis_epik"] = filtered_epik.copy()
+                    filters_epik = build_filters(
+                        available_years_epik,
+                        year_from_epik if year_from_epik != '(Όλα)' else None,
+                        year_to_epik if year_to_epik != '(Όλα)' else None,
+                        [type_label_to_code_epik[label] for label in selected_type_labels_epik],
+                        [package_label_to_code_epik[label] for label in selected_package_labels_epik],
+                    )
+                    st.session_state["filters_epik"] = filters_epik
                     st.session_state["all_packages_epik"] = package_options_epik
                     st.session_state["selected_packages_epik"] = list(selected_package_labels_epik)
-                    df_analysis_epik = filtered_epik.copy()
-                elif "filtered_analysis_epik" in st.session_state:
-                    # Χρήση αποθηκευμένων φιλτραρισμένων δεδομένων
-                    df_analysis_epik = st.session_state["filtered_analysis_epik"].copy()
-                else:
-                    df_analysis_epik = filtered_epik.copy()
 
                 # Αρχικοποίηση πακέτων αν δεν έχουν αποθηκευτεί ακόμα
                 if "all_packages_epik" not in st.session_state:
                     st.session_state["all_packages_epik"] = package_options_epik
                     st.session_state["selected_packages_epik"] = []
 
-                # Υπολογισμός ΒΑΣΙΚΟ ΠΛΑΦΟΝ
-                ceiling_type_epik = st.session_state.get("ceiling_type_epik", "Παλιός")
-                ceiling_dict_epik = insurable_ceiling_old if ceiling_type_epik == 'Παλιός' else insurable_ceiling_new
-                df_analysis_epik['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'] = df_analysis_epik['ΕΤΟΣ'].map(ceiling_dict_epik).fillna(0)
-
-                # Αποδοχές μήνα
-                excluded_mask_epik = df_analysis_epik['ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ'].astype(str).str.contains(
-                    r'δώρο|επίδομα\s+αδείας', case=False, regex=True
-                ) | df_analysis_epik['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(['03', '04', '05'])
-                df_analysis_epik['IS_SPECIAL'] = excluded_mask_epik
-                monthly_earnings_epik = (
-                    df_analysis_epik.loc[~excluded_mask_epik]
-                    .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΑΠΟΔΟΧΕΣ']
-                    .sum()
-                )
-                df_analysis_epik['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'] = df_analysis_epik['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings_epik)
-
-                # Υπολογισμός πλαφόν
-                days_map_epik = (
-                    df_analysis_epik.loc[df_analysis_epik['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str) == '01']
-                    .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΗΜΕΡ. ΑΠΑΣΧ.']
-                    .max()
-                )
-                base_plafon_map_epik = (
-                    df_analysis_epik.groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΒΑΣΙΚΟ ΠΛΑΦΟΝ']
-                    .max()
-                )
-                plafon_month_map_epik = (base_plafon_map_epik / 25 * days_map_epik).clip(upper=base_plafon_map_epik)
-                plafon_month_map_epik = plafon_month_map_epik.fillna(base_plafon_map_epik)
-
-                df_analysis_epik['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = df_analysis_epik['ΠΕΡΙΟΔΟΣ'].map(plafon_month_map_epik)
-                df_analysis_epik.loc[df_analysis_epik['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str) == '03', 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = df_analysis_epik['ΒΑΣΙΚΟ ΠΛΑΦΟΝ']
-                df_analysis_epik.loc[df_analysis_epik['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(['04', '05']), 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = df_analysis_epik['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'] / 2
-
-                monthly_plafon_epik = df_analysis_epik.groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'].max()
-                monthly_insurable_epik = (df_analysis_epik['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings_epik)
-                                          .combine(df_analysis_epik['ΠΕΡΙΟΔΟΣ'].map(monthly_plafon_epik), min))
-                df_analysis_epik['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = monthly_insurable_epik
-
-                perikopi_map_epik = (df_analysis_epik['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings_epik) -
-                                     df_analysis_epik['ΠΕΡΙΟΔΟΣ'].map(monthly_plafon_epik))
-                df_analysis_epik['ΠΕΡΙΚΟΠΗ'] = perikopi_map_epik.where(perikopi_map_epik > 0, None)
-
-                df_analysis_epik.loc[df_analysis_epik['IS_SPECIAL'], 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = df_analysis_epik.loc[
-                    df_analysis_epik['IS_SPECIAL'], ['ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ']
-                ].min(axis=1)
-                df_analysis_epik.loc[df_analysis_epik['IS_SPECIAL'], 'ΠΕΡΙΚΟΠΗ'] = (
-                    df_analysis_epik.loc[df_analysis_epik['IS_SPECIAL'], 'ΑΠΟΔΟΧΕΣ'] -
-                    df_analysis_epik.loc[df_analysis_epik['IS_SPECIAL'], 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ']
-                ).where(lambda s: s > 0, None)
-
-                df_analysis_epik['ΠΟΣΟΣΤΟ'] = df_analysis_epik.apply(
-                    lambda row: (row['ΕΙΣΦΟΡΕΣ'] / row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ']) * 100 if row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] > 0 else 0,
-                    axis=1
-                )
-
-                display_df_epik = df_analysis_epik.copy()
-                # Περιγραφή πακέτου κάλυψης από τα ετήσια δεδομένα
-                _pkg_map_epik = {str(k): (v or '') for k, v in package_desc_map_epik.items()}
-                display_df_epik['ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ'] = (
-                    display_df_epik['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].astype(str).replace('nan', '').map(_pkg_map_epik).fillna('')
-                )
-                display_df_epik['ΕΤΟΣ_KEY'] = display_df_epik['ΕΤΟΣ']
-                display_df_epik['ΠΕΡΙΟΔΟΣ_KEY'] = display_df_epik['ΠΕΡΙΟΔΟΣ']
-                display_df_epik['ΤΥΠΟΣ_SORT'] = display_df_epik['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str)
-                display_df_epik = display_df_epik.sort_values([
-                    'ΕΤΟΣ_KEY', 'IS_SPECIAL', 'ΠΕΡΙΟΔΟΣ_KEY', 'ΤΥΠΟΣ_SORT'
-                ])
-
-                display_df_epik['ΕΤΟΣ'] = display_df_epik['ΕΤΟΣ'].where(~display_df_epik.duplicated(['ΕΤΟΣ_KEY']), '')
-                display_df_epik['ΠΕΡΙΟΔΟΣ'] = display_df_epik['ΠΕΡΙΟΔΟΣ'].where(~display_df_epik.duplicated(['ΕΤΟΣ_KEY', 'ΠΕΡΙΟΔΟΣ_KEY']), '')
-
-                show_month_total_epik = ~display_df_epik.duplicated(['ΕΤΟΣ_KEY', 'ΠΕΡΙΟΔΟΣ_KEY'])
-                display_df_epik['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'] = display_df_epik['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'].where(show_month_total_epik, '')
-                display_df_epik['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = display_df_epik['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'].where(
-                    show_month_total_epik | display_df_epik['IS_SPECIAL'], ''
-                )
-                display_df_epik['ΠΕΡΙΚΟΠΗ'] = display_df_epik['ΠΕΡΙΚΟΠΗ'].where(
-                    show_month_total_epik | display_df_epik['IS_SPECIAL'], ''
-                )
-                display_df_epik['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = display_df_epik['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'].where(
-                    show_month_total_epik | display_df_epik['IS_SPECIAL'], ''
-                )
+                # Υπολογισμός πλαφόν (κοινή μηχανή με την Κύρια, με cache)
+                ceiling_type_epik = st.session_state.get("ceiling_type_epik", DEFAULT_CEILING)
+                with span("epikouriki.insurable", rows=len(df_monthly)) as insurable_span_epik:
+                    df_analysis_epik = compute_insurable(
+                        df_monthly, ceiling_table(ceiling_type_epik), EPIK_YEAR_RANGE, st.session_state.get("filters_epik")
+                    )
+                    insurable_span_epik.set(rows=len(df_analysis_epik))
 
-                visible_columns_epik = [
-                    'ΕΤΟΣ', 'ΠΕΡΙΟΔΟΣ', 'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ', 'ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ', 'ΗΜΕΡ. ΑΠΑΣΧ.', 'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ',
-                    'ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ', 'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ',
-                    'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'
-                ]
-                display_df_visible_epik = display_df_epik[visible_columns_epik]
-
-                # Προσθήκη γραμμών σύνοψης ανά έτος
-                rows_epik = []
-                summary_flags_epik = []
-                yearly_totals_rows_epik = []
-                years_epik = sorted([y for y in display_df_epik['ΕΤΟΣ_KEY'].dropna().unique()])
-
-                for year in years_epik:
-                    year_mask = display_df_epik['ΕΤΟΣ_KEY'] == year
-                    year_rows = display_df_visible_epik[year_mask]
-                    for _, row in year_rows.iterrows():
-                        rows_epik.append(row.to_dict())
-                        summary_flags_epik.append(False)
-
-                    totals_epik = df_analysis_epik[df_analysis_epik['ΕΤΟΣ'] == str(year)]
-                    summary_row_epik = {col: '' for col in visible_columns_epik}
-                    summary_row_epik['ΕΤΟΣ'] = f"ΣΥΝΟΛΟ {year}"
-                    total_days_epik = totals_epik['ΗΜΕΡ. ΑΠΑΣΧ.'].sum()
-                    total_apodoxes_epik = totals_epik['ΑΠΟΔΟΧΕΣ'].sum()
-                    summary_row_epik['ΑΠΟΔΟΧΕΣ'] = round(total_apodoxes_epik, 2)
-                    summary_row_epik['ΕΙΣΦΟΡΕΣ'] = round(totals_epik['ΕΙΣΦΟΡΕΣ'].sum(), 2)
-
-                    perikopi_month_sum_epik = (
-                        totals_epik.loc[~totals_epik['IS_SPECIAL']]
-                        .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΠΕΡΙΚΟΠΗ']
-                        .max()
-                        .fillna(0)
-                        .sum()
+                # Πίνακας με γραμμές σύνοψης ανά έτος
+                with span("epikouriki.display") as display_span_epik:
+                    display_df_with_totals_epik, yearly_totals_epik = build_display_with_totals(
+                        df_analysis_epik, package_desc_map_epik
                     )
-                    perikopi_special_sum_epik = totals_epik.loc[totals_epik['IS_SPECIAL'], 'ΠΕΡΙΚΟΠΗ'].fillna(0).sum()
-                    total_perikopi_epik = perikopi_month_sum_epik + perikopi_special_sum_epik
-                    total_insurable_epik = round(total_apodoxes_epik - total_perikopi_epik, 2)
-                    summary_row_epik['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = total_insurable_epik
-                    rows_epik.append(summary_row_epik)
-                    summary_flags_epik.append(True)
-
-                    yearly_totals_rows_epik.append({
-                        'ΕΤΟΣ': year,
-                        'ΗΜΕΡ. ΑΠΑΣΧ.': total_days_epik,
-                        'ΑΠΟΔΟΧΕΣ': round(total_apodoxes_epik, 2),
-                        'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ': total_insurable_epik
-                    })
-
-                    blank_row_epik = {col: '' for col in visible_columns_epik}
-                    rows_epik.append(blank_row_epik)
-                    summary_flags_epik.append(False)
-
-                display_df_with_totals_epik = pd.DataFrame(rows_epik, columns=visible_columns_epik)
-                display_df_with_totals_epik = round_float_columns(display_df_with_totals_epik)
-                display_df_with_totals_epik = round_numeric_columns(
-                    display_df_with_totals_epik,
-                    columns=[
-                        'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ',
-                        'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'
-                    ],
-                    decimals=2
-                )
-                for col in ['ΗΜΕΡ. ΑΠΑΣΧ.', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ']:
-                    if col in display_df_with_totals_epik.columns:
-                        display_df_with_totals_epik[col] = display_df_with_totals_epik[col].replace(0, '')
+                    display_df_with_totals_epik = finalize_analysis_display(display_df_with_totals_epik)
+                    display_span_epik.set(rows=len(display_df_with_totals_epik))
 
-                st.dataframe(display_df_with_totals_epik, use_container_width=True, hide_index=True)
-                html_analysis_epik = dataframe_to_printable_html(display_df_with_totals_epik, "Ανάλυση Επικουρικής (2002-2014)")
-                if html_analysis_epik:
-                    components.html(html_open_in_new_tab_component(html_analysis_epik), height=56)
+                with span("epikouriki.render", rows=len(display_df_with_totals_epik)):
+                    st.dataframe(display_df_with_totals_epik, use_container_width=True, hide_index=True)
+                render_report_button(display_df_with_totals_epik, "Ανάλυση Επικουρικής (2002-2014)", "efka_analysi_epikourikis.html", "report_analysis_epik")
 
-                yearly_totals_epik = pd.DataFrame(yearly_totals_rows_epik)
                 if apply_filters_epik or "yearly_totals_epik" not in st.session_state:
                     st.session_state["yearly_totals_epik"] = yearly_totals_epik
 
@@ -1175,12 +927,9 @@ if effective_file is not None and st.session_state["analysis_requested"]:
             yearly_totals_epik = st.session_state.get("yearly_totals_epik")
 
             if yearly_totals_epik is not None and not yearly_totals_epik.empty:
-                pension_df_epik = yearly_totals_epik.copy()
-                pension_df_epik['ΕΤΟΣ'] = pd.to_numeric(pension_df_epik['ΕΤΟΣ'])
-
                 dtk_year_options_epik = sorted(DTK_TABLE.keys(), reverse=True)
                 default_dtk_index_epik = dtk_year_options_epik.index(2026) if 2026 in dtk_year_options_epik else 0
-                buyout_year_options_epik = sorted([y for y in DTK_TABLE[dtk_year_options_epik[0]].keys() if y <= 2014], reverse=True)
+                buyout_year_options_epik = sorted([y for y in DTK_TABLE[dtk_year_options_epik[0]].keys() if y <= EPIK_YEAR_RANGE[1]], reverse=True)
 
                 with st.form("pension_calc_form_epik"):
                     col_i1e, col_i2e, col_i3e, col_i4e = st.columns(4)
@@ -1219,35 +968,16 @@ if effective_file is not None and st.session_state["analysis_requested"]:
                     buyout_days_epik = _pe.get("buyout_days", 0)
                     buyout_year_epik = _pe.get("buyout_year", 2026)
                     buyout_amount_epik = _pe.get("buyout_amount", 0.0)
-                    dtk_factors_epik = DTK_TABLE[selected_dtk_year_epik]
-                    buyout_dtk_epik = dtk_factors_epik.get(buyout_year_epik, 1.0)
-                    buyout_insurable_epik = buyout_amount_epik / 0.06
-
-                    pension_df_epik['ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ'] = pension_df_epik['ΕΤΟΣ'].map(dtk_factors_epik).fillna(1.0)
-                    pension_df_epik['ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = (
-                        pension_df_epik['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] * pension_df_epik['ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ']
-                    )
-
-                    if buyout_days_epik > 0 or buyout_amount_epik > 0:
-                        pension_df_epik = pd.concat([
-                            pension_df_epik,
-                            pd.DataFrame([{
-                                'ΕΤΟΣ': buyout_year_epik,
-                                'ΗΜΕΡ. ΑΠΑΣΧ.': buyout_days_epik,
-                                'ΑΠΟΔΟΧΕΣ': 0,
-                                'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ': buyout_insurable_epik,
-                                'ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ': buyout_dtk_epik,
-                                'ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ': buyout_insurable_epik * buyout_dtk_epik,
-                            }])
-                        ], ignore_index=True)
-                        pension_df_epik.loc[pension_df_epik.index[-1], 'ΕΤΟΣ'] = "ΕΞΑΓΟΡΑ"
-
-                    total_days_epik_sum = pension_df_epik['ΗΜΕΡ. ΑΠΑΣΧ.'].sum()
-                    total_pensionable_earnings_epik = pension_df_epik['ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'].sum()
-                    months_from_2002_epik = total_days_epik_sum / 25 if total_days_epik_sum > 0 else 0
-                    average_pensionable_salary_epik = (
-                        total_pensionable_earnings_epik / months_from_2002_epik if months_from_2002_epik > 0 else 0
-                    )
+                    with span("epikouriki.pension", rows=len(yearly_totals_epik)):
+                        pension_df_epik, pension_summary_epik = compute_pension(
+                            yearly_totals_epik, DTK_TABLE[selected_dtk_year_epik], 'epikouriki',
+                            buyout_days_epik, buyout_year_epik, buyout_amount_epik,
+                        )
+                    buyout_dtk_epik = pension_summary_epik['buyout_dtk']
+                    total_days_epik_sum = pension_summary_epik['total_days']
+                    total_pensionable_earnings_epik = pension_summary_epik['total_pensionable_earnings']
+                    months_from_2002_epik = pension_summary_epik['months']
+                    average_pensionable_salary_epik = pension_summary_epik['average_pensionable_salary']
 
                     col1e, col2e, col3e, col4e = st.columns(4)
                     col1e.metric("Σύνολο Ημερών", format_number_gr(total_days_epik_sum, 0))
@@ -1255,73 +985,30 @@ if effective_file is not None and st.session_state["analysis_requested"]:
                     col3e.metric("Σύνολο Συντάξιμων Αποδοχών", format_currency_gr(total_pensionable_earnings_epik))
                     col4e.metric("Μέσος Συντάξιμος Μισθός", format_currency_gr(average_pensionable_salary_epik))
 
-                    pension_display_epik = format_df_for_display(
-                        pension_df_epik,
-                        currency_cols=['ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ', 'ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'],
-                        int_cols=['ΗΜΕΡ. ΑΠΑΣΧ.'],
-                        float_cols_decimals={'ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ': 5},
-                    )
+                    with span("epikouriki.format", rows=len(pension_df_epik)):
+                        pension_display_epik = format_df_for_display(
+                            pension_df_epik,
+                            currency_cols=['ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ', 'ΤΕΛΙΚΕΣ ΣΥΝΤΑΞΙΜΕΣ ΑΠΟΔΟΧΕΣ'],
+                            int_cols=['ΗΜΕΡ. ΑΠΑΣΧ.'],
+                            float_cols_decimals={'ΣΥΝΤΕΛΕΣΤΗΣ ΔΤΚ': 5},
+                        )
                     styled_pension_epik = pension_display_epik.style.set_properties(**{'text-align': 'left'}).set_table_styles(
                         [{'selector': 'th', 'props': [('text-align', 'left')]}]
                     )
-                    st.dataframe(styled_pension_epik, use_container_width=True, hide_index=True)
-                    html_pension_epik = dataframe_to_printable_html(pension_display_epik, "Συντάξιμες Αποδοχές Επικουρικής")
-                    if html_pension_epik:
-                        components.html(html_open_in_new_tab_component(html_pension_epik), height=56)
+                    with span("epikouriki.pension_render", rows=len(pension_display_epik)):
+                        st.dataframe(styled_pension_epik, use_container_width=True, hide_index=True)
+                    render_report_button(pension_display_epik, "Συντάξιμες Αποδοχές Επικουρικής", "efka_syntaximes_epikourikis.html", "report_pension_epik")
 
                     # --- Εξαγωγή JSON για Syntaksi Pro (Επικουρική) ---
                     st.markdown("---")
                     st.subheader("Εξαγωγή για Syntaksi Pro (Επικουρική)")
 
-                    json_data_epik = {}
-                    for _, row in pension_df_epik.iterrows():
-                        year = row['ΕΤΟΣ']
-                        if year == "ΕΞΑΓΟΡΑ":
-                            continue
-                        year_str = str(int(year)) if isinstance(year, (int, float)) else str(year)
-
-                        json_data_epik[f"ika_{year_str}"] = {
-                            "value": int(row['ΗΜΕΡ. ΑΠΑΣΧ.']),
-                            "type": "number"
-                        }
-                        json_data_epik[f"apodoxes_{year_str}"] = {
-                            "value": round(row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'], 2),
-                            "type": "number"
-                        }
-
-                    json_data_epik["eksagorasmenes_imeres"] = {
-                        "value": int(buyout_days_epik),
-                        "type": "number"
-                    }
-                    json_data_epik["synoliko_poso_eksagoras"] = {
-                        "value": round(buyout_amount_epik, 2),
-                        "type": "number"
-                    }
-                    json_data_epik["dtk_eksagoras"] = {
-                        "value": round(buyout_dtk_epik, 5),
-                        "type": "number"
-                    }
-                    json_data_epik["dtk"] = {
-                        "value": int(selected_dtk_year_epik),
-                        "type": "number"
-                    }
-                    json_data_epik["etos_ethnikis"] = {
-                        "value": int(selected_dtk_year_epik),
-                        "type": "number"
-                    }
+                    render_syntaksi_download(
+                        pension_df_epik, 'epikouriki', selected_dtk_year_epik, buyout_days_epik, buyout_amount_epik,
+                        buyout_dtk_epik, "📥 Λήψη JSON Επικουρικής", "download_json_epik",
+                    )
 
-                    json_str_epik = json.dumps(json_data_epik, indent=2, ensure_ascii=False)
-
-                    col_json1e, col_json2e, col_json3e = st.columns([1, 2, 1])
-                    with col_json2e:
-                        st.download_button(
-                            label="📥 Λήψη JSON Επικουρικής",
-                            data=json_str_epik,
-                            file_name="efka_epikouriki_syntaksi_pro.json",
-                            mime="application/json",
-                            use_container_width=True,
-                            key="download_json_epik"
-                        )
+                render_scenario_comparison(df_monthly, 'epikouriki', st.session_state.get("filters_epik"), "epik")
             else:
                 st.warning("Δεν υπάρχουν δεδομένα για την περίοδο 2002-2014.")
 
@@ -1329,26 +1016,33 @@ if effective_file is not None and st.session_state["analysis_requested"]:
         with tab5:
             st.header("Συνοπτικά Ετήσια Δεδομένα")
             if df_annual is not None and not df_annual.empty:
-                df_annual_display = round_float_columns(df_annual)
-                st.dataframe(df_annual_display, use_container_width=True, hide_index=True)
-                html_annual = dataframe_to_printable_html(df_annual_display, "Συνοπτικά Ετήσια Δεδομένα")
-                if html_annual:
-                    components.html(html_open_in_new_tab_component(html_annual), height=56)
+                with span("annual.render", rows=len(df_annual)):
+                    df_annual_display = round_float_columns(df_annual)
+                    st.dataframe(df_annual_display, use_container_width=True, hide_index=True)
+                render_report_button(df_annual_display, "Συνοπτικά Ετήσια Δεδομένα", "efka_etisia.html", "report_annual")
             else:
                 st.warning("Δεν βρέθηκαν συνοπτικά ετήσια δεδομένα.")
 
         # --- Tab 6: Στοιχεία χωρίς επεξεργασία ---
         with tab6:
             st.header("Στοιχεία χωρίς επεξεργασία")
-            df_monthly_display = round_float_columns(df_monthly)
-            st.dataframe(df_monthly_display, use_container_width=True, hide_index=True)
-            html_monthly = dataframe_to_printable_html(df_monthly_display, "Στοιχεία χωρίς επεξεργασία")
-            if html_monthly:
-                components.html(html_open_in_new_tab_component(html_monthly), height=56)
-
+            with span("monthly.render", rows=len(df_monthly)):
+                # Η ΑΡ. ΠΕΡΙΟΔΟΥ του συμπαγούς σχήματος δεν υπάρχει στο PDF
+                df_monthly_display = round_float_columns(df_monthly.drop(columns=PERIOD_INDEX_COLUMN, errors='ignore'))
+                st.dataframe(df_monthly_display, use_container_width=True, hide_index=True)
+            render_report_button(df_monthly_display, "Στοιχεία χωρίς επεξεργασία", "efka_analytika.html", "report_monthly")
+
+    elif stored_statement:
+        st.error("Η αποθηκευμένη ανάλυση δεν βρέθηκε (ίσως διαγράφηκε ή αφορά παλαιότερη έκδοση του parser).")
     elif uploaded_file:
         st.error("Δεν ήταν δυνατή η εξαγωγή δεδομένων από το αρχείο PDF. Βεβαιωθείτε ότι το αρχείο είναι έγκυρο.")
 
+if diagnostics_recorder is not None:
+    render_timing_diagnostics(diagnostics_recorder)
+    render_memory_diagnostics()
+if profiling_requested and st.session_state.get("profile_run") is not None:
+    render_profile(st.session_state["profile_run"])
+
 st.markdown("---")
 st.markdown(
     """
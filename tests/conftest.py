@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Τα modules της εφαρμογής (pdf_parser, efka_core, benchmarks) από τη ρίζα του repo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
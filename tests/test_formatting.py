@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from efka_core.formatting import format_number_column_gr, format_number_gr
+
+SPECIAL_VALUES = [
+    0.0, -0.0, 0.5, -0.5, 1.5, 2.5, -2.5, 0.125, 0.375, 1.005, 2.675, 999.995, -999.995, 0.0049999,
+    1e-9, -1e-9, 1e15, -1e15, 1e15 + 0.5, 123456789.125, 2.0 ** 40, 2.0 ** 53, np.inf, -np.inf, np.nan,
+]
+
+
+def _values():
+    rng = np.random.default_rng(1)
+    random_values = np.round(rng.normal(size=1000) * 10.0 ** rng.integers(-4, 16, size=1000), rng.integers(0, 5))
+    # Ισοπαλίες (x,5 στο τελευταίο ψηφίο) σε διάφορες κλίμακες
+    ties = (rng.integers(-10 ** 6, 10 ** 6, size=1000) + 0.5) / 10.0 ** rng.integers(0, 4, size=1000)
+    return SPECIAL_VALUES + random_values.tolist() + ties.tolist()
+
+
+@pytest.mark.parametrize("decimals", [0, 1, 2, 3])
+@pytest.mark.parametrize("prefix, suffix", [("", ""), ("€", ""), ("", "%")])
+@pytest.mark.parametrize("dtype", ["float64", "int64"])
+def test_format_number_column_matches_format_number(decimals, prefix, suffix, dtype):
+    values = _values()
+    if dtype == "int64":
+        values = [int(v) for v in values if np.isfinite(v)]
+    series = pd.Series(values, dtype=dtype)
+
+    result = format_number_column_gr(series, decimals, prefix, suffix).tolist()
+    expected = [
+        f"{prefix}{text}{suffix}" if (text := format_number_gr(value, decimals)) else ""
+        for value in series.tolist()
+    ]
+    assert result == expected
@@ -0,0 +1,315 @@
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import pdf_parser
+from benchmarks.synthetic_statement import generate_statement
+from efka_core import (
+    CEILING_TABLES, FUNDS, SOURCE_KEY_ATTR, build_display_with_totals, build_filters, clear_memo, compute_insurable,
+    finalize_analysis_display, memo_stats, nbytes, package_descriptions, slice_index,
+)
+from efka_core import insurable
+
+# Στήλες που υπολογίζει η ανάλυση πλαφόν
+RESULT_COLUMNS = [
+    'ΕΤΟΣ', 'ΠΕΡΙΟΔΟΣ', 'ΒΑΣΙΚΟ ΠΛΑΦΟΝ', 'IS_SPECIAL', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ', 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ',
+    'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ', 'ΠΕΡΙΚΟΠΗ', 'ΠΟΣΟΣΤΟ',
+]
+
+
+def reference_insurable(df_monthly, ceiling_dict, year_range=None, filters=None):
+    """Ο αρχικός κώδικας των καρτελών Κύριας/Επικουρικής (apply / combine(min)), ως αναφορά."""
+    df_analysis = df_monthly.copy()
+    period_str = df_analysis['ΠΕΡΙΟΔΟΣ'].astype(str).str.strip()
+    period_str = period_str.str.replace(r'^(\d{1})/', r'0\1/', regex=True)
+    df_analysis['ΠΕΡΙΟΔΟΣ'] = period_str
+    period_dt = pd.to_datetime(period_str, format='%m/%Y', errors='coerce')
+    df_analysis['ΕΤΟΣ'] = period_dt.dt.year.astype('Int64').astype(str)
+    if year_range:
+        first, last = year_range
+        df_analysis = df_analysis[df_analysis['ΕΤΟΣ'].isin([str(y) for y in range(first, last + 1)])]
+
+    filters = filters or {}
+    if filters.get('years'):
+        from_year, to_year = filters['years']
+        df_analysis = df_analysis[(df_analysis['ΕΤΟΣ'] >= from_year) & (df_analysis['ΕΤΟΣ'] <= to_year)]
+    if filters.get('types'):
+        df_analysis = df_analysis[df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(filters['types'])]
+    if filters.get('packages'):
+        df_analysis = df_analysis[df_analysis['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].astype(str).isin(filters['packages'])]
+    df_analysis = df_analysis.copy()
+
+    df_analysis['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'] = df_analysis['ΕΤΟΣ'].map(ceiling_dict).fillna(0)
+
+    excluded_mask = df_analysis['ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ'].astype(str).str.contains(
+        r'δώρο|επίδομα\s+αδείας', case=False, regex=True
+    ) | df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(['03', '04', '05'])
+    df_analysis['IS_SPECIAL'] = excluded_mask
+    monthly_earnings = (
+        df_analysis.loc[~excluded_mask]
+        .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΑΠΟΔΟΧΕΣ']
+        .sum()
+    )
+    df_analysis['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'] = df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings)
+
+    days_map = (
+        df_analysis.loc[df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str) == '01']
+        .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΗΜΕΡ. ΑΠΑΣΧ.']
+        .max()
+    )
+    base_plafon_map = df_analysis.groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'].max()
+    plafon_month_map = (base_plafon_map / 25 * days_map).clip(upper=base_plafon_map)
+    plafon_month_map = plafon_month_map.fillna(base_plafon_map)
+
+    df_analysis['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = df_analysis['ΠΕΡΙΟΔΟΣ'].map(plafon_month_map)
+    df_analysis.loc[df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str) == '03', 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = (
+        df_analysis['ΒΑΣΙΚΟ ΠΛΑΦΟΝ']
+    )
+    df_analysis.loc[df_analysis['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str).isin(['04', '05']), 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'] = (
+        df_analysis['ΒΑΣΙΚΟ ΠΛΑΦΟΝ'] / 2
+    )
+
+    monthly_plafon = df_analysis.groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ'].max()
+    monthly_insurable = (df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings)
+                         .combine(df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_plafon), min))
+    df_analysis['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = monthly_insurable
+
+    perikopi_map = (df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_earnings) -
+                    df_analysis['ΠΕΡΙΟΔΟΣ'].map(monthly_plafon))
+    df_analysis['ΠΕΡΙΚΟΠΗ'] = perikopi_map.where(perikopi_map > 0, None)
+
+    df_analysis.loc[df_analysis['IS_SPECIAL'], 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = df_analysis.loc[
+        df_analysis['IS_SPECIAL'], ['ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ']
+    ].min(axis=1)
+    df_analysis.loc[df_analysis['IS_SPECIAL'], 'ΠΕΡΙΚΟΠΗ'] = (
+        df_analysis.loc[df_analysis['IS_SPECIAL'], 'ΑΠΟΔΟΧΕΣ'] -
+        df_analysis.loc[df_analysis['IS_SPECIAL'], 'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ']
+    ).where(lambda s: s > 0, None)
+
+    df_analysis['ΠΟΣΟΣΤΟ'] = df_analysis.apply(
+        lambda row: (row['ΕΙΣΦΟΡΕΣ'] / row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ']) * 100 if row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] > 0 else 0,
+        axis=1
+    )
+    return df_analysis
+
+
+def _round_float_columns(df, decimals=2):
+    df_out = df.copy()
+    float_cols = df_out.select_dtypes(include=["float"]).columns
+    if len(float_cols) > 0:
+        df_out[float_cols] = df_out[float_cols].round(decimals)
+    return df_out
+
+
+def _round_numeric_columns(df, columns, decimals=2):
+    df_out = df.copy()
+    for col in columns:
+        if col in df_out.columns:
+            numeric_values = pd.to_numeric(df_out[col], errors="coerce")
+            df_out[col] = numeric_values.round(decimals).where(numeric_values.notna(), df_out[col])
+    return df_out
+
+
+def reference_display_with_totals(df_analysis, package_desc_map):
+    """
+    Ο αρχικός πίνακας ανάλυσης των καρτελών (iterrows ανά έτος, γραμμή ΣΥΝΟΛΟ και
+    κενή γραμμή), μαζί με τη στρογγυλοποίηση για την προβολή, ως αναφορά.
+    Επιστρέφει (πίνακας, yearly_totals).
+    """
+    display_df = df_analysis.copy()
+    _pkg_map = {str(k): (v or '') for k, v in package_desc_map.items()}
+    display_df['ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ'] = (
+        display_df['ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ'].astype(str).replace('nan', '').map(_pkg_map).fillna('')
+    )
+    display_df['ΕΤΟΣ_KEY'] = display_df['ΕΤΟΣ']
+    display_df['ΠΕΡΙΟΔΟΣ_KEY'] = display_df['ΠΕΡΙΟΔΟΣ']
+    display_df['ΤΥΠΟΣ_SORT'] = display_df['ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ'].astype(str)
+    display_df = display_df.sort_values(['ΕΤΟΣ_KEY', 'IS_SPECIAL', 'ΠΕΡΙΟΔΟΣ_KEY', 'ΤΥΠΟΣ_SORT'])
+
+    display_df['ΕΤΟΣ'] = display_df['ΕΤΟΣ'].where(~display_df.duplicated(['ΕΤΟΣ_KEY']), '')
+    display_df['ΠΕΡΙΟΔΟΣ'] = display_df['ΠΕΡΙΟΔΟΣ'].where(~display_df.duplicated(['ΕΤΟΣ_KEY', 'ΠΕΡΙΟΔΟΣ_KEY']), '')
+    show_month_total = ~display_df.duplicated(['ΕΤΟΣ_KEY', 'ΠΕΡΙΟΔΟΣ_KEY'])
+    display_df['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'] = display_df['ΑΠΟΔΟΧΕΣ ΜΗΝΑ'].where(show_month_total, '')
+    for col in ['ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ']:
+        display_df[col] = display_df[col].where(show_month_total | display_df['IS_SPECIAL'], '')
+
+    visible_columns = [
+        'ΕΤΟΣ', 'ΠΕΡΙΟΔΟΣ', 'ΚΩΔ. ΠΑΚΕΤΟ ΚΑΛΥΨΗΣ', 'ΠΕΡΙΓΡΑΦΗ ΠΑΚΕΤΟΥ', 'ΗΜΕΡ. ΑΠΑΣΧ.', 'ΤΥΠΟΣ ΑΠΟΔΟΧΩΝ',
+        'ΠΕΡΙΓΡΑΦΗ_ΑΠΟΔΟΧΩΝ', 'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ',
+        'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'
+    ]
+    display_df_visible = display_df[visible_columns]
+
+    rows = []
+    yearly_totals_rows = []
+    for year in sorted(display_df['ΕΤΟΣ_KEY'].dropna().unique()):
+        year_rows = display_df_visible[display_df['ΕΤΟΣ_KEY'] == year]
+        for _, row in year_rows.iterrows():
+            rows.append(row.to_dict())
+
+        totals = df_analysis[df_analysis['ΕΤΟΣ'] == str(year)]
+        summary_row = {col: '' for col in visible_columns}
+        summary_row['ΕΤΟΣ'] = f"ΣΥΝΟΛΟ {year}"
+        total_days = totals['ΗΜΕΡ. ΑΠΑΣΧ.'].sum()
+        total_apodoxes = totals['ΑΠΟΔΟΧΕΣ'].sum()
+        summary_row['ΑΠΟΔΟΧΕΣ'] = round(total_apodoxes, 2)
+        summary_row['ΕΙΣΦΟΡΕΣ'] = round(totals['ΕΙΣΦΟΡΕΣ'].sum(), 2)
+        perikopi_month_sum = (
+            totals.loc[~totals['IS_SPECIAL']]
+            .groupby('ΠΕΡΙΟΔΟΣ', dropna=False)['ΠΕΡΙΚΟΠΗ']
+            .max()
+            .fillna(0)
+            .sum()
+        )
+        perikopi_special_sum = totals.loc[totals['IS_SPECIAL'], 'ΠΕΡΙΚΟΠΗ'].fillna(0).sum()
+        total_insurable = round(total_apodoxes - (perikopi_month_sum + perikopi_special_sum), 2)
+        summary_row['ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'] = total_insurable
+        rows.append(summary_row)
+        yearly_totals_rows.append({
+            'ΕΤΟΣ': year,
+            'ΗΜΕΡ. ΑΠΑΣΧ.': total_days,
+            'ΑΠΟΔΟΧΕΣ': round(total_apodoxes, 2),
+            'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ': total_insurable,
+        })
+        rows.append({col: '' for col in visible_columns})
+
+    display_df_with_totals = pd.DataFrame(rows, columns=visible_columns)
+    display_df_with_totals = _round_float_columns(display_df_with_totals)
+    display_df_with_totals = _round_numeric_columns(
+        display_df_with_totals,
+        columns=[
+            'ΑΠΟΔΟΧΕΣ', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ', 'ΑΠΟΔΟΧΕΣ ΜΗΝΑ',
+            'ΕΙΣΦΟΡΙΣΙΜΟ ΠΛΑΦΟΝ', 'ΠΕΡΙΚΟΠΗ', 'ΕΙΣΦΟΡΙΣΙΜΕΣ ΑΠΟΔΟΧΕΣ'
+        ],
+        decimals=2
+    )
+    for col in ['ΗΜΕΡ. ΑΠΑΣΧ.', 'ΕΙΣΦΟΡΕΣ', 'ΠΟΣΟΣΤΟ']:
+        display_df_with_totals[col] = display_df_with_totals[col].replace(0, '')
+    return display_df_with_totals, pd.DataFrame(yearly_totals_rows)
+
+
+@pytest.fixture(scope="module")
+def parsed():
+    return pdf_parser.parse_efka_pdf(generate_statement(pages=8, employers=3, seed=4).pdf_bytes, workers=1)
+
+
+@pytest.fixture(scope="module")
+def statement(parsed):
+    return parsed[0]
+
+
+def test_compute_insurable_matches_reference_on_compact_schema(statement):
+    # Η εφαρμογή δίνει στη μηχανή το συμπαγές σχήμα (category/int16)
+    clear_memo()
+    expected = reference_insurable(statement, CEILING_TABLES['Νέος'])
+    result = compute_insurable(pdf_parser.compact_monthly_dataframe(statement), CEILING_TABLES['Νέος'])
+
+    assert_frame_equal(result[RESULT_COLUMNS], expected[RESULT_COLUMNS])
+
+
+@pytest.mark.parametrize("ceiling", sorted(CEILING_TABLES))
+@pytest.mark.parametrize("fund", sorted(FUNDS))
+@pytest.mark.parametrize("filter_args", [
+    {},
+    {'year_from': '2004', 'year_to': '2006'},
+    {'types': ['01', '03']},
+    {'packages': ['1001']},
+    {'year_from': '2007', 'types': ['04', '05'], 'packages': ['1012']},
+])
+def test_compute_insurable_matches_reference(statement, ceiling, fund, filter_args):
+    clear_memo()
+    year_range = FUNDS[fund]['year_range']
+    years = sorted(statement['ΠΕΡΙΟΔΟΣ'].str[-4:].unique())
+    filters = build_filters(years, **filter_args)
+
+    expected = reference_insurable(statement, CEILING_TABLES[ceiling], year_range, filters)
+    result = compute_insurable(statement, CEILING_TABLES[ceiling], year_range, filters)
+
+    assert not expected.empty
+    assert_frame_equal(result[RESULT_COLUMNS], expected[RESULT_COLUMNS])
+
+
+@pytest.mark.parametrize("compact", [False, True])
+@pytest.mark.parametrize("fund", sorted(FUNDS))
+@pytest.mark.parametrize("filter_args", [
+    {},
+    {'year_from': '2004', 'year_to': '2006'},
+    {'types': ['01', '03']},
+    {'year_from': '2007', 'types': ['04', '05'], 'packages': ['1012']},
+])
+def test_display_with_totals_matches_reference(parsed, compact, fund, filter_args):
+    clear_memo()
+    df_monthly, df_annual = parsed
+    package_desc_map = package_descriptions(df_annual)
+    year_range = FUNDS[fund]['year_range']
+    years = sorted(df_monthly['ΠΕΡΙΟΔΟΣ'].str[-4:].unique())
+    filters = build_filters(years, **filter_args)
+
+    # Αναφορά: ο αρχικός κώδικας των καρτελών από άκρη σε άκρη (κανονικό σχήμα)
+    expected_display, expected_totals = reference_display_with_totals(
+        reference_insurable(df_monthly, CEILING_TABLES['Νέος'], year_range, filters), package_desc_map
+    )
+    source = pdf_parser.compact_monthly_dataframe(df_monthly) if compact else df_monthly
+    display_df, totals = build_display_with_totals(
+        compute_insurable(source, CEILING_TABLES['Νέος'], year_range, filters), package_desc_map
+    )
+
+    assert len(expected_totals) > 0
+    assert_frame_equal(finalize_analysis_display(display_df), expected_display)
+    assert_frame_equal(totals, expected_totals)
+
+
+def test_memo_keeps_slice_index_per_source(statement, monkeypatch):
+    # Δύο συνεδρίες με διαφορετικά αρχεία και πολλά διαφορετικά φίλτρα: τα
+    # αποτελέσματα ανά φίλτρα δεν εκτοπίζουν το SliceIndex κανενός αρχείου
+    clear_memo()
+    # Χώρος για λίγα μόνο αποτελέσματα, ώστε να γίνονται εκτοπίσεις
+    result_size = nbytes(compute_insurable(statement, CEILING_TABLES['Νέος']))
+    monkeypatch.setattr(insurable, 'MEMO_MAX_BYTES', 5 * result_size)
+    clear_memo()
+    sources = []
+    for name in ('a', 'b'):
+        df = statement.copy()
+        df.attrs[SOURCE_KEY_ATTR] = name
+        sources.append(df)
+    ceiling = CEILING_TABLES['Νέος']
+    years = sorted(statement['ΠΕΡΙΟΔΟΣ'].str[-4:].unique())
+    indexes = {
+        (id(df), fund): slice_index(df, ceiling, FUNDS[fund]['year_range'])
+        for df in sources for fund in FUNDS
+    }
+
+    for year_from in years:
+        filters = build_filters(years, year_from=year_from)
+        for df in sources:
+            for fund in FUNDS:
+                compute_insurable(df, ceiling, FUNDS[fund]['year_range'], filters)
+
+    for (df_id, fund), index in indexes.items():
+        df = next(df for df in sources if id(df) == df_id)
+        assert slice_index(df, ceiling, FUNDS[fund]['year_range']) is index
+    assert memo_stats()['sources'] == 2
+
+
+def test_memo_results_bounded_by_bytes_and_scoped_per_source(statement, monkeypatch):
+    clear_memo()
+    ceiling = CEILING_TABLES['Νέος']
+    result_size = nbytes(compute_insurable(statement, ceiling))
+    monkeypatch.setattr(insurable, 'MEMO_MAX_BYTES', 3 * result_size)
+    monkeypatch.setattr(insurable, 'MEMO_MAX_SOURCES', 2)
+    clear_memo()
+    years = sorted(statement['ΠΕΡΙΟΔΟΣ'].str[-4:].unique())
+
+    for year_from in years:
+        compute_insurable(statement, ceiling, filters=build_filters(years, year_from=year_from))
+        assert memo_stats()['result_bytes'] <= insurable.MEMO_MAX_BYTES
+    assert 0 < memo_stats()['results'] < len(years)
+
+    # Όταν ένα αρχείο φεύγει από την cache, φεύγουν και τα αποτελέσματά του
+    for name in ('b', 'c'):
+        df = statement.copy()
+        df.attrs[SOURCE_KEY_ATTR] = name
+        compute_insurable(df, ceiling)
+    stats = memo_stats()
+    assert stats['sources'] == 2
+    assert stats['results'] == 2
@@ -0,0 +1,69 @@
+from io import BytesIO
+
+import pdfplumber
+import pytest
+from pandas.testing import assert_frame_equal
+
+import pdf_parser
+from benchmarks.synthetic_statement import generate_statement
+
+
+def _parse_both(statement):
+    tables = pdf_parser.parse_efka_pdf(statement.pdf_bytes, workers=1, engine="tables")
+    words = pdf_parser.parse_efka_pdf(statement.pdf_bytes, workers=1, engine="words")
+    return tables, words
+
+
+@pytest.mark.parametrize("pages, seed, employers", [(1, 0, 2), (6, 1, 2), (12, 0, 3)])
+def test_words_engine_matches_tables(pages, seed, employers):
+    statement = generate_statement(pages=pages, seed=seed, employers=employers)
+    (tables_monthly, tables_annual), (words_monthly, words_annual) = _parse_both(statement)
+
+    assert len(tables_annual) == statement.annual_rows
+    assert_frame_equal(words_monthly, tables_monthly)
+    assert_frame_equal(words_annual, tables_annual)
+
+
+def test_words_engine_matches_tables_on_word_path():
+    # Χωρίς μετατοπισμένα ποσά οι σελίδες αναλυτικών διαβάζονται με λέξεις (όχι fallback)
+    statement = generate_statement(pages=6, seed=2, shifted_ratio=0)
+    with pdfplumber.open(BytesIO(statement.pdf_bytes)) as pdf:
+        word_pages = sum(pdf_parser._extract_page_rows_words(page) is not None for page in pdf.pages)
+    assert word_pages == 5  # όλες εκτός από τη σελίδα της συνοπτικής κατάστασης
+
+    (tables_monthly, tables_annual), (words_monthly, words_annual) = _parse_both(statement)
+    assert_frame_equal(words_monthly, tables_monthly)
+    assert_frame_equal(words_annual, tables_annual)
+
+
+def test_words_engine_handles_shifted_rows_on_word_path():
+    # Η προεπιλεγμένη κατάσταση έχει μετατοπισμένα ποσά σε κάθε σελίδα· αυτές
+    # χωρίζονται με τα όρια του extract_tables, όχι με fallback ολόκληρης σελίδας
+    statement = generate_statement(pages=12)
+    word_pages = 0
+    with pdfplumber.open(BytesIO(statement.pdf_bytes)) as pdf:
+        for page in pdf.pages:
+            rows = pdf_parser._extract_page_rows_words(page)
+            if rows is not None:
+                word_pages += 1
+                assert rows == pdf_parser._extract_page_rows(page)
+    assert word_pages >= 10
+
+    (tables_monthly, tables_annual), (words_monthly, words_annual) = _parse_both(statement)
+    assert_frame_equal(words_monthly, tables_monthly)
+    assert_frame_equal(words_annual, tables_annual)
+
+
+def test_compact_period_index_counts_months():
+    rows = [
+        [period, '5610', '913090', '', '1001', '25', '01', '1.000,00', '338,70']
+        for period in ('12/2001', '01/2002', '03/2005', '')
+    ]
+    df = pdf_parser.compact_monthly_dataframe(pdf_parser.build_monthly_dataframe(rows))
+
+    index = df[pdf_parser.PERIOD_INDEX_COLUMN]
+    assert str(index.dtype) == 'Int32'
+    assert index.tolist()[:3] == [2001 * 12 + 12, 2002 * 12 + 1, 2005 * 12 + 3]
+    assert index.isna().tolist() == [False, False, False, True]
+    # Κενά στο ιστορικό μένουν ως διαφορά μηνών (όχι διαδοχικά cat.codes)
+    assert index[2] - index[1] == 38
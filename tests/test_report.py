@@ -0,0 +1,55 @@
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from efka_core.report import iter_table_html
+
+
+def reference_table_html(df):
+    """Ο αρχικός πίνακας της αναφοράς: to_html και regex για τις γραμμές ΣΥΝΟΛΟ."""
+    table_html = df.fillna("").to_html(index=False, classes="print-table", border=0)
+    return re.sub(
+        r'<tr[^>]*>((?:(?!</tr>).)*?ΣΥΝΟΛΟ(?:(?!</tr>).)*?)</tr>',
+        r'<tr class="row-total">\1</tr>',
+        table_html, flags=re.DOTALL | re.IGNORECASE
+    )
+
+
+FRAMES = {
+    'mixed': pd.DataFrame({
+        'ΕΤΟΣ': ['2002', '', 'ΣΥΝΟΛΟ 2002', ''],
+        'ΑΠΟΔΟΧΕΣ': [1.5, 2.25, 3.75, ''],
+        'ΗΜΕΡ. ΑΠΑΣΧ.': [25, '', 0, ''],
+        'ΠΕΡΙΓΡΑΦΗ': ['a<b', 'x&y', None, ''],
+    }),
+    'object_float': pd.DataFrame({'a': pd.Series([1.0, 2.5, '', 3.123456789, None, 1e7, 1e-8], dtype=object)}),
+    'large_float': pd.DataFrame({'a': [1e6, 2.5e7, 123456789.123, np.nan], 'b': [1e15, 1.0, -3.5, 0.0]}),
+    'tiny_float': pd.DataFrame({'a': [1e-7, 0.5, np.nan, -2e-9], 'b': [0.1, 0.25, 0.125, 0.0]}),
+    'negative_float': pd.DataFrame({'a': [-1.5, -0.0, 2.0, -1234567.891]}),
+    'int_bool': pd.DataFrame({'a': [1, 2, 3], 'b': [True, False, True]}),
+    'datetime_nat': pd.DataFrame({
+        'd': pd.to_datetime(['2024-01-02', None, '2024-03-04 05:06:07'], format='ISO8601'),
+        'x': [1.0, 2.0, 3.0],
+    }),
+    'date_nat': pd.DataFrame({'d': pd.to_datetime(['2024-01-02', None])}),
+    'datetime_tz_nat': pd.DataFrame({'d': pd.to_datetime(['2024-01-02 10:00', None]).tz_localize('Europe/Athens')}),
+    'timedelta_nat': pd.DataFrame({'t': pd.to_timedelta(['1 day', None, '2h'])}),
+}
+
+
+@pytest.mark.parametrize("name", sorted(FRAMES))
+def test_table_html_matches_to_html(name):
+    df = FRAMES[name]
+    assert "".join(iter_table_html(df)) == reference_table_html(df)
+
+
+def test_table_html_matches_to_html_on_random_floats():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        n = int(rng.integers(1, 8))
+        values = np.round(rng.normal(size=n) * 10.0 ** rng.integers(-10, 17, size=n), int(rng.integers(0, 9)))
+        values[rng.random(n) < 0.15] = np.nan
+        df = pd.DataFrame({'f': values, 'o': pd.Series(list(values[:-1]) + [''], dtype=object)})
+        assert "".join(iter_table_html(df)) == reference_table_html(df), values.tolist()